@@ -1,6 +1,7 @@
 import jadn
 import json
 import os
+from functools import lru_cache
 from jadn.definitions import TypeName, BaseType, TypeOptions, Fields, FieldType
 
 SCHEMA_DIR = os.path.join('..', '..', 'Schemas', 'Metaschema')
@@ -9,6 +10,7 @@ DEBUG = False
 D = [(f'${n}' if DEBUG else '') for n in range(10)]
 
 
+@lru_cache(maxsize=None)
 def typedefname(jsdef: str) -> str:
     """
     Infer type name from a JSON Schema definition
@@ -26,9 +28,14 @@ def typerefname(jsref: dict) -> str:
     """
     Infer a type name from a JSON Schema property reference
     """
-    if (t := jsref.get('type', '')) in ('string', 'integer', 'number', 'boolean'):
+    return _typerefname(jsref.get('type', ''), jsref.get('$ref', ''))
+
+
+@lru_cache(maxsize=None)
+def _typerefname(t: str, ref: str) -> str:     # Name depends only on the type and $ref of a reference
+    if t in ('string', 'integer', 'number', 'boolean'):
         return t.capitalize() + D[4]    # Built-in type
-    if ref := jsref.get('$ref', ''):
+    if ref:
         td = jssx.get(ref, ref)
         if td.startswith('#/definitions/'):  # Exact type name
             return td.removeprefix('#/definitions/') + D[5]
@@ -53,6 +60,7 @@ def singular(name: str) -> str:
     return name + '-item'
 
 
+@lru_cache(maxsize=None)
 def maketypename(tn: str, name: str) -> str:
     """
     Convert a type and property name to type name
@@ -64,30 +72,40 @@ def maketypename(tn: str, name: str) -> str:
 
 def scandef(tn: str, tv: dict, nt: list):
     """
-    Process nested type definitions, add to list nt
+    Process nested type definitions depth-first, add to list nt.  Uses a work stack, not recursion,
+    so nesting depth is not limited by the interpreter stack.
     """
-
-    if not (td := define_jadn_type(tn, tv)):
-        return
-    nt.append(td)
-    if tv.get('type', '') == 'object':
-        for k, v in tv.get('properties', {}).items():
-            if v.get('$ref', '') or v.get('type', '') in ('string', 'number', 'integer', 'boolean'):     # Not nested
-                pass
-            elif v.get('type', '') == 'array':
-                scandef(maketypename('', k), v, nt)
-                scandef(singular(maketypename('', k)), v['items'], nt)  # TODO: primitive with options or none
-            elif v.get('anyOf', '') or v.get('allOf', ''):
-                scandef(maketypename(tn, k), v, nt)
-            elif typerefname(v):
-                print('  nested property type:', f'{td[TypeName]}${k}', v)
-
-        if not tn:
-            print(f'  nested type: "{tv.get("title", "")}"')
-    elif (tc := tv.get('anyOf', '')) or (tc := tv.get('allOf', '')):
-        for n, v in enumerate(tc, start=1):
-            scandef(maketypename(tn, n), v, nt)
-    pass
+    stack = [(tn, tv)]
+    while stack:
+        tn, tv = stack.pop()
+        if not (td := define_jadn_type(tn, tv)):
+            continue
+        nt.append(td)
+        nested = []     # Nested definitions, in document order
+        if tv.get('type', '') == 'object':
+            for k, v in tv.get('properties', {}).items():
+                if v.get('$ref', '') or v.get('type', '') in ('string', 'number', 'integer', 'boolean'):     # Not nested
+                    pass
+                elif v.get('type', '') == 'array':
+                    nested.append((maketypename('', k), v))
+                    nested.append((singular(maketypename('', k)), v['items']))  # TODO: primitive with options or none
+                elif v.get('anyOf', '') or v.get('allOf', ''):
+                    nested.append((maketypename(tn, k), v))
+                elif typerefname(v):
+                    print('  nested property type:', f'{td[TypeName]}${k}', v)
+
+            if not tn:
+                print(f'  nested type: "{tv.get("title", "")}"')
+        elif (tc := tv.get('anyOf', '')) or (tc := tv.get('allOf', '')):
+            nested = [(maketypename(tn, n), v) for n, v in enumerate(tc, start=1)]
+        stack += reversed(nested)
+
+
+def frozen(v):
+    """
+    Return a hashable equivalent of a type definition
+    """
+    return tuple(frozen(x) for x in v) if isinstance(v, list) else v
 
 
 def define_jadn_type(tn: str, tv: dict) -> list:
@@ -172,10 +190,7 @@ if __name__ == '__main__':
     for tn, tv in jss['definitions'].items():
         scandef(tn, tv, nt)
 
-    ntypes = []     # Prune identical type definitions
-    for t in nt:
-        if t not in ntypes:     # O(n^2) runtime because type definitions aren't hashable
-            ntypes.append(t)    # Convert to immutable types if it becomes an issue
+    ntypes = list({frozen(t): t for t in nt}.values())    # Prune identical type definitions
 
     jadn.dump(schema := {'info': info, 'types': ntypes}, 'out.jadn')
     print('\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(schema)).items()]))
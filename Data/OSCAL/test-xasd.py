@@ -18,7 +18,9 @@ def translate(filename: str, sdir: str, odir: str) -> None:
     print(f'{filename}:\n' + '\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(schema)).items()]))
 
     fn, ext = os.path.splitext(filename)
-    xasd.xasd_dump(schema, os.path.join(odir, fn + '.xml'))
+    xasd.xasd_dump(schema, xp := os.path.join(odir, fn + '.xml'))
+    with open(xp, 'rb') as fp:
+        print(f'{"round trip":>15}: {len(xasd.xasd_load(fp)["types"])} types')
 
 
 def main(schema_dir: str = SCHEMA_DIR, output_dir: str = OUTPUT_DIR) -> None:
@@ -1,22 +1,24 @@
-import jadn
 import json
 import os
+import sys
 
-SCHEMA = os.path.join('..', '..', 'Schemas', 'Metaschema', 'oscal_catalog_1.1.0.jadn')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from root_index import RootIndex
 
+SCHEMA_DIR = os.path.join('..', '..', 'Schemas', 'Metaschema')
+FILES = [a for a in sys.argv[1:] if not a.startswith('--')] or ['basic-catalog.json']
+SPLIT = '--split' in sys.argv       # Validate the controls of each catalog in parallel: --split [--jobs=N]
+JOBS = int(next((a.split('=', 1)[1] for a in sys.argv if a.startswith('--jobs=')), 0))
 
-with open(SCHEMA, encoding='utf-8') as fp:
-    sc = jadn.load(fp)
-print(f'{SCHEMA}:\n' + '\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(sc)).items()]))
+index = RootIndex(SCHEMA_DIR)
 
-codec = jadn.codec.Codec(sc, verbose_rec=True, verbose_str=True)
-
-for f in os.scandir('.'):
-    if (fn := f.name) == 'basic-catalog.json':
-        print(fn)
+for fn in FILES:
+    if SPLIT:
+        route, errors = index.validate_split(fn, JOBS)
+    else:
         with open(fn, encoding='utf-8') as fd:
-            file = json.load(fd)
-        try:
-            codec.encode('$Root', file)
-        except ValueError as e:
-            print(f'  ### {e}')
\ No newline at end of file
+            route, err = index.validate(json.load(fd))
+        errors = [('', err)] if err else []
+    print(f'{fn}: {route.schema if route else ""} {route.type if route else ""}')
+    for ptr, err in errors:
+        print(f'  ### {ptr + ": " if ptr else ""}{err}')
@@ -1,20 +1,27 @@
-import jadn
 import json
 import os
+import sys
+import time
 
-SCHEMA = os.path.join('..', '..', 'Schemas', 'Metaschema', 'oscal.jadn')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from root_index import RootIndex
 
-with open(SCHEMA, encoding='utf-8') as fp:
-    sc = jadn.load(fp)
-print(f'{SCHEMA}:\n' + '\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(sc)).items()]))
-codec = jadn.codec.Codec(sc, verbose_rec=True, verbose_str=True)
+SCHEMA_DIR = os.path.join('..', '..', 'Schemas', 'Metaschema')
+DATA_DIR = sys.argv[1] if len(sys.argv) > 1 else '.'
 
-for f in os.scandir('.'):
+# Route each document to the exported type for its top-level key ("catalog", "system-security-plan", ...)
+index = RootIndex(SCHEMA_DIR)
+print(f'{SCHEMA_DIR}:\n' + '\n'.join(f'{k:>25}: {r.schema} {r.type}' for k, r in index.routes.items()))
+
+start = time.perf_counter()
+counts = {'pass': 0, 'fail': 0, 'unrouted': 0}
+for f in sorted(os.scandir(DATA_DIR), key=lambda f: f.name):
     if os.path.splitext(fn := f.name)[1] == '.json':
-        print(fn)
-        with open(fn, encoding='utf-8') as fd:
-            file = json.load(fd)
-        try:
-            codec.encode('Oscal', file)
-        except ValueError as e:
-            print(f'  ### {e}')
\ No newline at end of file
+        with open(f.path, encoding='utf-8') as fd:
+            try:
+                route, err = index.validate(json.load(fd))
+            except ValueError as e:
+                route, err = None, f'Bad JSON: {e}'
+        counts['pass' if not err else 'fail' if route else 'unrouted'] += 1
+        print(f'{fn}: {route.type if route else "-"}' + (f'\n  ### {err}' if err else ''))
+print(f'{", ".join(f"{k}: {v}" for k, v in counts.items())}, {time.perf_counter() - start:.3f} sec')
@@ -1,14 +1,23 @@
 """
 Translate JADN to XML Abstract Schema Definition (XASD) format
+
+xasd_dump writes each type definition to the output file as it is generated, and xasd_load
+reads type definitions one at a time with iterparse, so neither holds the XML tree in memory.
 """
 
 import jadn
+import re
+from io import BytesIO
 from lxml import etree
 from datetime import datetime
-from typing import NoReturn, TextIO, Tuple, Union
+from typing import BinaryIO, NoReturn, TextIO, Tuple, Union
 from jadn.definitions import TypeName, BaseType, TypeOptions, TypeDesc, Fields
 from jadn.definitions import ItemID, ItemValue, ItemDesc
 from jadn.definitions import FieldID, FieldName, FieldType, FieldOptions, FieldDesc
+from jadn.definitions import TYPE_OPTIONS, FIELD_OPTIONS, OPTION_ID, DEFAULT_CONFIG
+
+OPTIONS = {v[0]: v for v in (*TYPE_OPTIONS.values(), *FIELD_OPTIONS.values())}     # Option name: (name, convert, order)
+FLAGS = {k for k, (_, f, _) in OPTIONS.items() if f not in (int, float) and f('') is True}   # Options without a value
 
 
 def xasd_style() -> dict:
@@ -16,71 +25,144 @@ def xasd_style() -> dict:
     return {}
 
 
-def xasd_dumps(schema: dict, style: dict = None) -> str:
+def opts_attr(olist: list) -> dict:
     """
-    Convert JADN schema to XASD
+    Convert an option list to XML attributes, in option list order
     """
-    def set_attr(e: etree.Element, at: dict):
-        [e.set(k, str(v)) for k, v in at.items() if not isinstance(v, str) or len(v)]
+    opts = {**TYPE_OPTIONS, **FIELD_OPTIONS}
+    return {(o := opts[ord(s[0])])[0]: str(o[1](s[1:])) for s in olist}
+
 
+def attr_opts(attrib: dict, skip: Tuple[str, ...] = ()) -> list:
+    """
+    Convert XML option attributes to an option list, ignoring structural attributes in skip
+    """
+    olist = []
+    for k, v in attrib.items():
+        if k in OPTIONS and k not in skip:
+            olist.append(OPTION_ID[k] + ('' if k in FLAGS else v))
+    return olist
+
+
+def _text_attr(e: etree.Element, at: dict):
+    [e.set(k, str(v)) for k, v in at.items() if not isinstance(v, str) or len(v)]
+
+
+def info_element(info: dict) -> etree.Element:
+    ie = etree.Element('Info')
+    _text_attr(ie, {k: v for k, v in info.items() if isinstance(v, str)})
+    ns = info.get('namespaces', {})
+    for prefix, uri in ns.items() if isinstance(ns, dict) else ns:
+        etree.SubElement(ie, 'namespace', attrib={'prefix': prefix, 'uri': uri})
+    for name in info.get('exports', []):
+        etree.SubElement(ie, 'export', attrib={'name': name})
+    for name, value in info.get('config', {}).items():
+        etree.SubElement(ie, 'config', attrib={'name': name, 'value': str(value)})
+    return ie
+
+
+def type_element(td: list) -> etree.Element:
+    te = etree.Element(td[BaseType], attrib={'name': td[TypeName]})
+    _text_attr(te, opts_attr(td[TypeOptions]))
+    _text_attr(te, {'description': td[TypeDesc]})
+    if td[BaseType] == 'Enumerated':
+        for item in td[Fields]:
+            fe = etree.SubElement(te, 'item', attrib={'id': str(item[ItemID]), 'value': item[ItemValue]})
+            _text_attr(fe, {'description': item[ItemDesc]})
+    elif jadn.definitions.has_fields(td[BaseType]):
+        for field in td[Fields]:
+            fe = etree.SubElement(te, 'field', attrib={
+                'id': str(field[FieldID]),
+                'name': field[FieldName],
+                'type': field[FieldType]})
+            _text_attr(fe, opts_attr(field[FieldOptions]))
+            _text_attr(fe, {'description': field[FieldDesc]})
+    return te
+
+
+def _write(schema: dict, out: BinaryIO, source: str, style: dict) -> NoReturn:
     w = xasd_style()
     if style:
         w.update(style)
 
     exports = schema.get('info', {}).get('exports', [])
-    root = exports[0] if len(exports) == 1 else 'Root'
-
-    xasd = etree.Element(root)
-    if 'info' in schema:
-        xasd.append(info := etree.Element('Info'))
-        # for info in schema['info']:
-        #
-    xasd.append(types := etree.Element('Types'))
-
-    for td in schema['types']:
-        te = etree.Element(td[BaseType], attrib={'name': td[TypeName]})
-        set_attr(te, jadn.topts_s2d(td[TypeOptions]))
-        set_attr(te, {'description': td[TypeDesc]})
-        if td[BaseType] == 'Enumerated':
-            for item in td[Fields]:
-                fe = etree.Element('item', attrib={
-                    'id': str(item[ItemID]),
-                    'value': item[ItemValue]})
-                set_attr(fe, {'description': item[ItemDesc]})
-                te.append(fe)
-        elif jadn.definitions.has_fields(td[BaseType]):
-            for field in td[Fields]:
-                fe = etree.Element('field', attrib={
-                    'id': str(field[FieldID]),
-                    'name': field[FieldName],
-                    'type': field[FieldType]})
-                fto, fo = jadn.ftopts_s2d(field[FieldOptions])
-                set_attr(fe, fto)
-                set_attr(fe, fo)
-                set_attr(fe, {'description': field[FieldDesc]})
-                te.append(fe)
-        types.append(te)
-
-    return etree.tostring(xasd, pretty_print=True).decode()
+    root = exports[0] if len(exports) == 1 and re.fullmatch(r'[A-Za-z_][-.\w]*', exports[0]) else 'Root'
+    if source:
+        out.write(f'<!-- Generated from {source}, {datetime.ctime(datetime.now())} -->\n\n'.encode())
+    with etree.xmlfile(out, encoding='utf-8') as xf:
+        with xf.element(root):
+            if 'info' in schema:
+                etree.indent(ie := info_element(schema['info']), '  ', level=1)
+                xf.write('\n  ', ie)
+            xf.write('\n  ')
+            with xf.element('Types'):
+                for td in schema['types']:
+                    etree.indent(te := type_element(td), '  ', level=2)
+                    xf.write('\n    ', te)
+                xf.write('\n  ')
+            xf.write('\n')
+    out.write(b'\n')
+
+
+def xasd_dumps(schema: dict, style: dict = None) -> str:
+    """
+    Convert JADN schema to XASD
+    """
+    _write(schema, buf := BytesIO(), '', style)
+    return buf.getvalue().decode()
 
 
 def xasd_dump(schema: dict, fname: Union[bytes, str, int], source='', style=None) -> NoReturn:
-    with open(fname, 'w', encoding='utf8') as f:
-        if source:
-            f.write(f'<!-- Generated from {source}, {datetime.ctime(datetime.now())} -->\n\n')
-        f.write(xasd_dumps(schema, style))
+    with open(fname, 'wb') as f:
+        _write(schema, f, source, style)
 
 
-def xasd_loads(doc: str) -> dict:
+def info_value(ie: etree.Element) -> dict:
+    info = dict(ie.attrib)
+    if ns := {e.get('prefix'): e.get('uri') for e in ie.iter('namespace')}:
+        info['namespaces'] = ns
+    if exports := [e.get('name') for e in ie.iter('export')]:
+        info['exports'] = exports
+    if config := {e.get('name'): e.get('value') for e in ie.iter('config')}:
+        info['config'] = {k: type(DEFAULT_CONFIG.get(k, ''))(v) for k, v in config.items()}
+    return info
+
+
+def type_value(te: etree.Element) -> list:
+    fields = []
+    for fe in te:
+        if fe.tag == 'item':
+            fields.append([int(fe.get('id')), fe.get('value'), fe.get('description', '')])
+        elif fe.tag == 'field':
+            fields.append([int(fe.get('id')), fe.get('name'), fe.get('type'), attr_opts(fe.attrib, ('id', 'name', 'type')), fe.get('description', '')])
+    return [te.get('name'), te.tag, attr_opts(te.attrib), te.get('description', ''), fields]
+
+
+def xasd_load(fp: Union[str, BinaryIO, TextIO]) -> dict:
+    """
+    Read an XASD document incrementally, clearing each element once it has been converted
+    """
     info = {}
     types = []
-    xasd = etree.fromstring(doc)
+    fp = getattr(fp, 'buffer', fp)      # iterparse reads bytes
+    for event, e in etree.iterparse(fp, events=('end',), remove_comments=True):
+        if (parent := e.getparent()) is None:
+            continue
+        if e.tag == 'Info' and parent.getparent() is None:
+            info = info_value(e)
+        elif parent.tag == 'Types' and parent.getparent().getparent() is None:
+            types.append(type_value(e))
+        else:
+            continue
+        e.clear()
+        while e.getprevious() is not None:
+            del parent[0]
 
     return jadn.core.check({'info': info, 'types': types} if info else {'types': types})
 
 
-def xasd_load(fp: TextIO) -> dict:
-    return xasd_loads(fp.read())
+def xasd_loads(doc: str) -> dict:
+    return xasd_load(BytesIO(doc.encode()))
 
 
 __all__ = [
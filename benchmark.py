@@ -0,0 +1,313 @@
+"""
+Benchmark JADN schema processing and data validation across the Schemas, Data and Test folders
+
+    benchmark.py run [--output bench.json] [--repeat 5] [--scale 1,10,100]
+    benchmark.py compare <baseline.json> <current.json> [--threshold 0.2] [--min_time 0.001]
+    benchmark.py scale [--target catalog] [--factors 1,10,100] [--seed <document>]
+
+Each measurement is repeated and its minimum and median times are saved, keyed by operation and file,
+so results from different JADN versions or machines can be compared.
+"""
+import compiled_schema
+import copy
+import fire
+import glob
+import jadn
+import json
+import jsonschema
+import os
+import platform
+import re
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Iterable
+
+SCHEMA_DIRS = ('Schemas', 'Test')
+DOCUMENTS = (       # Schema, type, data file.  No OSCAL catalog: its \p{} patterns are not supported by Python re
+    ('Schemas/Extras/checksums.jidl', 'Checksums', 'Data/checksums.json'),
+    ('Schemas/Extras/container.jidl', 'Teams', 'Data/container.jsonld'),
+    ('Schemas/Extras/stix-ex-3.10.jidl', 'Obj', 'Data/stix-ex.json'),
+)
+SCALERS = {         # Synthetic document: schema, type, seed document, keys of the lists to replicate
+    'catalog': ('Schemas/Metaschema/oscal_catalog_1.1.0.jadn', '$Root', 'Data/OSCAL/benchmark-catalog.json', ('controls',)),
+    'sbom': ('Schemas/CycloneDX/cyclonedx-v1.3.jidl', 'BOM', '', ('components',)),     # No SBOM in Data, use --seed
+    'checksums': ('Schemas/Extras/checksums.jidl', 'Checksums', 'Data/checksums.json', ('checksums1', 'checksums2')),
+}
+TEST_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+PATTERN_CLASSES = {r'\p{L}': r'[^\W\d_]', r'\p{N}': r'\d'}    # Unicode property classes Python re lacks
+
+
+def measure(fn: Callable, repeat: int) -> dict:
+    """
+    Call fn repeat times, return the minimum and median elapsed seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'n': repeat}
+
+
+def schema_files() -> list:
+    return sorted(f for d in SCHEMA_DIRS for f in glob.glob(os.path.join(d, '**', '*.*'), recursive=True)
+                  if os.path.splitext(f)[1] in ('.jadn', '.jidl', '.html'))
+
+
+def load_schema(path: str) -> dict:
+    with open(path, encoding='utf-8') as fp:
+        return jadn.load_any(fp)
+
+
+def bench_schema(path: str, repeat: int) -> dict:
+    """
+    Time load (parse and check), check, analyze, compile and Codec construction for one schema
+    """
+    try:
+        schema = load_schema(path)
+    except (ValueError, KeyError, IndexError, jsonschema.ValidationError) as e:
+        return {f'load {path}': {'error': str(e)}}
+    return {
+        f'load {path}': measure(lambda: load_schema(path), repeat),
+        f'check {path}': measure(lambda: jadn.check(schema), repeat),
+        f'analyze {path}': measure(lambda: jadn.analyze(schema), repeat),
+        f'compile {path}': measure(lambda: compiled_schema.CompiledSchema(schema), repeat),
+        f'codec {path}': measure(lambda: jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True), repeat),
+    }
+
+
+def decode_all(codec: jadn.codec.Codec, type_name: str, docs: list) -> list:
+    """
+    Decode each document, return its API value, or None if it is invalid
+    """
+    values = []
+    for doc in docs:
+        try:
+            values.append(codec.decode(type_name, doc))
+        except (ValueError, re.error):     # Schema patterns may use regex syntax unsupported by Python
+            values.append(None)
+    return values
+
+
+def encode_all(codec: jadn.codec.Codec, type_name: str, values: list) -> int:
+    """
+    Encode each API value, return the number that could not be encoded
+    """
+    errors = 0
+    for v in values:
+        try:
+            codec.encode(type_name, v)
+        except (ValueError, TypeError, re.error):
+            errors += 1
+    return errors
+
+
+def bench_documents(key: str, codec: jadn.codec.Codec, type_name: str, docs: list, repeat: int) -> dict:
+    """
+    Time decoding a list of documents and encoding the valid ones back
+    """
+    values = decode_all(codec, type_name, docs)
+    valid = [v for v in values if v is not None]
+    size = sum(len(json.dumps(d)) for d in docs)
+    result = {f'decode {key}': {**measure(lambda: decode_all(codec, type_name, docs), repeat),
+                                'items': len(docs), 'invalid': len(docs) - len(valid), 'bytes': size}}
+    if valid:
+        result[f'encode {key}'] = {**measure(lambda: encode_all(codec, type_name, valid), repeat),
+                                   'items': len(valid), 'invalid': encode_all(codec, type_name, valid)}
+    return result
+
+
+def document_sets() -> Iterable[tuple]:
+    """
+    Yield (key, schema path, type, documents) for each data file and each Test device folder
+    """
+    for sc, tn, path in DOCUMENTS:
+        with open(path, encoding='utf-8') as fp:
+            yield path, sc, tn, [json.load(fp)]
+    for device in sorted(glob.glob(os.path.join('Test', '*', ''))):
+        if not (schemas := sorted(glob.glob(os.path.join(device, '*.jadn')) + glob.glob(os.path.join(device, '*.jidl')))):
+            continue
+        for cr, tn in TEST_TYPES.items():
+            docs = []
+            for f in sorted(glob.glob(os.path.join(device, f'Good-{cr}', '*.json'))):
+                with open(f, encoding='utf-8') as fp:
+                    try:
+                        docs.append(json.load(fp))
+                    except ValueError:
+                        pass
+            if docs:
+                yield os.path.join(device, f'Good-{cr}'), schemas[0], tn, docs
+
+
+def replicate(doc: dict, keys: tuple, n: int) -> dict:
+    """
+    Return a copy of doc with every list under one of keys repeated n times, renaming ids so they stay unique
+    """
+    def rename(v, i: int):
+        stack = [v]
+        while stack:
+            if isinstance(x := stack.pop(), dict):
+                for k, y in x.items():
+                    if k == 'uuid' and isinstance(y, str):
+                        x[k] = str(uuid.uuid5(uuid.NAMESPACE_URL, f'{y}/{i}'))
+                    elif k == 'id' and isinstance(y, str):
+                        x[k] = f'{y}-{i}'
+                    else:
+                        stack.append(y)
+            elif isinstance(x, list):
+                stack += x
+        return v
+
+    doc = copy.deepcopy(doc)
+    stack = [doc]
+    while stack:
+        if isinstance(x := stack.pop(), dict):
+            for k, y in x.items():
+                if k in keys and isinstance(y, list):
+                    x[k] = y + [rename(copy.deepcopy(item), i) for i in range(1, n) for item in y]
+                stack.append(y)
+        elif isinstance(x, list):
+            stack += x
+    return doc
+
+
+def longest_list(doc) -> int:
+    n, stack = 0, [doc]
+    while stack:
+        if isinstance(x := stack.pop(), dict):
+            stack += x.values()
+        elif isinstance(x, list):
+            n = max(n, len(x))
+            stack += x
+    return n
+
+
+def scale_schema(schema: dict, max_elements: int) -> dict:
+    """
+    Return a copy of schema for synthetic documents: $MaxElements raised to at least max_elements, and
+    \\p{L} and \\p{N} in patterns replaced by Python re equivalents
+    """
+    def pattern(opt: str) -> str:
+        return re.sub(r'\\p\{[LN]\}', lambda m: PATTERN_CLASSES[m.group()], opt) if opt.startswith('%') else opt
+
+    info = schema.get('info', {})
+    config = {**info.get('config', {})}
+    config['$MaxElements'] = max(config.get('$MaxElements', jadn.definitions.DEFAULT_CONFIG['$MaxElements']), max_elements)
+    return {'info': {**info, 'config': config},
+            'types': [[td[0], td[1], [pattern(o) for o in td[2]], *td[3:]] for td in schema['types']]}
+
+
+def bench_scale(target: str, factors: list, repeat: int, seed: str = '') -> dict:
+    """
+    Time decoding a synthetic document built by replicating a seed document's lists each factor times.
+    The schema's element limit is raised to fit the largest factor.  Raise ValueError if the seed is not valid;
+    factors whose document is not valid are reported and skipped, so only decodes of valid documents are timed.
+    """
+    sc, tn, path, keys = SCALERS[target]
+    if not (path := seed or path):
+        print(f'{target}: no seed document')
+        return {}
+    with open(path, encoding='utf-8') as fp:
+        seed = json.load(fp)
+    schema = scale_schema(load_schema(sc), longest_list(seed) * max(factors))
+    codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True)
+    try:
+        codec.decode(tn, seed)
+    except (ValueError, re.error) as e:
+        raise ValueError(f'{target}: seed {path} is not a valid {tn}: {e}')
+    results = {}
+    for n in factors:
+        doc = replicate(seed, keys, n)
+        try:
+            codec.decode(tn, doc)
+        except (ValueError, re.error) as e:
+            print(f'{target} x{n:<6} skipped, not a valid {tn}: {str(e)[:200]}')
+            continue
+        r = bench_documents(f'{target} x{n}', codec, tn, [doc], repeat)
+        results.update(r)
+        d = r[f'decode {target} x{n}']
+        print(f'{target} x{n:<6} {d["bytes"]:>12,} bytes {d["min"]:>10.4f} sec')
+    return results
+
+
+def factor_list(factors) -> list:
+    return [int(f) for f in (factors if isinstance(factors, (list, tuple)) else str(factors).split(','))]
+
+
+def run(output: str = '', repeat: int = 5, scale: str = '1,10,100') -> None:
+    """
+    Benchmark every schema, data file and Test device, save results as JSON
+    """
+    print(f'Installed JADN version: {jadn.__version__}\n')
+    results = {}
+    for path in schema_files():
+        results.update(r := bench_schema(path, repeat))
+        print(f'{path:<70}', f'{r[f"load {path}"]["min"]:.4f} sec' if 'min' in r[f'load {path}'] else 'error')
+    for key, sc, tn, docs in document_sets():
+        try:
+            codec = jadn.codec.Codec(load_schema(sc), verbose_rec=True, verbose_str=True)
+        except (ValueError, KeyError, IndexError, jsonschema.ValidationError) as e:
+            results[f'decode {key}'] = {'error': str(e)}
+            continue
+        results.update(r := bench_documents(key, codec, tn, docs, repeat))
+        print(f'{key:<70} {r[f"decode {key}"]["min"]:.4f} sec, {r[f"decode {key}"]["invalid"]} invalid')
+    for target in SCALERS:
+        try:
+            results.update(bench_scale(target, factor_list(scale), repeat))
+        except ValueError as e:
+            print(f'### {e}')
+            results[f'decode {target} x1'] = {'error': str(e)}
+
+    bench = {'jadn': jadn.__version__, 'python': platform.python_version(), 'platform': platform.platform(),
+             'date': datetime.now().isoformat(timespec='seconds'), 'results': results}
+    with open(output := output or f'bench-{jadn.__version__}.json', 'w', encoding='utf-8') as fp:
+        json.dump(bench, fp, indent=2)
+    print(f'\n{len(results)} measurements saved to {output}')
+
+
+def compare(baseline: str, current: str, threshold: float = 0.2, min_time: float = 0.001, stat: str = 'min') -> None:
+    """
+    Compare two saved runs, list measurements that are slower than baseline by more than threshold.
+    Measurements shorter than min_time seconds in both runs are too noisy to compare and are not listed.
+    """
+    with open(baseline, encoding='utf-8') as fp:
+        base = json.load(fp)
+    with open(current, encoding='utf-8') as fp:
+        cur = json.load(fp)
+    print(f'Baseline: JADN {base["jadn"]}, Python {base["python"]}, {base["date"]}')
+    print(f' Current: JADN {cur["jadn"]}, Python {cur["python"]}, {cur["date"]}\n')
+    regressions = []
+    for key, b in base['results'].items():
+        if stat not in b or stat not in (c := cur['results'].get(key, {})):
+            if stat in b:
+                print(f'{"missing":>8} {key}: {c.get("error", "not measured")}')
+            continue
+        ratio = c[stat] / b[stat] if b[stat] else 1.0
+        if ratio > 1 + threshold and max(b[stat], c[stat]) >= min_time:
+            regressions.append((ratio, key, b[stat], c[stat]))
+    for ratio, key, b, c in sorted(regressions, reverse=True):
+        print(f'{ratio:>7.2f}x {key}: {b:.4f} -> {c:.4f} sec')
+    common = [k for k, b in base['results'].items() if stat in b and stat in cur['results'].get(k, {})]
+    total = [sum(r['results'][k][stat] for k in common) for r in (base, cur)]
+    print(f'\n{len(regressions)} of {len(common)} measurements slower by more than {threshold:.0%}, '
+          f'total {total[0]:.3f} -> {total[1]:.3f} sec')
+    if regressions:
+        raise SystemExit(1)
+
+
+def scale(target: str = 'catalog', factors: str = '1,10,100,1000', repeat: int = 3, seed: str = '') -> None:
+    """
+    Print decode time for a synthetic document at each replication factor
+    """
+    print(f'Installed JADN version: {jadn.__version__}\n')
+    try:
+        bench_scale(target, factor_list(factors), repeat, seed)
+    except ValueError as e:
+        print(f'### {e}')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    fire.Fire({'run': run, 'compare': compare, 'scale': scale})
@@ -0,0 +1,57 @@
+"""
+Validate one OpenC2 message against a device schema, e.g. from a shell hook
+
+    check-message.py Test/device-slpf/device-slpf.jadn command.json [--type_name response]
+
+Prints the verdict and exits with status 1 if the message is invalid.  The checked schema and the verdict are
+read from the schema and verdict caches when available, so a message that has been checked before is
+validated without importing jadn or building a Codec.
+"""
+import json
+import schema_cache
+import sys
+import verdict_cache
+
+MESSAGE_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+
+
+def check(schema: str, message: str = '-', type_name: str = 'command', no_cache: bool = False) -> bool:
+    """
+    Validate one message file ('-' for stdin) against a schema file, print the verdict, return True if valid
+
+    type_name is 'command', 'response' or a type name.
+    """
+    with open(schema, encoding='utf-8') as fp:
+        sc = schema_cache.load_any(fp)
+    if message == '-':
+        doc = sys.stdin.buffer.read()
+    else:
+        with open(message, 'rb') as fp:
+            doc = fp.read()
+    tn = MESSAGE_TYPES.get(type_name, type_name)
+    if tn not in {td[0] for td in sc['types']}:
+        raise ValueError(f'{schema}: unknown type "{type_name}"')
+    verdicts = '' if no_cache else verdict_cache.CACHE_DIR
+    key = verdict_cache.cache_key(doc, verdict_cache.schema_digest(sc), tn) if verdicts else ''
+    if hit := verdicts and verdict_cache.get(key, verdicts):
+        err = hit[1]
+    else:
+        import jadn         # Only needed if the verdict is not cached
+        try:
+            jadn.codec.Codec(sc, verbose_rec=True, verbose_str=True).decode(tn, json.loads(doc))
+            err = ''
+        except ValueError as e:     # Includes JSONDecodeError
+            err = str(e)
+        if verdicts:
+            verdict_cache.put(key, not err, err, verdicts)
+    print(f'{message}: {tn} {"invalid: " + err if err else "valid"}{" (cached verdict)" if hit else ""}')
+    return not err
+
+
+if __name__ == '__main__':
+    import fire
+    try:
+        sys.exit(0 if fire.Fire(check, serialize=lambda _: None) else 1)     # Exit status, not a printed result
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        sys.exit(1)
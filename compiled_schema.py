@@ -0,0 +1,141 @@
+"""
+Compact, indexed in-memory form of a checked JADN schema
+
+Tools that work on the list-of-lists schema find types and fields by scanning schema['types'] and
+td[Fields] and re-parse option strings each time they are used.  CompiledSchema converts a schema once
+into __slots__ records with interned names, a name -> type index, per-type field id and name indexes,
+and options parsed with jadn.topts_s2d / ftopts_s2d.  Types without fields and types and fields without
+options share one empty dict.
+
+CompiledSchema is a read-only Mapping with 'info' and 'types' keys, so helpers that expect a schema dict
+can take it unchanged; schema['types'] builds the list of type definitions on first access and returns
+the same list after that, so it must not be modified.  Use as_dict() to pass the schema to jadn library
+functions.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Iterator, Optional, Union
+from jadn.definitions import (TypeName, BaseType, TypeOptions, TypeDesc, Fields, ItemValue, ItemDesc,
+                              FieldID, FieldName, FieldType, FieldOptions, FieldDesc)
+from jadn.utils import topts_s2d, ftopts_s2d
+
+EMPTY = {}          # Shared by all types and fields without options or fields, must not be modified
+
+
+def _intern(s: str) -> str:
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+def _options(olist: list) -> tuple:
+    return tuple(_intern(o) for o in olist)
+
+
+class FieldDef:
+    """
+    Field of a compound type, or item of an Enumerated type (name is the item value, type is '')
+    """
+    __slots__ = ('id', 'name', 'type', 'options', 'fopts', 'topts', 'desc')
+
+    def __init__(self, fd: list, enum: bool):
+        self.id = fd[FieldID]
+        if enum:
+            self.name, self.type, self.options, self.desc = _intern(fd[ItemValue]), '', (), fd[ItemDesc]
+            self.fopts = self.topts = EMPTY
+        else:
+            self.name, self.type, self.desc = _intern(fd[FieldName]), _intern(fd[FieldType]), fd[FieldDesc]
+            self.options = _options(fd[FieldOptions])
+            fo, to = ftopts_s2d(self.options) if self.options else (EMPTY, EMPTY)
+            self.fopts, self.topts = fo or EMPTY, to or EMPTY
+
+    def to_list(self) -> list:
+        if not self.type:
+            return [self.id, self.name, self.desc]
+        return [self.id, self.name, self.type, list(self.options), self.desc]
+
+
+class TypeDef:
+    __slots__ = ('name', 'base_type', 'options', 'topts', 'desc', 'fields', 'by_id', 'by_name')
+
+    def __init__(self, td: list):
+        self.name, self.base_type, self.desc = _intern(td[TypeName]), _intern(td[BaseType]), td[TypeDesc]
+        self.options = _options(td[TypeOptions])
+        self.topts = topts_s2d(self.options) or EMPTY
+        enum = self.base_type == 'Enumerated'
+        self.fields = tuple(FieldDef(fd, enum) for fd in td[Fields]) if len(td) > Fields else ()
+        self.by_id = {f.id: f for f in self.fields} if self.fields else EMPTY
+        self.by_name = {f.name: f for f in self.fields} if self.fields else EMPTY
+
+    def field(self, key: Union[int, str]) -> Optional[FieldDef]:
+        """
+        Return a field (or Enumerated item) by id or name, or None
+        """
+        return self.by_id.get(key) if isinstance(key, int) else self.by_name.get(key)
+
+    def to_list(self) -> list:
+        return [self.name, self.base_type, list(self.options), self.desc, [f.to_list() for f in self.fields]]
+
+
+class CompiledSchema(Mapping):
+    __slots__ = ('info', 'types', '_type_list')
+
+    def __init__(self, schema: dict):
+        self.info = schema.get('info')
+        self.types = {}         # Type name -> TypeDef, in schema order
+        self._type_list = None  # List-of-lists type definitions, built on first use
+        for td in schema['types']:
+            t = TypeDef(td)
+            self.types[t.name] = t
+
+    def type(self, name: str) -> Optional[TypeDef]:
+        return self.types.get(name)
+
+    def field(self, type_name: str, key: Union[int, str]) -> Optional[FieldDef]:
+        """
+        Return a field of a type by field id or name, or None
+        """
+        return t.field(key) if (t := self.types.get(type_name)) else None
+
+    def as_dict(self) -> dict:
+        """
+        Return the schema as a list-of-lists dict
+        """
+        types = [t.to_list() for t in self.types.values()]
+        return {'info': self.info, 'types': types} if self.info is not None else {'types': types}
+
+    def __getitem__(self, key: str):
+        if key == 'types':
+            if self._type_list is None:
+                self._type_list = [t.to_list() for t in self.types.values()]
+            return self._type_list
+        if key == 'info' and self.info is not None:
+            return self.info
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('info', 'types') if self.info is not None else ('types',))
+
+    def __len__(self) -> int:
+        return 2 if self.info is not None else 1
+
+
+def compile_schema(schema: Union[dict, CompiledSchema]) -> CompiledSchema:
+    """
+    Return a CompiledSchema for a checked schema, or the schema itself if it is already compiled
+    """
+    return schema if isinstance(schema, CompiledSchema) else CompiledSchema(schema)
+
+
+def as_dict(schema: Union[dict, CompiledSchema]) -> dict:
+    """
+    Return a list-of-lists schema for a schema in either form
+    """
+    return schema.as_dict() if isinstance(schema, CompiledSchema) else schema
+
+
+__all__ = [
+    'CompiledSchema',
+    'FieldDef',
+    'TypeDef',
+    'as_dict',
+    'compile_schema'
+]
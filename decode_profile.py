@@ -0,0 +1,107 @@
+"""
+Per-type profile of JADN Codec decoding
+
+Codec decoders call codec.decode() for each field and element they contain, so replacing decode on a
+Codec instance sees every type-level call.  DecodeProfile records call count, cumulative and self time,
+and instance size (elements of an array or object, characters of a string) for each type name, and
+self time for each type call stack, written in the collapsed-stack format read by flamegraph.pl and
+speedscope:  Root;Type;Type;Type <microseconds>
+"""
+import time
+from collections import defaultdict
+from typing import Any, TextIO
+from jadn.codec import Codec
+
+PROFILE_FILE = 'decode-profile.folded'      # Default collapsed-stack output file
+
+
+class TypeStats:
+    __slots__ = ('calls', 'cum', 'self', 'size', 'max_size')
+
+    def __init__(self):
+        self.calls = 0
+        self.cum = 0.0          # Seconds, counted once for recursive calls
+        self.self = 0.0         # Seconds, excluding nested type calls
+        self.size = 0
+        self.max_size = 0
+
+
+def instance_size(val: Any) -> int:
+    return len(val) if isinstance(val, (dict, list, str, bytes)) else 1
+
+
+class DecodeProfile:
+    """
+    Attach to one or more Codecs, then print a table or write collapsed stacks
+    """
+    def __init__(self):
+        self.types = defaultdict(TypeStats)     # {type name: TypeStats}
+        self.stacks = defaultdict(float)        # {collapsed stack: self seconds}
+        self._stack = []                        # Active type names
+        self._child = []                        # Time spent in nested calls of each active call
+        self._active = defaultdict(int)         # Active calls per type, to avoid double counting recursion
+
+    def attach(self, codec: Codec, root: str = '') -> Codec:
+        """
+        Profile all decodes by codec, with stacks optionally rooted at a label such as a schema name
+        """
+        decode = type(codec).decode.__get__(codec)
+
+        def profiled_decode(datatype: str, sval: Any) -> Any:
+            self._stack.append(datatype)
+            self._child.append(0.0)
+            self._active[datatype] += 1
+            start = time.perf_counter()
+            try:
+                return decode(datatype, sval)
+            finally:
+                elapsed = time.perf_counter() - start
+                child = self._child.pop()
+                if self._child:
+                    self._child[-1] += elapsed
+                ts = self.types[datatype]
+                ts.calls += 1
+                ts.self += elapsed - child
+                ts.size += (size := instance_size(sval))
+                ts.max_size = max(ts.max_size, size)
+                if (n := self._active[datatype] - 1) == 0:
+                    ts.cum += elapsed
+                self._active[datatype] = n
+                self.stacks[';'.join(([root] if root else []) + self._stack)] += elapsed - child
+                self._stack.pop()
+
+        codec.decode = profiled_decode
+        return codec
+
+    def print_table(self, limit: int = 30) -> None:
+        total = sum(t.self for t in self.types.values())
+        print(f'\n{"type":<40} {"calls":>9} {"cum sec":>9} {"self sec":>9} {"self %":>7} {"avg size":>9} {"max size":>9}')
+        for name, t in sorted(self.types.items(), key=lambda x: -x[1].self)[:limit]:
+            print(f'{name:<40} {t.calls:>9} {t.cum:>9.4f} {t.self:>9.4f} {100 * t.self / total if total else 0:>6.1f}%'
+                  f' {t.size / t.calls:>9.1f} {t.max_size:>9}')
+        if len(self.types) > limit:
+            print(f'  ... {len(self.types) - limit} more types')
+
+    def dump_stacks(self, fp: TextIO) -> None:
+        for stack, sec in sorted(self.stacks.items()):
+            if us := round(sec * 1e6):
+                fp.write(f'{stack} {us}\n')
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as fp:
+            self.dump_stacks(fp)
+        print(f'Collapsed stacks written to {path}')
+
+
+def profile_path(profile) -> str:
+    """
+    Return the collapsed-stack file for a --profile option value: a file name, or True for the default
+    """
+    return PROFILE_FILE if profile is True else str(profile) if profile else ''
+
+
+__all__ = [
+    'DecodeProfile',
+    'PROFILE_FILE',
+    'profile_path'
+]
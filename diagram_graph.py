@@ -0,0 +1,166 @@
+"""
+Entity Relationship Diagram model built once per schema and rendered in every diagram variant
+
+jadn.convert.diagram_dumps walks the schema and rebuilds its type/link graph for each combination of
+format (graphviz, plantuml), detail (conceptual, logical, information) and attributes.  DiagramGraph
+extracts nodes, field rows and edges once, from the pre-parsed options of a CompiledSchema; diagram_dumps
+renders any variant from it, producing the same text as jadn.convert.diagram_dumps for the same style.
+"""
+from compiled_schema import CompiledSchema, FieldDef, TypeDef, compile_schema
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Union
+from jadn.convert import diagram_style
+from jadn.definitions import FIELD_OPTIONS, PRIMITIVE_TYPES
+from jadn.utils import multiplicity_str, jadn2typestr
+
+
+@dataclass
+class DiagramField:
+    id: int             # Field ID
+    name: str           # Field name (logical detail)
+    label: str          # Field name (information detail)
+    fdef: str           # Field type and multiplicity (information detail), None for Enumerated items
+
+
+@dataclass
+class DiagramEdge:
+    target: str         # Referenced type name
+    label: str          # Field name
+    mult: str           # Multiplicity at target end
+    link: bool          # Reference by link (dashed) rather than containment
+
+
+@dataclass
+class DiagramNode:
+    index: int          # Position in schema, used as node id
+    name: str
+    base_type: str
+    typestr: str        # Base type with options (information detail)
+    fields: List[DiagramField] = field(default_factory=list)
+    edges: List[DiagramEdge] = field(default_factory=list)
+
+    @property
+    def leaf(self) -> bool:
+        return self.base_type in PRIMITIVE_TYPES
+
+    @property
+    def attribute(self) -> bool:        # Shown only in diagrams with attributes
+        return self.base_type in (*PRIMITIVE_TYPES, 'Enumerated')
+
+
+def field_def(fd: FieldDef, td: TypeDef) -> tuple:
+    """
+    Return the (name, type, multiplicity) shown for a field, as jadn.utils.jadn2fielddef
+    """
+    fname = '' if td.base_type == 'Array' or 'id' in td.topts else fd.name
+    if td.base_type == 'Enumerated':
+        return fname, '', ''
+    fname += '/' if 'dir' in fd.fopts else ''
+    tf = ''
+    if tagid := fd.fopts.get('tagid', None):
+        tf = f'(TagId[{tf if (tf := td.by_id[tagid].name) else tagid}])'
+    ft = jadn2typestr(f'{fd.type}{tf}', [o for o in fd.options if ord(o[0]) not in FIELD_OPTIONS])
+    return fname, f'Key({ft})' if 'key' in fd.fopts else f'Link({ft})' if 'link' in fd.fopts else ft, multiplicity_str(fd.fopts)
+
+
+class DiagramGraph:
+    """
+    Nodes, field rows and edges of a schema, independent of diagram format and level of detail
+    """
+    def __init__(self, schema: Union[dict, CompiledSchema]):
+        schema = compile_schema(schema)
+        self.info = schema.info or {}
+        self.nodes = []
+        for k, td in enumerate(schema.types.values()):
+            node = DiagramNode(k, td.name, td.base_type, jadn2typestr(td.base_type, td.options))
+            if not node.leaf:
+                enum = td.base_type == 'Enumerated'
+                for n, t in (('key', td.topts.get('ktype')), ('value', td.topts.get('vtype'))):
+                    if t and not enum:
+                        node.edges.append(DiagramEdge(t, n, '1', False))
+                for fd in td.fields:
+                    fname, fdef, fmult = field_def(fd, td)
+                    node.fields.append(DiagramField(fd.id, fd.name, fname,
+                                                    None if enum else fdef + ('' if fmult == '1' else f' [{fmult}]')))
+                    if not enum:
+                        ft = fd.topts['vtype'] if fd.type in {'ArrayOf', 'MapOf'} else fd.type
+                        node.edges.append(DiagramEdge(ft, fd.name, multiplicity_str(fd.fopts), 'link' in fd.fopts))
+            self.nodes.append(node)
+
+    def projection(self, attributes: bool) -> dict:
+        """
+        Return {type name: node id} of the nodes shown with or without attributes
+        """
+        return {n.name: n.index for n in self.nodes if attributes or not n.attribute}
+
+
+def diagram_dumps(graph: DiagramGraph, style: dict = {}) -> str:
+    """
+    Render one diagram variant, equivalent to jadn.convert.diagram_dumps(schema, style)
+    """
+    s = diagram_style()
+    s.update(style)
+    gv = s['format'] == 'graphviz'
+    assert s['format'] in {'plantuml', 'graphviz'}
+    assert s['detail'] in {'conceptual', 'logical', 'information'}
+    comment, start, end = ('#', 'digraph G {', '}') if gv else ("'", '@startuml', '@enduml')
+
+    text = ''.join(f'{comment} {k}: {v}\n' for k, v in graph.info.items())
+    text += f'\n{start}\n  ' + '\n  '.join(s['header'][s['format']]) + '\n\n'
+    nodes = graph.projection(s['attributes'])
+    edges = ''
+    for node in graph.nodes:
+        if node.name not in nodes:
+            continue
+        nid = f'n{node.index}'
+        bt = f' : {node.typestr}' if s['detail'] == 'information' else ''
+        if node.leaf:
+            text += (f'{nid} [label=<<b>{node.name}{bt}</b>>, shape=ellipse, style=filled, fillcolor={s["attr_color"]}]\n\n'
+                     if gv else f'class "{node.name}{bt}" as {nid}\n')
+            continue
+        if gv:
+            color = f'fillcolor={s["attr_color"]}, ' if node.base_type == 'Enumerated' else ''
+            hr = '<hr/>' if s['detail'] in {'logical', 'information'} and node.fields else ''
+            text += (f'{nid} [{color}label=<<table cellborder="0" cellpadding="1" cellspacing="0">\n'
+                     f'<tr><td cellpadding="4"><b>  {node.name}{bt}  </b></td></tr>{hr}\n')
+        else:
+            text += f'class "{node.name}{bt}" as {nid}\n'
+        if s['detail'] != 'conceptual':
+            for f in node.fields:
+                if s['detail'] == 'logical':
+                    fval = f.name
+                else:
+                    fval = f'{f.id} {f.label}' + ('' if f.fdef is None else f' : {"" if gv else "{field} "}{f.fdef}')
+                text += f'  <tr><td align="left">  {fval}  </td></tr>\n' if gv else f'  {nid} : {fval}\n'
+        text += '</table>>]\n\n' if gv else '\n'
+        for e in node.edges:
+            if e.target in nodes:
+                edges += edge_dumps(s, nid, f'n{nodes[e.target]}', e)
+    return text + edges + end
+
+
+def edge_dumps(s: dict, src: str, dst: str, e: DiagramEdge) -> str:
+    if s['format'] == 'plantuml':
+        rel = ('.' if 'link_horizontal' in s else '..') if e.link else '--'
+        elabel = ' : ' + e.label if s['edge_label'] else ''
+        mult = f'"1" {rel}> "{e.mult}"' if s['edge_mult'] else f'{rel}>'
+        return f'  {src} {mult} {dst}{elabel}\n'
+    edge = [f'label={e.label}'] if s['edge_label'] else []
+    edge += ['style="dashed"'] if e.link else []
+    edge += [f'headlabel="{e.mult}", taillabel="1"'] if s['edge_mult'] else []
+    return f'  {src} -> {dst}' + (f' [{", ".join(edge)}]' if edge else '') + '\n'
+
+
+def diagram_dump(graph: DiagramGraph, fname: str, source: str = '', style: dict = {}) -> None:
+    with open(fname, 'w') as f:
+        if source:
+            f.write(f'\' Generated from {source}, {datetime.ctime(datetime.now())}"\n\n')
+        f.write(diagram_dumps(graph, style) + '\n')
+
+
+__all__ = [
+    'DiagramGraph',
+    'diagram_dump',
+    'diagram_dumps'
+]
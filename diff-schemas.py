@@ -0,0 +1,60 @@
+"""
+Compare two JADN schemas type by type.
+
+Schemas may be in any format supported by schema_cache, or the Markdown property tables in ProfileTables.
+Only types whose canonical hashes differ are compared field by field.
+"""
+
+import jadn
+import json
+import schema_cache
+import time
+from schema_diff import diff_schemas
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as fp:
+        return schema_cache.load_any(fp, markdown=True)
+
+
+def diff(old: str, new: str, descriptions: bool = True, json_out: bool = False) -> None:
+    """
+    Print the types and fields added, removed and changed from the old schema to the new one
+    """
+    start = time.perf_counter()
+    d = diff_schemas(load(old), load(new), descriptions)
+    elapsed = time.perf_counter() - start
+    if json_out:
+        print(json.dumps(d, indent=2))
+        return
+    print(f'--- {old}\n+++ {new}')
+    for k, (x, y) in d['info'].items():
+        print(f'info {k}:\n  - {x}\n  + {y}')
+    for tn in d['removed']:
+        print(f'- {tn}')
+    for tn in d['added']:
+        print(f'+ {tn}')
+    for tn, td in d['changed'].items():
+        print(f'~ {tn}')
+        for k in ('base_type', 'options', 'description'):
+            if k in td:
+                print(f'    {k}: {td[k][0]} -> {td[k][1]}')
+        if td.get('order'):
+            print('    field order changed')
+        for f in td.get('removed', []):
+            print(f'    - {f}')
+        for f in td.get('added', []):
+            print(f'    + {f}')
+        for fn, fd in td.get('changed', {}).items():
+            print(f'    ~ {fn}: ' + ', '.join(f'{k}: {x} -> {y}' for k, (x, y) in fd.items()))
+    print(f'\n{len(d["added"])} added, {len(d["removed"])} removed, {len(d["changed"])} changed, '
+          f'{d["unchanged"]} unchanged types ({elapsed:.3f} sec)')
+
+
+if __name__ == '__main__':
+    import fire
+    print(f'Installed JADN version: {jadn.__version__}\n')
+    try:
+        fire.Fire(diff)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
@@ -0,0 +1,510 @@
+"""
+Compile a JADN schema into a Python module of decode and encode functions specialized for its types
+
+jadn.codec.Codec interprets the schema: every value is dispatched through the symbol table to a generic
+function for its base type, which looks up type and field options as it goes.  generate() writes one function
+per type from a Codec's symbol table, with field names, options and size limits as constants, string patterns
+compiled once, and the checks of primitive, String, Integer, Number, Binary, Boolean and Enumerated fields inlined
+into the function of the containing type.  Each check raises the same ValueError message as the Codec, so
+generated decode() and encode() are drop-in replacements for the Codec's methods.
+
+Generated modules are cached in .jadn-cache/codecs (source and code object), keyed by a hash of the schema, the
+encoding mode, the JADN version and GENERATOR_VERSION.  GeneratedCodec(schema, verbose_rec, verbose_str) loads
+the module, generating it if it is not cached, and does not build a Codec when it is.
+"""
+import hashlib
+import importlib.util
+import jadn
+import marshal
+import os
+import schema_cache
+import types
+import verdict_cache
+from jadn.codec.format_serialize_json import _format_pass
+from jadn.codec.format_validate import _format_ok
+from jadn.definitions import FORMAT_JS_VALIDATE
+
+GENERATOR_VERSION = 1       # Increment when generated code changes
+CACHE_DIR = os.path.join(schema_cache.CACHE_DIR, 'codecs') if schema_cache.CACHE_DIR else ''
+INLINE = {'Binary', 'Boolean', 'Integer', 'Number', 'String', 'Enumerated'}    # Checks inlined into containing types
+MAGIC = importlib.util.MAGIC_NUMBER     # Python byte code version of cached code objects
+NUMBER_TYPES = {'Integer': ('numbers.Integral', 'int'), 'Number': ('numbers.Real', 'int', 'float')}
+
+HEADER = '''"""
+Generated by generated_codec.py version {version} from a JADN schema, JADN {jadn}, verbose_rec={verbose_rec},
+verbose_str={verbose_str}.  Do not edit.
+"""
+import jsonschema
+import numbers
+import re
+from jadn.codec.codec import fset
+from jadn.codec.format_serialize_json import json_format_codecs
+from jadn.codec.format_validate import format_validators
+
+_FV = format_validators()
+_FC = json_format_codecs()
+
+
+def _pattern(p):
+    try:
+        return re.compile(p).match
+    except re.error as e:       # Raised when used, as by the Codec
+        def fail(val, err=e):
+            raise err
+        return fail
+
+
+def _js_format(fmt):
+    """
+    Validate a JSON Schema string format as jsonschema.validate() does, without checking the schema on every call
+    """
+    schema = {{'type': 'string', 'format': fmt}}
+    validator = jsonschema.validators.validator_for(schema)(schema, format_checker=jsonschema.Draft7Validator.FORMAT_CHECKER)
+
+    def validate(val):
+        if (e := jsonschema.exceptions.best_match(validator.iter_errors(val))) is not None:
+            raise ValueError(e.message)
+        return val
+    return validate
+
+
+def _undefined(op, datatype):
+    def fail(val):
+        raise ValueError(f'Validation Error: {{op}}: datatype "{{datatype}}" is not defined')
+    return fail
+'''
+
+FOOTER = '''
+
+def decode(datatype, sval):
+    try:
+        fn = DECODE[datatype]
+    except KeyError:
+        raise ValueError(f'Validation Error: Decode: datatype "{datatype}" is not defined')
+    return fn(sval)
+
+
+def encode(datatype, aval):
+    try:
+        fn = ENCODE[datatype]
+    except KeyError:
+        raise ValueError(f'Validation Error: Encode: datatype "{datatype}" is not defined')
+    return fn(aval)
+'''
+
+
+def fstr(*parts) -> str:
+    """
+    Return an f-string expression from literal strings and [expression] lists
+    """
+    s = ''.join('{' + p[0] + '}' if isinstance(p, list) else p.replace('{', '{{').replace('}', '}}') for p in parts)
+    return 'f' + repr(s)
+
+
+def raise_value(*parts) -> str:
+    return f'raise ValueError({fstr(*parts)})'
+
+
+class _Generator:
+    """
+    Python source for the decode and encode functions of a Codec's symbol table
+    """
+    def __init__(self, codec: jadn.codec.Codec):
+        self.codec = codec
+        self.symtab = codec.symtab
+        self.names = {tn: i for i, tn in enumerate(self.symtab)}
+        self.consts = {}            # Source expression -> constant name
+        self.tables = []            # Choice tables, emitted after the functions they refer to
+        self.ntemp = 0
+
+    def const(self, expr: str, prefix: str = '_k') -> str:
+        if expr not in self.consts:
+            self.consts[expr] = f'{prefix}{len(self.consts)}'
+        return self.consts[expr]
+
+    def temp(self, name: str) -> str:
+        self.ntemp += 1
+        return f'{name}{self.ntemp}'
+
+    def format_function(self, fn, validate: bool) -> str:
+        """
+        Return the constant naming a format function of the Codec, or '' if it does nothing
+        """
+        if fn in (_format_pass, _format_ok):
+            return ''
+        if validate:
+            expr = next((f'_js_format({k!r})' if b == 'String' and k in FORMAT_JS_VALIDATE else f'_FV[{b!r}][{k!r}]' for b, t in self.codec.format_validate.items() for k, f in t.items() if f is fn), '')
+        else:
+            expr = next((f'_FC[{b!r}][{k!r}][{i}]' for b, t in self.codec.format_codec.items() for k, fs in t.items()
+                         for i, f in enumerate(fs) if f is fn), '')
+        if not expr:
+            raise ValueError(f'Unsupported format function {fn.__name__}')
+        return self.const(expr, '_f')
+
+    def fn_name(self, tn: str, d: str) -> str:
+        return f'_{d}{self.names[tn]}' if tn in self.symtab else self.const(f'_undefined({"Decode" if d == "d" else "Encode"!r}, {tn!r})', '_u')
+
+    def value(self, tn: str, d: str, src: str, dst: str) -> list:
+        """
+        Return lines that decode (d == 'd') or encode ('e') expression src of type tn into target dst
+        """
+        if tn not in self.symtab:
+            return [raise_value(f'Validation Error: {"Decode" if d == "d" else "Encode"}: datatype "{tn}" is not defined')]
+        if self.symtab[tn].TypeDef.BaseType in INLINE:
+            if src.isidentifier():
+                return self.scalar(self.symtab[tn], d, src, dst)
+            v = self.temp('v')
+            return [f'{v} = {src}'] + self.scalar(self.symtab[tn], d, v, dst)
+        return [f'{dst} = {self.fn_name(tn, d)}({src})']
+
+    def type_check(self, ts, v: str, vtype: str) -> list:
+        """
+        Return lines that raise the Codec's error if v is not vtype (a Python type name, or Integer or Number)
+        """
+        td = ts.TypeDef
+        tn = f"{td.TypeName}({td.BaseType if td else 'Primitive'})"
+        desc = f"<class '{vtype}'>"
+        if vtype in NUMBER_TYPES:       # Any Integral or Real except bool, and int or float without an isinstance call
+            exact = ' and '.join(f'type({v}) is not {t}' for t in NUMBER_TYPES[vtype][1:])
+            cond = f'{exact} and (isinstance({v}, bool) or not isinstance({v}, {NUMBER_TYPES[vtype][0]}))'
+            desc = f"<class '{NUMBER_TYPES[vtype][0]}'>"
+        elif vtype == 'bool':
+            cond = f'{v} is not True and {v} is not False'
+        else:
+            cond = f'not isinstance({v}, {vtype})'
+        return [f'if {cond}:', f'    {raise_value(tn, ": ", [v], " is not " + desc)}']
+
+    def size_check(self, ts, v: str, n: str = '') -> list:
+        op, tn = ts.TypeOpts, ts.TypeDef.TypeName
+        n = n or f'len({v})'
+        lines = []
+        for opt, cmp, limit in (('minv', '<', 'minimum'), ('maxv', '>', 'maximum')):
+            if opt in op and not (opt == 'minv' and op[opt] <= 0):     # A length is never < 0
+                lines += [f'if {n} {cmp} {op[opt]!r}:', '    ' + raise_value(tn, ': length ', [n], f' {cmp} {limit} {op[opt]}')]
+        return lines
+
+    def range_check(self, ts, v: str, lo: str, hi: str) -> list:
+        op, tn = ts.TypeOpts, ts.TypeDef.TypeName
+        lines = []
+        for opt, cmp, limit in ((lo, '<', 'minimum'), (hi, '>', 'maximum')):
+            if opt in op:       # The Codec's message says "<" for both
+                lines += [f'if {v} {cmp} {op[opt]!r}:', '    ' + raise_value(tn, ': ', [v], f' < {limit} {op[opt]}')]
+        return lines
+
+    def format_validate(self, ts, v: str, msg_val: str) -> list:
+        if not (fv := self.format_function(ts.FormatValidate, True)):
+            return []
+        fmt = ts.TypeOpts['format']
+        return ['try:', f'    {fv}({v})', 'except ValueError:', '    ' + raise_value(ts.TypeDef.TypeName, ': ', [msg_val], f' is not format "{fmt}"')]
+
+    def scalar(self, ts, d: str, v: str, dst: str) -> list:
+        """
+        Return lines that check (and convert) identifier v of a primitive or Enumerated type into dst
+        """
+        base, op, tn = ts.TypeDef.BaseType, ts.TypeOpts, ts.TypeDef.TypeName
+        lines = []
+        if base == 'Boolean':
+            return self.type_check(ts, v, 'bool') + ([f'{dst} = {v}'] if dst != v else [])
+        if base == 'Enumerated':
+            emap = ts.dMap if d == 'd' else ts.eMap
+            if not emap:
+                return ['next(iter(()))']      # The Codec fails getting the type of the first item
+            m = self.const(repr(emap), '_m')
+            return self.type_check(ts, v, type(next(iter(emap))).__name__) + [
+                'try:', f'    {dst} = {m}[{v}]', 'except KeyError:',
+                f'    {raise_value(ts.TypeDef.BaseType, ": ", [v], f" is not a valid {tn}")}']
+        vtype = {'Binary': 'bytes', 'String': 'str'}.get(base, base)
+        a = v
+        if d == 'd':
+            if fd := self.format_function(ts.FormatDecode, False):
+                a = self.temp('a')
+                lines.append(f'{a} = {fd}({v})')
+            lines += self.format_validate(ts, a, v)
+        lines += self.type_check(ts, a, vtype)
+        if base in ('Binary', 'String'):
+            lines += self.size_check(ts, a)
+        if base == 'String' and 'pattern' in op:
+            p = self.const(f'_pattern({op["pattern"]!r})', '_p')
+            lines += [f'if not {p}({a}):', '    ' + raise_value(tn, ': string "', [a], '" does not match ' + op['pattern'])]
+        if base == 'Integer' or base == 'Number' and d == 'd':
+            lines += self.range_check(ts, a, 'minv', 'maxv')
+        elif base == 'Number':
+            lines += self.range_check(ts, a, 'minf', 'maxf')
+        if d == 'e':
+            lines += self.format_validate(ts, a, a)
+            if fe := self.format_function(ts.FormatEncode, False):
+                a = f'{fe}({a})'
+        return lines + ([f'{dst} = {a}'] if dst != a else [])
+
+    def choice(self, ts, d: str) -> list:
+        td, tn = ts.TypeDef, ts.TypeDef.TypeName
+        keymap = ts.dMap if d == 'd' else ts.eMap
+        table = f'_c{d}{self.names[tn]}'
+        self.tables.append(f'{table} = {{' + ', '.join(
+            f'{k!r}: ({keymap[k]!r}, {self.fn_name(ts.Fld[keymap[k] if d == "e" else k].Def.FieldType, d)})' for k in keymap
+        ) + '}')
+        lines = self.type_check(ts, 'val', 'dict') + [
+            'if len(val) != 1:', '    ' + raise_value(tn, ': choice must have one value: ', ['val']),
+            'k, v = next(iter(val.items()))'
+        ]
+        if d == 'd':
+            lines += self.check_key(ts, 'k')
+        return lines + [
+            'try:', f'    key, fn = {table}[k]', 'except KeyError:',
+            '    ' + raise_value(f'{tn}({td.BaseType}): bad value: ', ['next(iter(val))']),
+            'return {key: fn(v)}'
+        ]
+
+    def check_key(self, ts, k: str, dst: str = '') -> list:
+        if not ts.dMap:
+            return ['next(iter(()))']
+        if not isinstance(next(iter(ts.dMap)), int):
+            return [f'{dst} = {k}'] if dst else []
+        return ['try:', f'    {dst or k} = int({k})', 'except ValueError:', '    ' + raise_value(ts.TypeDef.TypeName, ': ', [k], ' is not a valid field ID')]
+
+    def extra(self, ts, extra: str) -> list:
+        td = ts.TypeDef
+        return [f"fields = ', '.join(str(k) for k in {extra})",
+                raise_value(f'{td.TypeName}({td.BaseType}): unexpected field: "', ['fields'], '"')]
+
+    def missing(self, ts, v: str, fd) -> str:
+        td = ts.TypeDef
+        return raise_value(f'{td.TypeName}({td.BaseType}): missing required field "{fd.FieldName}": ', [v])
+
+    def maprec_decode(self, ts) -> list:
+        verbose = self.codec.verbose_str
+        enc = ts.EncType.__name__
+        lines = self.type_check(ts, 'sval', enc) + self.size_check(ts, 'sval')
+        if enc == 'dict':
+            if not ts.dMap:
+                lines += ['val = {next(iter(())): v for k, v in sval.items()}']
+            elif isinstance(next(iter(ts.dMap)), int):
+                lines += ['val = {}', 'for k, v in sval.items():'] + [f'    {x}' for x in self.check_key(ts, 'k', 'k')] + ['    val[k] = v']
+            else:
+                lines += ['val = sval']
+        else:
+            lines += ['val = sval']
+        lines += ['aval = {}']
+        for f in ts.TypeDef.Fields:
+            key = f.FieldName if verbose else f.FieldID
+            if key not in ts.Fld:
+                lines.append(f'raise KeyError({key!r})')     # As the Codec does for a Map with the id option
+                return lines
+            fs = ts.Fld[key]
+            fd = fs.Def
+            if enc == 'dict':
+                lines.append(f'sv = val.get({key!r})')
+            else:
+                lines.append(f'sv = val[{fd.FieldID - 1}] if len(val) > {fd.FieldID - 1} else None')
+            lines.append('if sv is not None:')
+            if fs.cTag is not None:
+                if enc == 'dict':
+                    ct = repr(fs.cTag)
+                elif fs.cTag in ts.eMap:
+                    ct = repr(ts.eMap[fs.cTag] - 1)
+                else:
+                    lines += [f'    raise KeyError({fs.cTag!r})']
+                    continue
+                lines += [f'    av = {self.fn_name(fd.FieldType, "d")}({{sval[{ct}]: sv}})',
+                          f'    aval[{fd.FieldName!r}] = next(iter(av.values()))']
+            else:
+                lines += [f'    {x}' for x in self.value(fd.FieldType, 'd', 'sv', f'aval[{fd.FieldName!r}]')]
+            if fs.Opt.get('minc', 1) > 0:
+                lines += ['else:', f'    {self.missing(ts, "val", fd)}']
+        if enc == 'dict':
+            names = self.const(f'frozenset({list(ts.Fld)!r})', '_n')
+            lines += [f'if not {names}.issuperset(val):', f'    extra = set(val) - {names}'] + ['    ' + x for x in self.extra(ts, 'extra')]
+        else:
+            lines += [f'if extra := set(val[{len(ts.Fld)}:]):'] + ['    ' + x for x in self.extra(ts, 'extra')]
+        return lines + ['return aval']
+
+    def maprec_encode(self, ts) -> list:
+        verbose = self.codec.verbose_str
+        enc = ts.EncType.__name__
+        lines = self.type_check(ts, 'aval', 'dict') + self.size_check(ts, 'aval') + ['sval = {}' if enc == 'dict' else 'sval = []']
+        fnames = [f.Def.FieldName for f in ts.Fld.values()]
+        for f in ts.TypeDef.Fields:
+            key = f.FieldName if verbose else f.FieldID
+            if key not in ts.Fld:
+                lines.append(f'raise KeyError({key!r})')
+                return lines
+            fs = ts.Fld[key]
+            fd = fs.Def
+            if fs.cTag is not None:
+                lines += [f'e = {self.fn_name(fd.FieldType, "e")}({{aval[{fs.cTag!r}]: aval[{fd.FieldName!r}]}})',
+                          'sv = next(iter(e.values()))']
+            else:
+                lines += [f'if {fd.FieldName!r} in aval:'] + [f'    {x}' for x in self.value(fd.FieldType, 'e', f'aval[{fd.FieldName!r}]', 'sv')] + \
+                         ['else:', '    sv = None']
+            if fs.Opt.get('minc', 1) > 0:
+                lines += ['if sv is None:', f'    {self.missing(ts, "aval", fd)}']
+            lines += ['sval.append(sv)'] if enc == 'list' else ['if sv is not None:', f'    sval[{key!r}] = sv']
+        names = self.const(f'frozenset({fnames!r})', '_n')
+        lines += [f'if not {names}.issuperset(aval):', f'    extra = set(aval) - {names}'] + ['    ' + x for x in self.extra(ts, 'extra')]
+        if enc == 'list':
+            lines += ['while sval and sval[-1] is None:', '    sval.pop()']
+        return lines + ['return sval']
+
+    def count_check(self, ts, v: str, msg_v: str) -> list:
+        op, tn = ts.TypeOpts, ts.TypeDef.TypeName
+        lines = [f'cnt = len([k for k in {v} if k is not None])']
+        if 'minv' in op:
+            lines += [f'if cnt < {op["minv"]!r}:', '    ' + raise_value(tn, ': length ', ['cnt'], f' < minimum {op["minv"]}')]
+        if 'maxv' in op:
+            lines += [f'if cnt > {op["maxv"]!r}:', '    ' + raise_value(tn, ': length ', [f'len({msg_v})'], f' > maximum {op["maxv"]}')]
+        return lines
+
+    def array(self, ts, d: str) -> list:
+        td = ts.TypeDef
+        nf = len(ts.Fld)
+        if d == 'd':
+            lines = []
+            if fd := self.format_function(ts.FormatDecode, False):
+                lines.append(f'val = {fd}(sval)')
+            else:
+                lines.append('val = sval')
+            lines += self.format_validate(ts, 'val', 'sval') + self.type_check(ts, 'val', 'list') + self.count_check(ts, 'sval', 'sval')
+            lines += [f'if len(val) > {nf}:', '    ' + raise_value(f'{td.TypeName}({td.BaseType}): unexpected field: ""')]
+            src, out = 'val', 'aval'
+        else:
+            lines = self.type_check(ts, 'aval', 'list') + self.count_check(ts, 'aval', 'aval')
+            lines += [f'if len(aval) > {nf}:', f'    extra = set(aval[{nf}:])'] + ['    ' + x for x in self.extra(ts, 'extra')]
+            src, out = 'aval', 'sval'
+        lines.append(f'{out} = []')
+        for f in td.Fields:
+            fs = ts.Fld[f.FieldID]
+            fld = fs.Def
+            fx = fld.FieldID - 1
+            fopts = ts.Fld[fx + 1].Opt
+            lines += [f'x = {src}[{fx}] if len({src}) > {fx} else None', 'if x is not None:']
+            if 'tagid' in fopts:
+                ct = int(fopts['tagid']) - 1
+                lines += [f'    r = {self.fn_name(fld.FieldType, d)}({{{src}[{ct}]: x}})', f'    {out}.append(r[next(iter(r))])']
+            else:
+                lines += [f'    {x}' for x in self.value(fld.FieldType, d, 'x', 'r')] + [f'    {out}.append(r)']
+            lines += ['else:', f'    {out}.append(None)']
+            if (fopts.get('minc', 1) > 0) if d == 'd' else ('minc' in fopts and fopts['minc'] > 0):
+                lines.append(f'    {self.missing(ts, src, fld)}')
+        lines += [f'while {out} and {out}[-1] is None:', f'    {out}.pop()']
+        if d == 'e':
+            lines += self.format_validate(ts, 'sval', 'sval')
+            if fe := self.format_function(ts.FormatEncode, False):
+                return lines + [f'return {fe}(sval)']
+        return lines + [f'return {out}']
+
+    def array_of(self, ts, d: str) -> list:
+        td, vt = ts.TypeDef, ts.TypeOpts['vtype']
+        lines = self.type_check(ts, 'val', 'list') + self.size_check(ts, 'val')
+        if 'set' in ts.TypeOpts or 'unique' in ts.TypeOpts:
+            lines += ['if len(val) != len(fset(val)):', '    ' + raise_value(f'{td.TypeName}({td.BaseType}): bad value: ', ['val'])]
+        if vt in self.symtab and self.symtab[vt].TypeDef.BaseType in INLINE:
+            return lines + ['out = []', 'for v in val:'] + [f'    {x}' for x in self.value(vt, d, 'v', 'r')] + ['    out.append(r)', 'return out']
+        return lines + [f'return [{self.fn_name(vt, d)}(v) for v in val]']
+
+    def map_of(self, ts, d: str) -> list:
+        lines = self.type_check(ts, 'val', 'dict') + self.size_check(ts, 'val')
+        vf = self.fn_name(ts.TypeOpts['vtype'], d)
+        if d == 'd':
+            return lines + [f'return {{k: {vf}(v) for k, v in val.items()}}']
+        return lines + [f'return {{{self.fn_name(ts.TypeOpts["ktype"], d)}(k): {vf}(v) for k, v in val.items()}}']
+
+    def function(self, tn: str, d: str) -> list:
+        ts = self.symtab[tn]
+        base = ts.TypeDef.BaseType
+        arg = 'val'
+        if base in INLINE:
+            body = self.scalar(ts, d, 'val', 'val') + ['return val']
+        elif base == 'Choice':
+            body = self.choice(ts, d)
+        elif base in ('Record', 'Map'):
+            body = self.maprec_decode(ts) if d == 'd' else self.maprec_encode(ts)
+            arg = 'sval' if d == 'd' else 'aval'
+        elif base == 'Array':
+            body = self.array(ts, d)
+            arg = 'sval' if d == 'd' else 'aval'
+        elif base == 'ArrayOf':
+            body = self.array_of(ts, d)
+        elif base == 'MapOf':
+            body = self.map_of(ts, d)
+        else:
+            raise ValueError(f'{tn}: unsupported base type {base}')
+        return ['', '', f'def {self.fn_name(tn, d)}({arg}):     # {tn}'] + [f'    {x}' for x in body]
+
+    def source(self) -> str:
+        funcs = []
+        for tn in self.symtab:
+            funcs += self.function(tn, 'd') + self.function(tn, 'e')
+        lines = [HEADER.format(version=GENERATOR_VERSION, jadn=schema_cache.jadn_version(), verbose_rec=self.codec.verbose_rec,
+                               verbose_str=self.codec.verbose_str)]
+        lines += [f'{name} = {expr}' for expr, name in self.consts.items()]
+        lines += funcs + ['', ''] + self.tables
+        for d, table in (('d', 'DECODE'), ('e', 'ENCODE')):
+            lines += [f'{table} = {{'] + [f'    {tn!r}: {self.fn_name(tn, d)},' for tn in self.symtab] + ['}']
+        return '\n'.join(lines) + '\n' + FOOTER
+
+
+def generate(codec: jadn.codec.Codec) -> str:
+    """
+    Return the source of a module with decode() and encode() equivalent to the Codec's
+    """
+    return _Generator(codec).source()
+
+
+def cache_key(schema: dict, verbose_rec: bool, verbose_str: bool) -> str:
+    ver = f'{GENERATOR_VERSION}\n{schema_cache.jadn_version()}\n{verbose_rec}\n{verbose_str}\n'
+    return hashlib.sha256(ver.encode() + verdict_cache.schema_digest(schema).encode()).hexdigest()
+
+
+def _write(path: str, data: bytes) -> None:
+    with open(tmp := f'{path}.{os.getpid()}', 'wb') as fp:
+        fp.write(data)
+    os.replace(tmp, path)       # Atomic, concurrent writers of the same file are harmless
+
+
+def load_module(schema: dict, verbose_rec: bool = False, verbose_str: bool = False, cache_dir: str = CACHE_DIR) -> types.ModuleType:
+    """
+    Return the generated module for a checked schema and encoding mode, generating and caching it if needed.
+    The module's source is cached for reading, and its code object for loading (even if Python does not write byte code).
+    """
+    name = f'jadn_codec_{cache_key(schema, verbose_rec, verbose_str)[:16]}'
+    path = os.path.join(cache_dir, name) if cache_dir else ''
+    code = None
+    if path and os.path.isfile(path + '.bin'):
+        with open(path + '.bin', 'rb') as fp:
+            if fp.read(len(MAGIC)) == MAGIC:
+                code = marshal.loads(fp.read())
+    if code is None:
+        source = generate(jadn.codec.Codec(schema, verbose_rec=verbose_rec, verbose_str=verbose_str))
+        code = compile(source, path + '.py' if path else f'<{name}>', 'exec')
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            _write(path + '.py', source.encode())
+            _write(path + '.bin', MAGIC + marshal.dumps(code))
+    module = types.ModuleType(name)
+    module.__file__ = path + '.py' if path else None
+    exec(code, module.__dict__)
+    return module
+
+
+class GeneratedCodec:
+    """
+    Drop-in replacement for jadn.codec.Codec decode() and encode(), using the module generated for the schema
+    """
+    def __init__(self, schema: dict, verbose_rec: bool = False, verbose_str: bool = False, cache_dir: str = CACHE_DIR):
+        self.schema = schema
+        self.verbose_rec = verbose_rec
+        self.verbose_str = verbose_str
+        self.module = load_module(schema, verbose_rec, verbose_str, cache_dir)
+        self.symtab = self.module.DECODE        # Type name -> decode function: the keys of Codec.symtab
+        self.decode = self.module.decode
+        self.encode = self.module.encode
+
+
+__all__ = [
+    'CACHE_DIR',
+    'GENERATOR_VERSION',
+    'GeneratedCodec',
+    'cache_key',
+    'generate',
+    'load_module'
+]
@@ -0,0 +1,174 @@
+"""
+Cached, concurrent access to a directory tree in a GitHub repository
+
+The whole tree is listed with one recursive Git Trees API request, revalidated with its ETag so an
+unchanged tree costs a single 304 response.  Files are stored on disk by git blob sha, so a file is
+downloaded only when its content changes, and missing files are fetched by a bounded thread pool.
+Set the JADN_CACHE environment variable to change the cache directory, or to an empty string to keep
+the listing and files in memory for the life of the tree.  Only two endpoints are used, so a local stand-in server can replace api.github.com:
+    GET {api}/repos/{owner}/{repo}/git/trees/{ref}?recursive=1
+    GET {api}/repos/{owner}/{repo}/contents/{path}?ref={ref}     (Accept: application/vnd.github.raw)
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from typing import Dict, Iterable, TextIO
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, quote, urlparse
+from urllib.request import Request, urlopen
+
+CACHE_DIR = os.path.join(c, 'github') if (c := os.environ.get('JADN_CACHE', '.jadn-cache')) else ''
+MAX_CONNECTIONS = 8
+
+
+def blob_sha(data: bytes) -> str:
+    """
+    Return the git object id of a file's contents
+    """
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class RemoteEntry:
+    """
+    os.DirEntry-like listing entry; path is the contents API URL of the file or directory
+    """
+    def __init__(self, name: str, path: str, url: str):
+        self.name = name
+        self.path = path
+        self.url = url
+
+
+class GitHubTree:
+    """
+    A directory tree in a GitHub repo, identified by its contents API URL, e.g.,
+    https://api.github.com/repos/oasis-open/openc2-jadn-software/contents/Test?ref=master
+    """
+    def __init__(self, contents_url: str, headers: dict = None, cache_dir: str = CACHE_DIR,
+                 max_connections: int = MAX_CONNECTIONS):
+        u = urlparse(contents_url)
+        parts = u.path.strip('/').split('/')
+        if len(parts) < 4 or parts[0] != 'repos' or parts[3] != 'contents':
+            raise ValueError(f'Not a GitHub contents API URL: {contents_url}')
+        self.api = f'{u.scheme}://{u.netloc}/repos/{parts[1]}/{parts[2]}'
+        self.contents_url = contents_url.split('?')[0].rstrip('/')
+        self.root = '/'.join(parts[4:])
+        self.ref = parse_qs(u.query).get('ref', ['HEAD'])[0]
+        self.headers = headers or {}
+        self.cache_dir = cache_dir
+        self.max_connections = max_connections
+        self.requests = 0           # HTTP requests issued, including 304 revalidations
+        self._lock = threading.Lock()
+        self._tree = None
+        self._blobs = {}            # Blob sha -> file contents, if not caching on disk
+
+    def _get(self, url: str, headers: dict = None) -> tuple:
+        with self._lock:
+            self.requests += 1
+        with urlopen(Request(url, headers={**self.headers, **(headers or {})})) as rsp:
+            return rsp.read(), rsp.headers.get('ETag', '')
+
+    def tree(self) -> Dict[str, dict]:
+        """
+        Return {relative path: {type, sha}} for every entry under the root, using one recursive request
+        """
+        if self._tree is None:
+            key = hashlib.sha256(f'{self.api} {self.ref}'.encode()).hexdigest()
+            path = os.path.join(self.cache_dir, f'tree-{key}.json') if self.cache_dir else ''
+            try:
+                with open(path, encoding='utf8') as fp:
+                    cached = json.load(fp)
+            except (OSError, ValueError):       # Not cached, or caching disabled
+                cached = {'etag': '', 'tree': []}
+            try:
+                hdr = {'If-None-Match': cached['etag']} if cached['etag'] else {}
+                data, etag = self._get(f'{self.api}/git/trees/{quote(self.ref)}?recursive=1', hdr)
+                listing = json.loads(data)
+                if listing.get('truncated'):
+                    raise ValueError(f'Tree listing truncated by server: {self.api}')
+                cached = {'etag': etag, 'tree': listing['tree']}
+                if path:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(path, 'w', encoding='utf8') as fp:
+                        json.dump(cached, fp)
+            except HTTPError as e:
+                if e.code != 304:           # Not Modified: cached listing is current
+                    raise
+            prefix = self.root + '/' if self.root else ''
+            self._tree = {t['path'][len(prefix):]: {'type': t['type'], 'sha': t.get('sha', '')}
+                          for t in cached['tree'] if t['path'].startswith(prefix)}
+        return self._tree
+
+    def relpath(self, url: str) -> str:
+        return url.split('?')[0][len(self.contents_url):].strip('/')
+
+    def list_dir(self, url: str) -> dict:
+        """
+        Return {files: [RemoteEntry*], dirs: [RemoteEntry*]} for a directory, from the cached tree listing
+        """
+        rel = self.relpath(url)
+        prefix = rel + '/' if rel else ''
+        files, dirs = [], []
+        for p, t in self.tree().items():
+            if p.startswith(prefix) and (name := p[len(prefix):]) and '/' not in name:
+                entry = RemoteEntry(name, f'{self.contents_url}/{p}', f'{self.contents_url}/{p}')
+                (dirs if t['type'] == 'tree' else files).append(entry)
+        return {'files': files, 'dirs': dirs}
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, 'blobs', sha[:2], sha) if self.cache_dir else ''
+
+    def _cached(self, sha: str) -> bool:
+        return sha in self._blobs or os.path.isfile(self._blob_path(sha))
+
+    def _fetch(self, rel: str) -> bytes:
+        """
+        Download a file unless its blob is already cached, return its contents
+        """
+        sha = self.tree()[rel]['sha']
+        if sha in self._blobs:
+            return self._blobs[sha]
+        if os.path.isfile(path := self._blob_path(sha)):
+            with open(path, 'rb') as fp:
+                return fp.read()
+        data, _ = self._get(f'{self.contents_url}/{quote(rel)}?ref={quote(self.ref)}',
+                            {'Accept': 'application/vnd.github.raw'})
+        if blob_sha(data) != sha:
+            raise ValueError(f'Content of {rel} does not match tree sha {sha}')
+        if not path:
+            self._blobs[sha] = data
+            return data
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp := f'{path}.{os.getpid()}', 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp, path)
+        return data
+
+    def prefetch(self, urls: Iterable[str]) -> int:
+        """
+        Download all uncached files concurrently, return the number of files downloaded
+        """
+        missing = {}                # One download per distinct blob
+        for rel in map(self.relpath, urls):
+            if not self._cached(sha := self.tree()[rel]['sha']):
+                missing[sha] = rel
+        with ThreadPoolExecutor(max_workers=self.max_connections) as ex:
+            list(ex.map(self._fetch, missing.values()))
+        return len(missing)
+
+    def open(self, url: str) -> TextIO:
+        """
+        Return a text stream for a file, named by its path so jadn.load_any can detect its format
+        """
+        stream = StringIO(self._fetch(self.relpath(url)).decode('utf8'), newline=None)
+        stream.name = url.split('?')[0]
+        return stream
+
+
+__all__ = [
+    'GitHubTree',
+    'RemoteEntry',
+    'blob_sha'
+]
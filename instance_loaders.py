@@ -0,0 +1,266 @@
+"""
+Load data instances in JSON, JSON-LD, YAML and XML into the values a JADN Codec decodes
+
+Each loader takes the document bytes, the CompiledSchema and the type being validated, and returns
+dicts, lists, strings, numbers and booleans.  iter_records() yields the elements of a top-level array one
+at a time instead of loading the whole document: NDJSON lines, JSON array elements, YAML documents in a
+multi-document stream, or the record elements of an XML root element.  An NDJSON line that is not JSON
+is yielded as its ValueError, so the lines after it can still be read.
+
+JSON-LD keywords (@context, @id, ...) are dropped from top-level nodes unless the schema defines them as
+fields; a top-level @graph is the instance.  YAML timestamps are loaded as strings, as in JSON.  YAML
+requires the PyYAML package.
+
+XML has no data types, so the XML loader is guided by the schema as it streams elements with lxml
+iterparse, converting each element when it ends and then discarding it:
+
+    Record, Map, Choice     child elements and attributes are fields, by local name (prefixes are ignored);
+                            repeated elements or fields with maximum multiplicity > 1 are collected in a list
+    ArrayOf                 child elements (of any name) are items; a text-only element is one repeated item
+    Integer, Number,
+    Boolean                 element text is converted to the JSON value
+    Enumerated with id      element text is converted to the item id (an integer)
+    compound with format    element text is the value, e.g. IPv4-Net "10.0.0.0/8"
+    sequence, choice, all   grouping elements that are not fields are transparent
+
+The root element is the instance of the validated type, or of a Choice alternative whose type or field
+name matches the root element name.
+"""
+import json
+from compiled_schema import EMPTY, CompiledSchema, TypeDef
+from io import BytesIO
+from lxml import etree
+from typing import Any, Iterator, Optional
+
+WRAPPERS = {'sequence', 'choice', 'all'}   # Grouping elements (XSD compositors) that do not name a field
+XSI = '{http://www.w3.org/2001/XMLSchema-instance}'
+CONTAINERS = {'Record': dict, 'Map': dict, 'Choice': dict, 'MapOf': dict, 'ArrayOf': list, 'Array': list}
+
+
+def load_json(doc: bytes, schema: CompiledSchema, type_name: str) -> Any:
+    return json.loads(doc)
+
+
+def _drop_keywords(node: Any, td: Optional[TypeDef]) -> Any:
+    if not isinstance(node, dict):
+        return node
+    fields = td.by_name if td else EMPTY
+    return {k: v for k, v in node.items() if not k.startswith('@') or k in fields}
+
+
+def load_jsonld(doc: bytes, schema: CompiledSchema, type_name: str) -> Any:
+    val = json.loads(doc)
+    td = schema.type(type_name)
+    if isinstance(val, dict) and '@graph' in val and (not td or '@graph' not in td.by_name):
+        val = val['@graph']
+    if isinstance(val, list):
+        item = schema.type(td.topts.get('vtype', '')) if td and td.base_type == 'ArrayOf' else None
+        return [_drop_keywords(v, item) for v in val]
+    return _drop_keywords(val, td)
+
+
+def _yaml_loader():
+    """
+    Return a safe YAML Loader class that reads timestamps as strings
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError('Loading YAML requires PyYAML: pip install pyyaml')
+    base = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    class Loader(base):
+        yaml_implicit_resolvers = {k: [r for r in v if r[0] != 'tag:yaml.org,2002:timestamp']
+                                   for k, v in base.yaml_implicit_resolvers.items()}
+    return yaml, Loader
+
+
+def load_yaml(doc: bytes, schema: CompiledSchema, type_name: str) -> Any:
+    yaml, loader = _yaml_loader()
+    try:
+        return yaml.load(doc, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ValueError(f'Bad YAML: {e}')
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].rsplit(':', 1)[-1]
+
+
+def _scalar(text: Optional[str], base: str) -> Any:
+    """
+    Convert element text to a JSON value, or return it unchanged for the Codec to reject
+    """
+    if base not in ('Integer', 'Number', 'Boolean'):
+        return text or ''
+    t = (text or '').strip()
+    try:
+        if base == 'Boolean':
+            return {'true': True, '1': True, 'false': False, '0': False}[t]
+        return int(t) if base == 'Integer' else float(t)
+    except (KeyError, ValueError):
+        return t
+
+
+class _Frame:
+    """
+    An XML element being converted: its expected type, field name in its parent, and value so far
+    """
+    __slots__ = ('base', 'td', 'vtype', 'scalar', 'key', 'repeated', 'value', 'transparent')
+
+    def __init__(self, schema: CompiledSchema, type_name: str, topts: dict = EMPTY, key: str = '',
+                 repeated: bool = False):
+        self.td = schema.type(type_name)
+        self.base = self.td.base_type if self.td else type_name
+        topts = self.td.topts if self.td else topts
+        self.vtype = topts.get('vtype', '')
+        self.key, self.repeated, self.transparent = key, repeated, False
+        if self.base in CONTAINERS and 'format' in topts:     # e.g. IPv4-Net, an Array whose JSON value is a string
+            self.scalar, self.value = 'String', None
+        else:
+            self.scalar = 'Integer' if self.base == 'Enumerated' and 'id' in topts else self.base     # Text conversion
+            self.value = CONTAINERS[self.base]() if self.base in CONTAINERS else None
+
+    def child(self, schema: CompiledSchema, name: str) -> '_Frame':
+        if self.base in ('ArrayOf', 'Array'):
+            item = _Frame(schema, self.vtype, key=name)
+            if not (self.key and not self.value and item.td and name in item.td.by_name):
+                return item
+            # Repeated element form of an ArrayOf field: this element is one item and name is one of its fields
+            self.base, self.td, self.vtype, self.value, self.repeated = item.base, item.td, item.vtype, item.value, True
+            self.scalar = item.scalar
+        if self.td and (fd := self.td.by_name.get(name)):
+            return _Frame(schema, fd.type, fd.topts, name, fd.fopts.get('maxc', 1) != 1)
+        return _Frame(schema, '', key=name)
+
+    def add(self, key: str, value: Any, repeated: bool) -> None:
+        if self.value is None:      # Element of unknown type with children
+            self.value = {}
+        if isinstance(self.value, list):
+            self.value.append(value)
+        elif repeated:
+            self.value.setdefault(key, []).append(value)
+        elif key in self.value and self.td is None:     # Repeated element of unknown type
+            self.value[key] = (v if isinstance(v := self.value[key], list) else [v]) + [value]
+        else:
+            self.value[key] = value
+
+
+def _root_frames(schema: CompiledSchema, type_name: str, name: str) -> list:
+    td = schema.type(type_name)
+    if name != type_name and td and td.base_type == 'Choice':
+        for fd in td.fields:
+            if name in (fd.type, fd.name):      # Root element is a Choice alternative
+                return [_Frame(schema, type_name), _Frame(schema, fd.type, fd.topts, fd.name)]
+    return [_Frame(schema, type_name)]
+
+
+def iter_xml(source, schema: CompiledSchema, type_name: str, records: bool = False) -> Iterator:
+    """
+    Convert an XML instance read from a binary file, yield its value, or if records is True and the root
+    is an ArrayOf, yield each item as soon as it has been read
+    """
+    stack, root, names = [], None, {}
+    for event, e in etree.iterparse(source, events=('start', 'end'), remove_comments=True, remove_pis=True):
+        if event == 'start':
+            if (name := names.get(e.tag)) is None:
+                name = names[e.tag] = _local(e.tag)
+            if not stack:
+                stack = _root_frames(schema, type_name, name)
+                root = stack[-1]
+            elif name in WRAPPERS and not ((p := stack[-1]).td and name in p.td.by_name):
+                stack.append(f := _Frame(schema, ''))
+                f.base, f.td, f.vtype, f.value, f.transparent = p.base, p.td, p.vtype, p.value, True
+            else:
+                stack.append(stack[-1].child(schema, name))
+            if isinstance((f := stack[-1]).value, dict) and not f.transparent:
+                for k, v in e.attrib.items():
+                    if not k.startswith(XSI):
+                        c = f.child(schema, k := _local(k))
+                        f.add(k, _scalar(v, c.scalar), c.repeated)
+            continue
+        if not (f := stack.pop()).transparent:
+            value, repeated = f.value, f.repeated
+            if f.base == 'ArrayOf' and not value and (e.text or '').strip():    # One of a repeated text-only element
+                value, repeated = _scalar(e.text, _Frame(schema, f.vtype).scalar), True
+            elif value is None:
+                value = _scalar(e.text, f.scalar)
+            if records and root.base == 'ArrayOf' and stack and stack[-1].value is root.value:
+                yield value
+            elif stack:
+                stack[-1].add(f.key, value, repeated)
+            if f is root and not (records and root.base == 'ArrayOf'):
+                yield stack[0].value if stack else value    # Root, or the Choice containing it
+        e.clear()                   # Discard converted elements
+        while e.getprevious() is not None:
+            del e.getparent()[0]
+
+
+def load_xml(doc: bytes, schema: CompiledSchema, type_name: str) -> Any:
+    return next(iter_xml(BytesIO(doc), schema, type_name))
+
+
+LOADERS = {
+    '.json': load_json,
+    '.jsonld': load_jsonld,
+    '.yaml': load_yaml,
+    '.yml': load_yaml,
+    '.xml': load_xml
+}
+
+
+def loads(doc: bytes, ext: str, schema: CompiledSchema, type_name: str) -> Any:
+    """
+    Load an instance in the format given by its file extension (JSON if the extension is not known)
+    """
+    try:
+        return LOADERS.get(ext, load_json)(doc, schema, type_name)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f'Bad XML: {e}')
+
+
+def iter_ndjson(fp) -> Iterator:
+    """
+    Yield one value per non-blank line of a newline-delimited JSON file, or the ValueError of a line that is not JSON
+    """
+    for line in fp:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:     # Reported as a bad record; the next line is still readable
+                yield e
+
+
+def iter_records(fp, ext: str, schema: CompiledSchema, type_name: str) -> Iterator:
+    """
+    Yield the records of a top-level array read from a binary file, one at a time
+    """
+    if ext in ('.ndjson', '.jsonl'):
+        yield from iter_ndjson(fp)
+    elif ext in ('.yaml', '.yml'):
+        yaml, loader = _yaml_loader()
+        try:
+            for doc in yaml.load_all(fp, Loader=loader):
+                yield from doc if isinstance(doc, list) else [doc]
+        except yaml.YAMLError as e:
+            raise ValueError(f'Bad YAML: {e}')
+    elif ext == '.xml':
+        try:
+            yield from iter_xml(fp, schema, type_name, records=True)
+        except etree.XMLSyntaxError as e:
+            raise ValueError(f'Bad XML: {e}')
+    else:
+        raise ValueError(f'No record loader for {ext}')
+
+
+__all__ = [
+    'LOADERS',
+    'iter_ndjson',
+    'iter_records',
+    'iter_xml',
+    'load_json',
+    'load_jsonld',
+    'load_xml',
+    'load_yaml',
+    'loads'
+]
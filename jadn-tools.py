@@ -0,0 +1,175 @@
+"""
+Run the repository scripts as subcommands of one command
+
+    jadn-tools.py <command> [args] [+ <command> [args] ...] [--import-times]
+
+Each script is imported only when its command is used, so a command pays only for the libraries it needs
+(jsf for examples, lxml for artifacts, jadn for everything else), and fire is not imported at all.
+Commands separated by '+' run in one process, sharing imported modules and the schema cache.
+Arguments are converted using the annotations of the script's function:  --name value, --name=value,
+--flag and --noflag, as with fire.  --import-times reports the time to import each script's
+top-level dependencies and to run each command on stderr.
+
+    jadn-tools.py check Test/device-slpf/device-slpf.jadn command.json
+    jadn-tools.py resolve oc2ls-v2.0-lang.jadn + artifacts --jobs 0 --import-times
+"""
+import ast
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEPARATOR = '+'
+COMMANDS = {            # Command: (script, function)
+    'artifacts': ('make-artifacts.py', 'main'),
+    'check': ('check-message.py', 'check'),
+    'diff': ('diff-schemas.py', 'diff'),
+    'erd': ('make-artifacts-erd.py', 'main'),
+    'examples': ('make-examples.py', 'make_ex'),
+    'resolve': ('resolve-references.py', 'resolve'),
+    'test': ('test-poc.py', 'main'),
+    'transcode': ('transcode.py', 'transcode'),
+    'validate': ('validate.py', 'validate'),
+}
+
+
+def top_imports(path: str) -> list:
+    """
+    Return the modules imported at the top level of a script, in order
+    """
+    with open(path, encoding='utf-8') as fp:
+        tree = ast.parse(fp.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def load_script(script: str, times: dict = None):
+    """
+    Import a script file as a module named after it ('-' replaced by '_'), timing its dependencies if times is a dict
+    """
+    name = os.path.splitext(script)[0].replace('-', '_')
+    if module := sys.modules.get(name):
+        return module
+    path = os.path.join(BASE_DIR, script)
+    if times is not None:
+        for dep in top_imports(path):
+            if dep not in sys.modules:
+                start = time.perf_counter()
+                importlib.import_module(dep)
+                times[dep] = time.perf_counter() - start
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module      # Lets forked pool workers unpickle the script's functions by name
+    spec.loader.exec_module(module)
+    return module
+
+
+def convert(value, annotation):
+    if not isinstance(value, str) or annotation in (str, inspect.Parameter.empty):
+        return value
+    if annotation is bool:
+        if value.lower() not in ('true', 'false', '1', '0', 'yes', 'no'):
+            raise ValueError(f'expected a boolean, found "{value}"')
+        return value.lower() in ('true', '1', 'yes')
+    return annotation(value)
+
+
+def parse_args(fn, argv: list) -> inspect.BoundArguments:
+    """
+    Bind command-line arguments to a function's parameters, converted to their annotated types
+    """
+    sig = inspect.signature(fn)
+    params = sig.parameters
+    args, kwargs = [], {}
+    it = iter(argv)
+    for a in it:
+        if not a.startswith('--'):
+            args.append(a)
+            continue
+        name, eq, value = a[2:].replace('-', '_').partition('=')
+        if not eq:
+            if name in params and params[name].annotation is bool:
+                value = True
+            elif name.startswith('no') and name[2:] in params and params[name[2:]].annotation is bool:
+                name, value = name[2:], False
+            elif (value := next(it, None)) is None:
+                raise ValueError(f'--{name} needs a value')
+        kwargs[name] = value
+    try:
+        bound = sig.bind(*args, **kwargs)
+    except TypeError as e:
+        raise ValueError(f'{e}, usage: {sig}')
+    for k, v in bound.arguments.items():
+        bound.arguments[k] = convert(v, params[k].annotation)
+    return bound
+
+
+def usage() -> None:
+    print(__doc__.strip().split('\n\n')[1].strip())
+    print('\nCommands (<command> --help for arguments):')
+    for cmd, (script, fn) in COMMANDS.items():
+        print(f'  {cmd:<10} {script} {fn}()')
+
+
+def run(cmd: str, argv: list, times: dict = None) -> bool:
+    """
+    Run one command, return False if it failed or reported an invalid document
+    """
+    if cmd not in COMMANDS:
+        print(f'### Unknown command "{cmd}"')
+        usage()
+        return False
+    script, fn_name = COMMANDS[cmd]
+    start = time.perf_counter()
+    imports = {} if times is not None else None
+    fn = getattr(load_script(script, imports), fn_name)
+    loaded = time.perf_counter()
+    if '--help' in argv:
+        print(f'{cmd} {inspect.signature(fn)}\n{inspect.getdoc(fn) or ""}')
+        return True
+    try:
+        result = fn(*(bound := parse_args(fn, argv)).args, **bound.kwargs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f'### {cmd}: {e}')
+        result = False
+    if times is not None:
+        times[cmd] = (loaded - start, time.perf_counter() - loaded, imports)
+    return result is not False
+
+
+def main(argv: list) -> int:
+    times = {} if '--import-times' in argv else None
+    argv = [a for a in argv if a != '--import-times']
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        usage()
+        return 0
+    commands, cmd = [], []
+    for a in argv + [SEPARATOR]:
+        if a != SEPARATOR:
+            cmd.append(a)
+        elif cmd:
+            commands.append(cmd)
+            cmd = []
+    ok = True
+    for cmd, *args in commands:
+        ok = run(cmd, args, times) and ok
+    if times is not None:
+        print(f'\n{"command":<12} {"import":>8} {"run":>8}', file=sys.stderr)
+        for cmd, (imported, ran, imports) in times.items():
+            print(f'{cmd:<12} {imported:>8.3f} {ran:>8.3f}', file=sys.stderr)
+            for dep, t in sorted(imports.items(), key=lambda x: -x[1]):
+                if t >= 0.001:
+                    print(f'  {dep:<26} {t:>8.3f}', file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
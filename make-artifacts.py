@@ -1,53 +1,187 @@
 """
 Translate each schema file in Source directory to multiple formats in Out directory
 """
-import fire
+import hashlib
 import jadn
+import json
+import jsonschema
 import os
 import posixpath
+import schema_cache
 import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 SCHEMA_DIR = 'Schemas'
 OUTPUT_DIR = 'Out'
+MANIFEST = '.manifest.json'     # Build manifest in output directory
 
 
-def translate(filename: str, sdir: str, odir: str) -> None:
-    if not os.path.isfile(p := posixpath.join(sdir, filename)):
-        return
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+
+def schema_refs(filename: str, sdir: str) -> dict:
+    """
+    Return the package URI and imported namespace URIs of a schema
+    """
+    with open(posixpath.join(sdir, filename), encoding='utf8') as fp:
+        info = schema_cache.load_any(fp).get('info', {})
+    ns = info.get('namespaces', info.get('imports', {}))
+    return {'package': info.get('package', ''), 'imports': sorted(ns.values() if isinstance(ns, dict) else [n[-1] for n in ns])}
+
+
+FORMATS = {      # Output file suffix: converter
+    '.jadn': lambda sc, p: jadn.dump(sc, p),
+    '-core.jadn': lambda sc, p: jadn.dump(jadn.transform.unfold_extensions(jadn.transform.strip_comments(sc)), p),
+    '_ia.dot': lambda sc, p: jadn.convert.diagram_dump(sc, p, style={
+        'format': 'graphviz', 'detail': 'information', 'attributes': True, 'links': True}),
+    '_i.puml': lambda sc, p: jadn.convert.diagram_dump(sc, p, style={
+        'format': 'plantuml', 'detail': 'information', 'attributes': False, 'links': False}),
+    '.jidl': lambda sc, p: jadn.convert.jidl_dump(sc, p, style={'desc': 50}),
+    '.html': lambda sc, p: jadn.convert.html_dump(sc, p),
+    '.md': lambda sc, p: jadn.convert.markdown_dump(sc, p),
+    '.json': lambda sc, p: jadn.translate.json_schema_dump(sc, p)
+}
+
+
+def load_schema(filename: str, sdir: str) -> dict:
+    """
+    Load and check a schema once, print its analysis
+    """
+    with open(posixpath.join(sdir, filename), encoding='utf8') as fp:
+        schema = schema_cache.load_any(fp)
+    print(f'{filename}:\n' + '\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(schema)).items()]))
+    return schema
+
+
+def render(schema: dict, filename: str, odir: str, fmt: str) -> tuple:
+    """
+    Write one output format, return (format, seconds, error message or '')
+    """
+    start = time.perf_counter()
+    try:
+        FORMATS[fmt](schema, os.path.join(odir, os.path.splitext(filename)[0] + fmt))
+        err = ''
+    except (ValueError, IndexError, KeyError, jsonschema.ValidationError) as e:
+        err = getattr(e, 'message', str(e))
+    return fmt, time.perf_counter() - start, err
+
+
+def translate(filename: str, sdir: str, odir: str) -> list:
+    """
+    Write all output formats for one schema, return a render result for each format
+    """
+    if not os.path.isfile(posixpath.join(sdir, filename)):
+        return []
     try:
-        with open(p, encoding='utf8') as fp:
-            schema = jadn.load_any(fp)
+        schema = load_schema(filename, sdir)
     except KeyError as e:
         print(e)
-        return
+        return []
+    return [render(schema, filename, odir, fmt) for fmt in FORMATS]
 
-    print(f'{filename}:\n' + '\n'.join([f'{k:>15}: {v}' for k, v in jadn.analyze(jadn.check(schema)).items()]))
-    fn, ext = os.path.splitext(filename)
-    jadn.dump(schema, os.path.join(odir, fn + '.jadn'))
-    jadn.dump(jadn.transform.unfold_extensions(jadn.transform.strip_comments(schema)),
-          os.path.join(odir, fn + '-core.jadn'))
-    jadn.convert.diagram_dump(schema, os.path.join(odir, fn + '_ia.dot'),
-          style={'format': 'graphviz', 'detail': 'information', 'attributes': True, 'links': True})
-    jadn.convert.diagram_dump(schema, os.path.join(odir, fn + '_i.puml'),
-          style={'format': 'plantuml', 'detail': 'information', 'attributes': False, 'links': False})
-    jadn.convert.jidl_dump(schema, os.path.join(odir, fn + '.jidl'), style={'desc': 50})
-    jadn.convert.html_dump(schema, os.path.join(odir, fn + '.html'))
-    jadn.convert.markdown_dump(schema, os.path.join(odir, fn + '.md'))
-    jadn.translate.json_schema_dump(schema, os.path.join(odir, fn + '.json'))
-
-
-def main(schema_dir: str = SCHEMA_DIR, output_dir: str = OUTPUT_DIR) -> None:
+
+def import_closure(filename: str, refs: dict, packages: dict) -> list:
+    """
+    Return the sorted files providing packages imported directly or indirectly by a schema
+    """
+    deps, todo = set(), [filename]
+    while todo:
+        for ns in refs[todo.pop()]['imports']:
+            if (f := packages.get(ns)) and f not in deps and f != filename:
+                deps.add(f)
+                todo.append(f)
+    return sorted(deps)
+
+
+def up_to_date(entry: dict, build: dict) -> bool:
+    """
+    True if source, imports and JADN version match the manifest and no artifact has been changed or removed
+    """
+    if not entry or any(entry.get(k) != build[k] for k in ('jadn', 'source', 'deps')):
+        return False
+    return all(os.path.isfile(a) and file_hash(a) == h for a, h in entry['artifacts'].items())
+
+
+def main(schema_dir: str = SCHEMA_DIR, output_dir: str = OUTPUT_DIR, force: bool = False, jobs: int = 1) -> None:
     print(f'Installed JADN version: {jadn.__version__}\n')
     css_dir = os.path.join(output_dir, 'css')
     os.makedirs(css_dir, exist_ok=True)
     shutil.copy(os.path.join(jadn.data_dir(), 'dtheme.css'), css_dir)
-    for f in os.listdir(schema_dir):
-        try:
-            translate(f, schema_dir, output_dir)
-        except (ValueError, IndexError) as e:
-            print(f'### {f}: {e}')
-            raise
+    try:
+        with open(mpath := os.path.join(output_dir, MANIFEST), encoding='utf8') as fp:
+            manifest = json.load(fp)
+    except (OSError, ValueError):
+        manifest = {}
+
+    files = sorted(f for f in os.listdir(schema_dir) if os.path.isfile(posixpath.join(schema_dir, f)))
+    src = {f: posixpath.join(schema_dir, f) for f in files}
+    hashes = {f: file_hash(src[f]) for f in files}
+    refs = {}                       # Package and imports, parsed only for new or changed schemas
+    for f in files:
+        if (entry := manifest.get(src[f], {})).get('source') == hashes[f] and 'refs' in entry:
+            refs[f] = entry['refs']
+        else:
+            try:
+                refs[f] = schema_refs(f, schema_dir)
+            except (ValueError, KeyError, jsonschema.ValidationError):    # Reported when the schema is translated
+                refs[f] = {'package': '', 'imports': []}
+    packages = {r['package']: f for f, r in refs.items() if r['package']}
+
+    stale = []
+    for f in files:
+        build = {'jadn': jadn.__version__, 'source': hashes[f], 'refs': refs[f],
+                 'deps': {d: hashes[d] for d in import_closure(f, refs, packages)}}
+        if not force and up_to_date(manifest.get(src[f]), build):
+            print(f'{f}: up to date')
+        else:
+            stale.append((f, build))
+
+    results = {}                    # Render results for each schema
+    try:
+        if jobs == 1:
+            for f, build in stale:
+                try:
+                    results[f] = translate(f, schema_dir, output_dir)
+                except (ValueError, IndexError, jsonschema.ValidationError) as e:
+                    print(f'### {f}: {getattr(e, "message", e)}')
+        else:                       # Parse and check each schema once, render all formats in worker processes
+            with ProcessPoolExecutor(max_workers=jobs if jobs > 0 else None) as ex:
+                futures = {}
+                for f, build in stale:
+                    try:
+                        schema = load_schema(f, schema_dir)
+                    except (ValueError, IndexError, KeyError, jsonschema.ValidationError) as e:
+                        print(f'### {f}: {getattr(e, "message", e)}')
+                        continue
+                    futures[f] = [ex.submit(render, schema, f, output_dir, fmt) for fmt in FORMATS]
+                results = {f: [x.result() for x in fs] for f, fs in futures.items()}
+        for f, build in stale:
+            if f not in results:
+                continue
+            if errors := [(fmt, err) for fmt, _, err in results[f] if err]:
+                print('\n'.join(f'### {f} ({fmt}): {err}' for fmt, err in errors))
+            elif results[f]:
+                fn = os.path.splitext(f)[0]
+                manifest[src[f]] = {**build, 'artifacts': {a: file_hash(a) for a in (
+                    os.path.join(output_dir, fn + fmt) for fmt in FORMATS)}}
+    finally:
+        with open(mpath, 'w', encoding='utf8') as fp:
+            json.dump(manifest, fp, indent=2)
+
+    timing = defaultdict(list)      # Seconds spent in each converter
+    for res in results.values():
+        for fmt, sec, _ in res:
+            timing[fmt].append(sec)
+    if timing:
+        print(f'\n{"format":>12} {"files":>6} {"total sec":>10} {"max sec":>8}')
+        for fmt, t in sorted(timing.items(), key=lambda x: -sum(x[1])):
+            print(f'{fmt:>12} {len(t):>6} {sum(t):>10.3f} {max(t):>8.3f}')
 
 
 if __name__ == '__main__':
+    import fire
     fire.Fire(main)
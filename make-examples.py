@@ -1,14 +1,27 @@
-import fire
 import jadn
 import json
 import os
+import package_index
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
 from jsf import JSF
 
 SCHEMA_DIR = 'Schemas'
 OUT_DIR = 'Out'
+CHUNK = 100             # Examples generated per worker task
+JSF_ENCODINGS = {'base16': 'base-16', 'base32': 'base-32', 'base64': 'base-64', 'base64url': 'base-64'}
 
+_generators = {}        # Bulk mode: type name -> JSF generator, built once per worker process
+_codec = None           # Bulk mode: Codec used to check generated examples
 
-def make_ex(schema: str = 'resolve.jidl', out: str = 'resolve.json'):
+
+def make_ex(schema: str = 'resolve.jidl', out: str = 'resolve.json', count: int = 0, types: str = '', jobs: int = 1,
+            check: bool = True, valid_only: bool = False):
+    if count > 0:
+        bulk(schema, count, types, jobs, check, valid_only)
+        return
     filename, ext = os.path.splitext(schema)
     with open(os.path.join(SCHEMA_DIR, schema)) as fp:
         sc = jadn.load_any(fp)
@@ -21,7 +34,119 @@ def make_ex(schema: str = 'resolve.jidl', out: str = 'resolve.json'):
     print(json.dumps(ex, indent=2))
 
 
+def jsf_compatible(js):
+    """
+    Rename contentEncoding values that JSF does not accept
+    """
+    if isinstance(js, dict):
+        return {k: JSF_ENCODINGS.get(v, v) if k == 'contentEncoding' else jsf_compatible(v) for k, v in js.items()}
+    return [jsf_compatible(v) for v in js] if isinstance(js, list) else js
+
+
+def type_schema(js: dict, type_name: str) -> dict:
+    """
+    Return a JSON Schema for one type, sharing the definitions of the whole schema
+    """
+    sc = {k: v for k, v in js.items() if k not in ('type', 'properties', 'additionalProperties', 'required', 'oneOf')}
+    return {**sc, '$ref': f'#/definitions/{type_name}'}
+
+
+def _init_worker(type_schemas: dict, schema: dict) -> None:
+    """
+    Build JSF generators (and the Codec, if checking examples) once per worker process
+    """
+    global _generators, _codec
+    _generators = {}
+    for tn, js in type_schemas.items():
+        try:
+            _generators[tn] = JSF(js)
+        except (ValueError, TypeError, KeyError, AttributeError, RecursionError) as e:  # Schema features JSF can't handle
+            _generators[tn] = f'{type(e).__name__}: {e}'
+    _codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True) if schema else None
+
+
+def _generate(type_name: str, n: int) -> tuple:
+    """
+    Generate n examples of a type, return (type, [(NDJSON line, valid)], error, generate seconds, check seconds).
+    valid is None if the example could not be checked because a schema pattern is not supported by Python re.
+    """
+    if isinstance(gen := _generators[type_name], str):
+        return type_name, [], gen, 0.0, 0.0
+    start = time.perf_counter()
+    try:
+        examples = gen.generate(n)
+    except (ValueError, TypeError, KeyError, RecursionError, re.error) as e:
+        return type_name, [], f'{type(e).__name__}: {e}', time.perf_counter() - start, 0.0
+    gen_time = time.perf_counter() - start
+    start = time.perf_counter()
+    valid = []
+    for ex in examples:
+        try:
+            if _codec:
+                _codec.decode(type_name, ex)
+            valid.append(True)
+        except ValueError:
+            valid.append(False)
+        except re.error:        # Schema pattern Python re does not support
+            valid.append(None)
+    return type_name, [(json.dumps(ex), v) for ex, v in zip(examples, valid)], '', gen_time, time.perf_counter() - start
+
+
+def bulk(schema: str, count: int = 100, types: str = '', jobs: int = 1, check: bool = True,
+         valid_only: bool = False, out_dir: str = OUT_DIR) -> None:
+    """
+    Generate count examples of each exported type (or of each type in types) to Out/<schema>-<type>.ndjson
+    """
+    filename, ext = os.path.splitext(os.path.basename(schema))
+    with open(path := os.path.join(SCHEMA_DIR, schema), encoding='utf-8') as fp:
+        sc = jadn.load_any(fp)
+    if sc.get('info', {}).get('namespaces'):    # Import referenced definitions from packages in the same folder
+        sc = package_index.resolve_imports(sc, package_index.PackageIndex(os.path.dirname(path)))
+    js = jsf_compatible(json.loads(jadn.translate.json_schema_dumps(sc)))
+    type_names = (types.split(',') if isinstance(types, str) else list(types)) if types else sc['info']['exports']
+    type_schemas = {tn: type_schema(js, tn) for tn in type_names}
+    tasks = [(tn, min(CHUNK, count - i)) for tn in type_names for i in range(0, count, CHUNK)]
+    stats = {tn: {'examples': 0, 'invalid': 0, 'unsupported': 0, 'gen': 0.0, 'check': 0.0, 'error': ''} for tn in type_names}
+    files = {}          # Type name -> NDJSON output file
+    start = time.perf_counter()
+    if jobs == 1:
+        _init_worker(type_schemas, sc if check else None)
+    with ExitStack() as stack, ProcessPoolExecutor(
+            max_workers=jobs if jobs > 0 else None, initializer=_init_worker,
+            initargs=(type_schemas, sc if check else None)) if jobs != 1 else nullcontext() as ex:
+        results = ex.map(_generate, *zip(*tasks)) if ex else (_generate(*t) for t in tasks)
+        for tn, lines, err, gen_time, check_time in results:
+            s = stats[tn]
+            s['gen'] += gen_time
+            s['check'] += check_time
+            if err:
+                s['error'] = err
+                continue
+            if tn not in files:
+                files[tn] = stack.enter_context(open(os.path.join(out_dir, f'{filename}-{tn}.ndjson'), 'w', encoding='utf-8'))
+            for line, valid in lines:
+                s['examples'] += 1
+                s['invalid'] += 1 if valid is False else 0
+                s['unsupported'] += 1 if valid is None else 0
+                if valid or not valid_only:
+                    files[tn].write(line + '\n')
+    elapsed = time.perf_counter() - start
+
+    print(f'{"type":<30} {"examples":>9} {"invalid":>8} {"unsupported pattern":>19} {"gen/sec":>9} {"check/sec":>10}')
+    for tn, s in stats.items():
+        if s['error']:
+            print(f'{tn:<30} ### {s["error"][:200]}')
+            continue
+        checked = s['examples'] - s['unsupported']
+        rate = f'{100 * s["invalid"] / checked:>7.1f}%' if check and checked else f'{"-":>8}'
+        unsupported = f'{s["unsupported"]:>19}' if check else f'{"-":>19}'
+        check_rate = f'{s["examples"] / s["check"]:>10.0f}' if check and s['check'] else f'{"-":>10}'
+        print(f'{tn:<30} {s["examples"]:>9} {rate} {unsupported} {s["examples"] / s["gen"] if s["gen"] else 0:>9.0f} {check_rate}')
+    print(f'{sum(s["examples"] for s in stats.values())} examples, {elapsed:.2f} sec')
+
+
 if __name__ == '__main__':
+    import fire
     print(f'Installed JADN version: {jadn.__version__}\n')
     os.makedirs(OUT_DIR, exist_ok=True)
     try:
@@ -0,0 +1,166 @@
+"""
+Read JADN schemas from the Markdown property tables used in OpenC2 specifications and profiles
+
+jadn.convert.markdown_loads parses JIDL lines rather than tables.  jadn.convert.markdown_dumps writes each
+type as a table whose type and field definitions use JADN IDL syntax, so markdown_loads here converts the
+tables to JIDL and parses that with jadn.convert.jidl_loads:
+
+    **Type: Name (Record{1..\\*})**             Name = Record{1..*}
+    | ID | Name | Type | # | Description |      n name Type [mult] // description
+    | ID | Type | # | Description |             n Type [mult] // name:: description  (Array)
+    | ID | Item | Description |                 n item // description            (Enumerated)
+    | ID | Description |                        n // item:: description          (Enumerated.ID)
+    | Type Name | Type Definition | Description |   Name = Definition // description
+
+jidl_loads ignores a size or value range followed by other options, as in "Binary{16..16} /x" or
+"ArrayOf(String){1..*} unique", so markdown_loads adds those range options to the parsed types and fields.
+"""
+import jadn
+import re
+from jadn.definitions import TypeName, BaseType, TypeOptions, Fields, FieldID, FieldOptions
+from jadn.utils import opts_sort
+from typing import TextIO
+
+TYPE_HEADING = re.compile(r'\*\*Type: (?P<name>\S+) \((?P<tdef>.*)\)\*\*')
+NAMED_DESC = re.compile(r'\*\*(?P<name>.*?)\*\*(\s+-\s*(?P<desc>.*))?')
+MULTIPLICITY = {'1': '', '0..1': ' optional'}
+RANGE = re.compile(r'\{(?P<min>[-\d.]+|\*)\.\.(?P<max>[-\d.]+|\*)\}\s')     # Range followed by other options
+
+
+def _cells(line: str, bounds: list = None) -> list:
+    """
+    Split a table row into cells.  Cells may contain '|' (in patterns or descriptions) if the row is
+    aligned with the column boundaries of the separator row, as in tables written by markdown_dumps.
+    """
+    if bounds and len(line) == bounds[-1] + 1 and all(line[b] == '|' for b in bounds):
+        cells = [line[a + 1:b] for a, b in zip(bounds, bounds[1:])]
+    else:
+        cells = line[1:-1].split('|', len(bounds) - 2 if bounds else -1)
+    return [_unescape(c.strip()) for c in cells]
+
+
+def _unescape(s: str) -> str:
+    return re.sub(r'\\([*#])', r'\1', s)     # Characters escaped by markdown_dumps
+
+
+def _unbold(s: str) -> str:
+    return s[2:-2] if s.startswith('**') and s.endswith('**') else s
+
+
+def _comment(desc: str) -> str:
+    return f' // {desc}' if desc else ''
+
+
+def _named(cell: str) -> tuple:
+    """
+    Split "**name** - description" into name and description
+    """
+    m = NAMED_DESC.fullmatch(cell)
+    return (m['name'], m['desc'] or '') if m else ('', cell)
+
+
+def _range_opts(type_name: str, typestr: str) -> list:
+    """
+    Return the range options of a type string that jidl_loads would ignore
+    """
+    if not (m := RANGE.search(typestr)):
+        return []
+    lo, hi = m['min'], m['max']
+    if type_name == 'Number':
+        return ([] if lo == '*' else [f'y{float(lo)}']) + ([] if hi == '*' else [f'z{float(hi)}'])
+    lo = '*' if type_name != 'Integer' and lo != '*' and int(lo) == 0 else lo      # Default min size = 0
+    return ([] if lo == '*' else [f'{{{lo}']) + ([] if hi == '*' else [f'}}{hi}'])
+
+
+def _convert(doc: str) -> tuple:
+    """
+    Convert Markdown property tables to JADN IDL, return (jidl, {(type name, field id or None): range options})
+    """
+    jidl, para, header, bounds, info, tname, ranges = [], [], None, [], True, '', {}
+
+    def typestr(key: tuple, ts: str) -> str:
+        if opts := _range_opts(re.match(r'[-$:\w]*', ts)[0], ts):
+            ranges[key] = opts
+        return ts
+
+    for line in doc.splitlines():
+        line = line.strip()
+        if not line or line.startswith('*****'):        # End of table, or type separator
+            header = None
+            para = para if not line else []
+            continue
+        if info and re.match(r'[\w-]+: ', line):         # Information (metadata) before the first type
+            jidl.append(line)
+            continue
+        info = False
+        if m := TYPE_HEADING.fullmatch(line):
+            desc = ' '.join(para)
+            tname = m['name']
+            jidl.append(f'\n{tname} = {typestr((tname, None), _unescape(m["tdef"]))}{_comment(desc)}')
+            para = []
+        elif line.startswith('|'):
+            if header is None:
+                header = [c.lower() for c in _cells(line)]
+                bounds = []
+            elif set(line) <= set('|-: '):              # Header separator
+                bounds = [i for i, c in enumerate(line) if c == '|']
+            elif len(cells := _cells(line, bounds)) != len(header):
+                raise ValueError(f'Table row does not match header "{" | ".join(header)}": {line}')
+            elif header == ['type name', 'type definition', 'description']:
+                desc = cells[2] or ' '.join(para)
+                tname = _unbold(cells[0])
+                jidl.append(f'\n{tname} = {typestr((tname, None), cells[1])}{_comment(desc)}')
+                para = []
+            elif header == ['id', 'name', 'type', '#', 'description']:
+                jidl.append(f'   {cells[0]} {_unbold(cells[1])} {typestr((tname, cells[0]), cells[2])}{_mult(cells[3])}{_comment(cells[4])}')
+            elif header == ['id', 'type', '#', 'description']:
+                name, desc = _named(cells[3])
+                jidl.append(f'   {cells[0]} {typestr((tname, cells[0]), cells[1])}{_mult(cells[2])} // {name}:: {desc}'.rstrip())
+            elif header == ['id', 'item', 'description']:
+                jidl.append(f'   {cells[0]} {_unbold(cells[1])}{_comment(cells[2])}')
+            elif header == ['id', 'description']:
+                name, desc = _named(cells[1])
+                jidl.append(f'   {cells[0]} // {name}:: {desc}'.rstrip())
+            else:
+                raise ValueError(f'Unrecognized table: {" | ".join(header)}')
+        else:
+            para.append(line)
+    return '\n'.join(jidl) + '\n', ranges
+
+
+def markdown2jidl(doc: str) -> str:
+    """
+    Convert Markdown property tables to JADN IDL
+    """
+    return _convert(doc)[0]
+
+
+def _mult(mult: str) -> str:
+    return MULTIPLICITY.get(mult, f' [{mult}]')
+
+
+def markdown_loads(doc: str) -> dict:
+    jidl, ranges = _convert(doc)
+    schema = jadn.convert.jidl_loads(jidl)
+    if ranges:
+        for td in schema['types']:
+            if opts := ranges.get((td[TypeName], None)):
+                td[TypeOptions] += [o for o in opts if o not in td[TypeOptions]]
+                opts_sort(td[TypeOptions])
+            for fd in td[Fields] if td[BaseType] != 'Enumerated' else []:
+                if opts := ranges.get((td[TypeName], str(fd[FieldID]))):
+                    fd[FieldOptions] += [o for o in opts if o not in fd[FieldOptions]]
+                    opts_sort(fd[FieldOptions])
+        schema = jadn.check(schema)
+    return schema
+
+
+def markdown_load(fp: TextIO) -> dict:
+    return markdown_loads(fp.read())
+
+
+__all__ = [
+    'markdown2jidl',
+    'markdown_load',
+    'markdown_loads'
+]
@@ -0,0 +1,174 @@
+"""
+Resolve namespaced references for many base schemas against one shared, indexed package directory
+
+jadn.transform.resolve_imports parses and checks every package in the reference directory each time
+it is called.  PackageIndex keeps a persistent index of each package file (content hash, package
+namespace, namespaces it imports, and type names), re-reading only files that changed since the
+last run, and loads each package at most once per run.  Packages are then shared by all base schemas
+resolved in the same process.
+"""
+import hashlib
+import jadn
+import json
+import jsonschema
+import os
+import schema_cache
+from collections import defaultdict
+from typing import Dict, Tuple
+from jadn.definitions import TypeName, OPTION_ID
+from jadn.transform.resolve import SchemaPackage, merge_typedef, resolve
+
+INDEX_VERSION = 1
+RESOLVE_JADN_VERSIONS = ('0.6.23',)     # jadn releases whose resolve_imports is reproduced here, see test-resolve.py
+
+
+class PackageIndex:
+    """
+    Index of the JADN packages in a reference directory: {file: {hash, package, namespaces, types}}
+    """
+    def __init__(self, reference_dir: str, cache_dir: str = schema_cache.CACHE_DIR):
+        self.reference_dir = reference_dir
+        key = hashlib.sha256(os.path.abspath(reference_dir).encode()).hexdigest()[:16]
+        self.path = os.path.join(cache_dir or '.', f'resolve-index-{key}.json')
+        self.files = {}
+        self.reindexed = []             # Files parsed during the last refresh
+        self._loaded = {}               # Package namespace -> checked SchemaPackage template
+        try:
+            with open(self.path, encoding='utf-8') as fp:
+                if (idx := json.load(fp)).get('version') == INDEX_VERSION and idx.get('jadn') == jadn.__version__:
+                    self.files = idx['files']
+        except (OSError, ValueError):
+            pass
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Re-index new and changed package files, drop deleted ones, and save the index.  Files are kept in
+        os.listdir order, the order jadn.transform.resolve_imports reads them: the first file of a package is
+        used, and packages are merged into resolved schemas in this order.
+        """
+        files, self.reindexed = {}, []
+        for fn in os.listdir(self.reference_dir):
+            if os.path.splitext(fn)[1] not in ('.jadn', '.jidl'):
+                continue
+            with open(path := os.path.join(self.reference_dir, fn), 'rb') as fp:
+                sha = hashlib.sha256(fp.read()).hexdigest()
+            if (entry := self.files.get(fn, {})).get('hash') == sha:
+                files[fn] = entry
+                continue
+            self.reindexed.append(fn)
+            try:
+                with open(path, encoding='utf-8') as fp:
+                    sc = schema_cache.load_any(fp)
+                info = sc.get('info', {})
+                files[fn] = {'hash': sha, 'package': info.get('package', ''), 'namespaces': info.get('namespaces', {}),
+                             'types': [t[TypeName] for t in sc['types']]}
+            except (ValueError, KeyError, jsonschema.ValidationError) as e:
+                print(f'* Index: skipping {fn}: {getattr(e, "message", e)}')
+                files[fn] = {'hash': sha, 'package': '', 'namespaces': {}, 'types': []}
+        self.files = files
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as fp:
+            json.dump({'version': INDEX_VERSION, 'jadn': jadn.__version__, 'files': files}, fp, indent=1)
+
+    def packages(self) -> Dict[str, str]:
+        """
+        Return {package namespace: file}, reporting files that duplicate a package
+        """
+        pkgs = {}
+        for fn, entry in self.files.items():
+            if not (pkg := entry['package']):
+                continue
+            if pkg in pkgs:
+                print(f'* Duplicate package {pkg}, Using: {pkgs[pkg]}, Ignoring: {fn}')
+            else:
+                pkgs[pkg] = fn
+        return pkgs
+
+    def find_type(self, package: str, type_name: str) -> str:
+        """
+        Return the file defining a type in a package namespace, or '' if not found
+        """
+        fn = self.packages().get(package, '')
+        return fn if type_name in self.files.get(fn, {}).get('types', []) else ''
+
+    def package(self, package: str) -> SchemaPackage:
+        """
+        Return a fresh SchemaPackage for one resolve, loading and checking the package file only once per run
+        """
+        if package not in self._loaded:
+            fn = self.packages()[package]
+            with open(os.path.join(self.reference_dir, fn), encoding='utf-8') as fp:
+                sm = SchemaPackage(schema_cache.load_any(fp))
+            sm.source = os.path.join(self.reference_dir, fn)
+            sm.load()
+            self._loaded[package] = sm
+        t = self._loaded[package]
+        sm = SchemaPackage({**t.schema, 'types': list(t.schema['types'])})     # Resolve may append derived enums
+        sm.source, sm.tx, sm.deps, sm.refs = t.source, t.tx, t.deps, t.refs
+        return sm
+
+
+class _Packages(dict):
+    """
+    Package lookup for jadn.transform.resolve that loads packages from the index on first use
+    """
+    def __init__(self, index: PackageIndex, root: SchemaPackage):
+        super().__init__({root.package: root})
+        self.index = index
+        self.available = index.packages()
+
+    def __contains__(self, pkg) -> bool:
+        return super().__contains__(pkg) or pkg in self.available
+
+    def __missing__(self, pkg) -> SchemaPackage:
+        self[pkg] = self.index.package(pkg)
+        return self[pkg]
+
+
+def resolve_imports(schema: dict, index: PackageIndex, no_nsid: Tuple[str, ...] = ()) -> dict:
+    """
+    Equivalent to jadn.transform.resolve_imports(schema, index.reference_dir, no_nsid), using the shared index.
+    The shared index reproduces jadn's private resolve steps, so other jadn releases call jadn's resolve_imports,
+    which reads every package again, until test-resolve.py passes and the release is added to RESOLVE_JADN_VERSIONS.
+    """
+    if jadn.__version__ not in RESOLVE_JADN_VERSIONS:
+        return jadn.transform.resolve_imports(schema, index.reference_dir, no_nsid)
+    return _resolve_indexed(schema, index, no_nsid)
+
+
+def _resolve_indexed(schema: dict, index: PackageIndex, no_nsid: Tuple[str, ...] = ()) -> dict:
+    """
+    jadn.transform.resolve_imports (jadn 0.6.23) with packages loaded from the index
+    """
+    sys = '$'   # Character reserved for use in tool-generated type names
+    root = SchemaPackage(schema)
+    packages = _Packages(index, root)
+    nsids = defaultdict(list)
+    for fn, entry in index.files.items():
+        for i, m in entry['namespaces'].items():
+            nsids[m].append('' if i in no_nsid else i)
+    if not any(e['package'] == root.package for e in index.files.values()):    # Base schema is not in reference_dir
+        for i, m in root.namespaces.items():
+            nsids[m].append('' if i in no_nsid else i)
+    resolve(root, root.schema['info']['exports'] if 'exports' in root.schema['info'] else set(), packages)
+
+    for t in root.used.copy():
+        if t[0] in (OPTION_ID['enum'], OPTION_ID['pointer']):
+            if t[1:] not in root.used:
+                jadn.raise_error(f'Resolve: no base type for {t}')
+            root.used.remove(t)     # Don't need explicit type if base type is present
+
+    # Copy all needed types from other packages into root
+    nsids[root.package] = ['']
+    sc = {'info': {k: v for k, v in root.schema['info'].items() if k != 'namespaces'}, 'types': []}    # Remove namespaces
+    loaded = [packages.get(p) for p in packages.available if p != root.package]    # In index order, like jadn
+    for sm in [root] + [m for m in loaded if m]:
+        sc['types'] += [merge_typedef(t, sm.package, sm.namespaces, nsids, sys) for t in sm.schema['types'] if t[TypeName] in sm.used]
+    return sc
+
+
+__all__ = [
+    'PackageIndex',
+    'resolve_imports'
+]
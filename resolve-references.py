@@ -2,29 +2,53 @@
 Import namespaced type definitions into a base package.
 
 Search all packages in SCHEMA_DIR for referenced definitions, put resolved base file in OUTPUT_DIR.
+If the base package is a directory, resolve every package in it using one shared package index.
 """
 
-import fire
 import jadn
+import jsonschema
 import os
+import package_index
+import schema_cache
+import time
 
 SCHEMA_DIR = 'Schemas'
 OUTPUT_DIR = 'Out'
 
 
+def resolve_file(path: str, index: package_index.PackageIndex, output_dir: str, merge_ns: str) -> None:
+    filename, ext = os.path.splitext(os.path.basename(path))
+    with open(path, encoding='utf-8') as fp:
+        sc = schema_cache.load_any(fp)         # Load base package
+    sc2 = package_index.resolve_imports(sc, index, (merge_ns,))     # Resolve referenced definitions
+    jadn.dump(sc2, os.path.join(output_dir, filename + '-resolved.jadn'))   # Save resolved base package
+    print(f'{filename + ext}:\n' + '\n'.join([f'{k:>14}: {v}' for k, v in jadn.analyze(jadn.check(sc2)).items()]))
+
+
 def resolve(schema: str, reference_dir: str = SCHEMA_DIR, output_dir: str = OUTPUT_DIR, merge_ns: str = '') -> None:
     print(f'Installed JADN version: {jadn.__version__}\n')
     print(f'{reference_dir}/{schema} -> {output_dir}: merge={merge_ns}')
     os.makedirs(output_dir, exist_ok=True)
-    filename, ext = os.path.splitext(schema)
-    with open(os.path.join(reference_dir, schema), encoding='utf-8') as fp:
-        sc = jadn.load_any(fp)                 # Load base package
-    sc2 = jadn.transform.resolve_imports(sc, reference_dir, (merge_ns,))        # Resolve referenced definitions
-    jadn.dump(sc2, os.path.join(output_dir, filename + '-resolved.jadn'))   # Save resolved base package
-    print(f'{schema}:\n' + '\n'.join([f'{k:>14}: {v}' for k, v in jadn.analyze(jadn.check(sc2)).items()]))
+    start = time.perf_counter()
+    index = package_index.PackageIndex(reference_dir)
+    print(f'Index: {len(index.files)} packages, {len(index.reindexed)} re-indexed')
+    if not os.path.isdir(path := os.path.join(reference_dir, schema)):
+        resolve_file(path, index, output_dir, merge_ns)
+        return
+
+    files = sorted(f for f in os.listdir(path) if os.path.splitext(f)[1] in ('.jadn', '.jidl'))
+    errors = 0
+    for f in files:
+        try:
+            resolve_file(os.path.join(path, f), index, output_dir, merge_ns)
+        except (ValueError, KeyError, IndexError, jsonschema.ValidationError) as e:
+            errors += 1
+            print(f'### {f}: {getattr(e, "message", e)}')
+    print(f'\nResolved {len(files) - errors} of {len(files)} packages in {time.perf_counter() - start:.2f} sec')
 
 
 if __name__ == '__main__':
+    import fire
     try:
         fire.Fire(resolve)
     except FileNotFoundError as e:
@@ -0,0 +1,124 @@
+"""
+Route JSON documents to the exported type that validates them, by their top-level key
+
+OSCAL documents have a single top-level property naming the model ("catalog", "system-security-plan",
+"component-definition", ...).  Validating every document against a catch-all Choice of all models makes
+the Codec try alternatives until one matches.  RootIndex maps each document key to the exported type for
+that model once, from all schemas in a directory:
+
+    Record or Map with one required field "catalog"     catalog -> (schema, Record), decode whole document
+    Choice with field "catalog"                         catalog -> (schema, field type), decode doc["catalog"]
+
+Top-level keys starting with '$' (e.g. "$schema") are ignored when routing.  Codecs are built for each
+schema the first time a document is routed to it.  validate_split() routes a large document file by its
+top-level keys without parsing it, and validates its big arrays in parallel (see split_document).
+"""
+import jadn
+import jsonschema
+import os
+import re
+import schema_cache
+from compiled_schema import compile_schema
+from split_document import SplitDocument
+from typing import Dict, NamedTuple
+
+
+class Route(NamedTuple):
+    key: str            # Top-level document key
+    schema: str         # Schema file name
+    type: str           # Type used to decode the document
+    unwrap: bool        # Decode the value of the document key instead of the whole document
+
+
+class RootIndex:
+    """
+    Index of document keys to exported types of the JADN schemas in a directory: {key: Route}
+    """
+    def __init__(self, schema_dir: str):
+        self.schema_dir = schema_dir
+        self.schemas = {}       # Schema file name -> checked schema
+        self.routes: Dict[str, Route] = {}
+        self._codecs = {}       # Schema file name -> Codec
+        for fn in sorted(os.listdir(schema_dir)):
+            if os.path.splitext(fn)[1] not in ('.jadn', '.jidl'):
+                continue
+            try:
+                with open(os.path.join(schema_dir, fn), encoding='utf-8') as fp:
+                    self.schemas[fn] = schema_cache.load_any(fp)
+            except (ValueError, jsonschema.ValidationError) as e:     # Bad JADN, or fails the JADN metaschema
+                print(f'* Index: skipping {fn}: {getattr(e, "message", e)}')
+                continue
+            for key, route in self.schema_routes(fn, self.schemas[fn]).items():
+                if key not in self.routes:
+                    self.routes[key] = route
+                elif self.package(self.routes[key].schema) != self.package(fn):    # Not another format of the same package
+                    print(f'* Duplicate document key "{key}", Using: {self.routes[key].schema}, Ignoring: {fn}')
+
+    def package(self, fn: str) -> str:
+        return self.schemas[fn].get('info', {}).get('package', fn)
+
+    @staticmethod
+    def schema_routes(fn: str, schema: dict) -> Dict[str, Route]:
+        """
+        Return {document key: Route} for the exported types of one schema
+        """
+        cs = compile_schema(schema)
+        routes = {}
+        for tn in (cs.info or {}).get('exports', []):
+            if not (td := cs.type(tn)):
+                continue
+            if td.base_type == 'Choice':
+                routes.update({f.name: Route(f.name, fn, f.type, True) for f in td.fields})
+            elif td.base_type in ('Record', 'Map'):
+                required = [f.name for f in td.fields if f.fopts.get('minc', 1) > 0 and not f.name.startswith('$')]
+                if len(required) == 1:
+                    routes[required[0]] = Route(required[0], fn, tn, False)
+        return routes
+
+    def route(self, doc) -> Route:
+        """
+        Return the Route for a document, raise LookupError if no exported type matches its top-level key
+        """
+        keys = [k for k in doc if not k.startswith('$')] if isinstance(doc, dict) else []
+        if len(keys) != 1 or keys[0] not in self.routes:
+            raise LookupError(f'No exported type for document keys {keys}')
+        return self.routes[keys[0]]
+
+    def codec(self, fn: str) -> jadn.codec.Codec:
+        if (codec := self._codecs.get(fn)) is None:
+            codec = self._codecs[fn] = jadn.codec.Codec(self.schemas[fn], verbose_rec=True, verbose_str=True)
+        return codec
+
+    def validate(self, doc) -> tuple:
+        """
+        Decode a document with the type for its top-level key, return (Route or None, error message or '')
+        """
+        try:
+            r = self.route(doc)
+        except LookupError as e:
+            return None, e.args[0]
+        try:
+            self.codec(r.schema).decode(r.type, doc[r.key] if r.unwrap else doc)
+            return r, ''
+        except ValueError as e:
+            return r, str(e)
+        except re.error as e:       # Schema pattern not supported by Python re
+            return r, f'Unsupported pattern: {e}'
+
+    def validate_split(self, path: str, jobs: int = 0) -> tuple:
+        """
+        Validate a document file with its big arrays split across jobs worker processes,
+        return (Route or None, [(JSON Pointer, error message)])
+        """
+        with SplitDocument(path) as doc:
+            try:
+                r = self.route(dict.fromkeys(doc.keys))
+            except LookupError as e:
+                return None, [('', e.args[0])]
+            return r, doc.validate(self.schemas[r.schema], r.type, r.key if r.unwrap else '', jobs)
+
+
+__all__ = [
+    'RootIndex',
+    'Route'
+]
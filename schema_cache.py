@@ -0,0 +1,122 @@
+"""
+Cache checked JADN schemas on disk, keyed by a hash of the schema source and the installed JADN version
+
+A warm load reads the checked schema from the cache directory, skipping parsing and jadn.check.
+Codec symbol tables contain format validation closures that cannot be serialized, so a Codec
+is built in-process from the cached schema.  Set the JADN_CACHE environment variable to change
+the cache directory, or to an empty string to disable caching.
+
+jadn and the schema loaders are imported only when a schema is not in the cache, so a warm load of a schema
+does not pay the cost of importing jadn.
+"""
+import hashlib
+import importlib
+import json
+import os
+import sys
+from typing import TextIO
+
+CACHE_DIR = os.environ.get('JADN_CACHE', '.jadn-cache')
+
+LOADERS = {         # Extension: (module, function)
+    '.jadn': ('jadn', 'loads'),
+    '.jidl': ('jadn.convert', 'jidl_loads'),
+    '.html': ('jadn.convert', 'html_loads')
+}
+MARKDOWN_LOADER = ('markdown_tables', 'markdown_loads')     # .md, only if requested: most Markdown files are not schemas
+
+
+def jadn_version() -> str:
+    """
+    Return the installed JADN version, without importing jadn if it has not already been imported
+    """
+    if m := sys.modules.get('jadn'):
+        return m.__version__
+    import importlib.metadata
+    return importlib.metadata.version('jadn')
+
+
+def parse(doc: str, ext: str) -> dict:
+    """
+    Return the checked schema for source text, without using the cache
+    """
+    module, fn = MARKDOWN_LOADER if ext == '.md' else LOADERS[ext]
+    return getattr(importlib.import_module(module), fn)(doc)
+
+
+def cache_key(doc: str, ext: str) -> str:
+    """
+    Return a key that changes when either the schema source or the JADN version changes
+    """
+    return hashlib.sha256(f'{jadn_version()}\n{ext}\n{doc}'.encode()).hexdigest()
+
+
+def loads_any(doc: str, ext: str, cache_dir: str = CACHE_DIR, markdown: bool = False) -> dict:
+    """
+    Return the checked schema for source text in the format given by its file extension,
+    including the property tables of a Markdown (.md) profile document if markdown is True
+    """
+    if ext not in LOADERS and not (markdown and ext == '.md'):
+        raise ValueError(f'Unsupported schema format: {ext}')
+    if not cache_dir:
+        return parse(doc, ext)
+    path = os.path.join(cache_dir, cache_key(doc, ext) + '.json')
+    try:
+        with open(path, encoding='utf-8') as fp:
+            return json.load(fp)
+    except (OSError, ValueError):       # Missing or unreadable entry
+        pass
+    schema = parse(doc, ext)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(tmp := f'{path}.{os.getpid()}', 'w', encoding='utf-8') as fp:
+        json.dump(schema, fp)
+    os.replace(tmp, path)               # Atomic, concurrent writers of the same key are harmless
+    return schema
+
+
+def load_any(fp: TextIO, cache_dir: str = CACHE_DIR, markdown: bool = False) -> dict:
+    """
+    Cached equivalent of jadn.load_any, also loading Markdown property tables if markdown is True
+    """
+    name = getattr(fp, 'name', getattr(getattr(fp, 'buffer', None), 'url', ''))
+    return loads_any(fp.read(), os.path.splitext(name)[1], cache_dir, markdown)
+
+
+def load_codec(fp: TextIO, verbose_rec: bool = True, verbose_str: bool = True, cache_dir: str = CACHE_DIR,
+               generated: bool = False) -> 'jadn.codec.Codec':
+    """
+    Return a Codec for a schema file, using the cached checked schema if available.
+    If generated, return a GeneratedCodec using the cached generated module if available.
+    """
+    if generated:
+        from generated_codec import GeneratedCodec
+        return GeneratedCodec(load_any(fp, cache_dir), verbose_rec, verbose_str, os.path.join(cache_dir, 'codecs') if cache_dir else '')
+    import jadn
+    return jadn.codec.Codec(load_any(fp, cache_dir), verbose_rec=verbose_rec, verbose_str=verbose_str)
+
+
+def clear(cache_dir: str = CACHE_DIR) -> int:
+    """
+    Delete all cached schemas, return the number of entries removed
+    """
+    n = 0
+    if os.path.isdir(cache_dir):
+        for f in os.scandir(cache_dir):
+            if f.name.endswith('.json'):
+                os.remove(f.path)
+                n += 1
+    return n
+
+
+__all__ = [
+    'CACHE_DIR',
+    'LOADERS',
+    'MARKDOWN_LOADER',
+    'cache_key',
+    'clear',
+    'jadn_version',
+    'load_any',
+    'load_codec',
+    'loads_any',
+    'parse'
+]
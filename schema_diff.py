@@ -0,0 +1,113 @@
+"""
+Structural comparison of two JADN schemas
+
+Each type definition is reduced to a canonical form: option strings sorted and with default values removed
+(multiplicity 1..1, minv 0 on non-Integer types), descriptions stripped of surrounding whitespace, and fields
+in id order.  A type's hash is the hash of its canonical form, so schemas loaded from different formats
+(JADN, JIDL, HTML or Markdown property tables) compare equal when they define the same types.  Only types
+whose hashes differ are compared field by field.
+"""
+import hashlib
+import json
+from compiled_schema import CompiledSchema, FieldDef, TypeDef, compile_schema
+from diagram_graph import field_def
+from typing import Union
+
+DEFAULT_OPTIONS = {'[1', ']1'}      # minc=1, maxc=1
+
+
+def _options(options: tuple, type_name: str) -> list:
+    return sorted(o for o in options if o not in DEFAULT_OPTIONS and not (o == '{0' and type_name != 'Integer'))
+
+
+def canonical_field(fd: FieldDef, descriptions: bool = True) -> list:
+    return [fd.id, fd.name, fd.type, _options(fd.options, fd.type), fd.desc.strip() if descriptions else '']
+
+
+def canonical_type(td: TypeDef, descriptions: bool = True) -> list:
+    return [td.base_type, _options(td.options, td.base_type), td.desc.strip() if descriptions else '',
+            [canonical_field(f, descriptions) for f in sorted(td.fields, key=lambda f: f.id)]]
+
+
+def type_hash(td: TypeDef, descriptions: bool = True) -> str:
+    return hashlib.sha256(json.dumps(canonical_type(td, descriptions), separators=(',', ':')).encode()).hexdigest()
+
+
+def type_hashes(schema: Union[dict, CompiledSchema], descriptions: bool = True) -> dict:
+    """
+    Return {type name: hash of canonical type definition} in schema order
+    """
+    return {tn: type_hash(td, descriptions) for tn, td in compile_schema(schema).types.items()}
+
+
+def field_str(fd: FieldDef, td: TypeDef) -> str:
+    """
+    Return a field as it appears in JIDL: id, name, type and multiplicity
+    """
+    fname, ftype, fmult = field_def(fd, td)
+    if td.base_type == 'Enumerated':
+        return f'{fd.id} {fd.name}'
+    return f'{fd.id} {fd.name} {ftype}' + ('' if fmult == '1' else f' [{fmult}]')
+
+
+def diff_fields(old: TypeDef, new: TypeDef, descriptions: bool = True) -> dict:
+    """
+    Compare the fields of two versions of a type, matching fields by name
+    """
+    old_f = {f.name: f for f in old.fields}
+    new_f = {f.name: f for f in new.fields}
+    changed = {}
+    for name in old_f.keys() & new_f.keys():
+        a, b = old_f[name], new_f[name]
+        if canonical_field(a, descriptions) != canonical_field(b, descriptions):
+            changed[name] = {
+                k: [x, y] for k, x, y in (
+                    ('id', a.id, b.id),
+                    ('definition', field_str(a, old), field_str(b, new)),
+                    ('options', _options(a.options, a.type), _options(b.options, b.type)),
+                    ('description', a.desc.strip(), b.desc.strip()) if descriptions else ('', '', '')
+                ) if x != y
+            }
+    return {
+        'added': [field_str(f, new) for n, f in new_f.items() if n not in old_f],
+        'removed': [field_str(f, old) for n, f in old_f.items() if n not in new_f],
+        'changed': {n: changed[n] for n in new_f if n in changed}
+    }
+
+
+def diff_type(old: TypeDef, new: TypeDef, descriptions: bool = True) -> dict:
+    d = {k: [x, y] for k, x, y in (
+        ('base_type', old.base_type, new.base_type),
+        ('options', _options(old.options, old.base_type), _options(new.options, new.base_type)),
+        ('description', old.desc.strip(), new.desc.strip()) if descriptions else ('', '', '')
+    ) if x != y}
+    if [f.name for f in sorted(old.fields, key=lambda f: f.id)] != [f.name for f in sorted(new.fields, key=lambda f: f.id)]:
+        d['order'] = True
+    return d | {k: v for k, v in diff_fields(old, new, descriptions).items() if v}
+
+
+def diff_schemas(old: Union[dict, CompiledSchema], new: Union[dict, CompiledSchema], descriptions: bool = True) -> dict:
+    """
+    Return the types added, removed and changed (with field-level detail) from old to new
+    """
+    old, new = compile_schema(old), compile_schema(new)
+    old_h, new_h = type_hashes(old, descriptions), type_hashes(new, descriptions)
+    changed = [tn for tn, h in new_h.items() if tn in old_h and old_h[tn] != h]
+    info = {k: [x, y] for k in {**(old.info or {}), **(new.info or {})}
+            if (x := (old.info or {}).get(k)) != (y := (new.info or {}).get(k))}
+    return {
+        'info': info,
+        'added': [tn for tn in new_h if tn not in old_h],
+        'removed': [tn for tn in old_h if tn not in new_h],
+        'changed': {tn: diff_type(old.types[tn], new.types[tn], descriptions) for tn in changed},
+        'unchanged': sum(1 for tn, h in new_h.items() if old_h.get(tn) == h)
+    }
+
+
+__all__ = [
+    'canonical_type',
+    'diff_schemas',
+    'diff_type',
+    'type_hash',
+    'type_hashes'
+]
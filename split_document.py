@@ -0,0 +1,247 @@
+"""
+Validate one large JSON document in parallel by splitting its big arrays into slices
+
+File-level parallelism does not help with a single large OSCAL catalog or CycloneDX BOM.  SplitDocument
+memory-maps the file and scans its structure (strings and brackets, without building any values) for the
+arrays under keys such as "controls" and "components" and the byte range of each of their elements:
+
+    envelope    the document with each split array cut down to its first element (or minimum number of
+                elements), decoded against the document type: checks everything outside the split arrays
+    slices      runs of consecutive elements, each element decoded against the item type of its array by a
+                pool of worker processes that read it from their own memory map of the file
+
+The envelope is decoded in this process while the workers decode the slices.  Array lengths are checked
+against the array type's maximum from the element count.  Split arrays are not nested: arrays inside an
+element of a split array are validated with the element.  An array whose type is not an ArrayOf, or that
+requires unique items, is validated whole in the envelope.  Errors are returned in document order with the
+JSON Pointer of the element or array they occur in ('' for the envelope).
+"""
+import jadn
+import json
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import List, NamedTuple, Optional, Tuple
+
+SPLIT_KEYS = ('controls', 'components')     # Keys of the arrays to split: catalog/group controls, BOM components
+SLICES_PER_JOB = 8                          # Slices per worker, to balance elements of uneven size
+STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+TOKEN = re.compile(STRING + rb'|[\[\]{},:]')                                  # A string or delimiter
+BRACKET = re.compile(rb'[^"\[\]{}]*(?:' + STRING + rb'[^"\[\]{}]*)*[\[\]{}]')     # Text up to the next bracket
+QUOTE, LBRACE, RBRACE, LBRACKET, RBRACKET, COMMA, COLON = b'"{}[],:'
+
+_codec = None               # Worker state: Codec for the schema, and memory map of the document
+_schema = None
+_path = ''
+_buf = None
+
+
+class SplitArray(NamedTuple):
+    path: tuple         # JSON path of the array: object keys and array indexes
+    start: int          # Offset of '['
+    end: int            # Offset of ']'
+    items: list         # (start, end) offsets of each element
+
+
+def pointer(path: tuple) -> str:
+    """
+    Return the JSON Pointer for a JSON path
+    """
+    return ''.join('/' + str(p).replace('~', '~0').replace('/', '~1') for p in path)
+
+
+def _scalars(buf, start: int, end: int) -> list:
+    """
+    Return the (start, end) offsets of the comma-separated values between start and end, which contain no containers
+    """
+    if buf[start:end].strip() in (b'', b','):
+        return []
+    commas = [m.start() for m in TOKEN.finditer(buf, start, end) if buf[m.start()] == COMMA]
+    return [(s, e) for s, e in zip([start] + [c + 1 for c in commas], commas + [end]) if buf[s:e].strip()]
+
+
+def _elements(buf, start: int) -> Tuple[list, int]:
+    """
+    Return the (start, end) offsets of the elements of the array at start ('[') and the offset of its ']'
+    """
+    items, depth, gap, first = [], 0, start + 1, 0
+    for m in BRACKET.finditer(buf, start + 1):
+        if (c := buf[pos := m.end() - 1]) == LBRACE or c == LBRACKET:
+            if depth == 0:
+                items += _scalars(buf, gap, pos)
+                first = pos
+            depth += 1
+        elif depth == 0:
+            return items + _scalars(buf, gap, pos), pos
+        elif (depth := depth - 1) == 0:
+            gap = pos + 1
+            items.append((first, gap))
+    raise ValueError(f'Unterminated array at offset {start}')
+
+
+def scan(buf, keys=SPLIT_KEYS) -> Tuple[list, List[SplitArray]]:
+    """
+    Return the top-level keys of a JSON document and the outermost arrays whose key is in keys, without decoding values
+    """
+    top, arrays = [], []
+    stack, objects = [], []     # Current key or index of each open container outside split arrays, and if it is an object
+    key = (0, 0)                # Offsets of the last string
+    pos = 0
+    while pos is not None:
+        for m in TOKEN.finditer(buf, pos):
+            if (c := buf[pos := m.start()]) == QUOTE:
+                key = (pos, m.end())
+            elif c == COLON:
+                stack[-1] = json.loads(buf[key[0]:key[1]])
+                if len(stack) == 1:
+                    top.append(stack[-1])
+            elif c == LBRACKET and objects and objects[-1] and stack[-1] in keys:
+                items, end = _elements(buf, pos)
+                arrays.append(SplitArray(tuple(stack), pos, end, items))
+                pos = end + 1
+                break
+            elif c == LBRACE or c == LBRACKET:
+                stack.append(None if c == LBRACE else 0)
+                objects.append(c == LBRACE)
+            elif c == COMMA:
+                if not objects[-1]:
+                    stack[-1] += 1
+            elif c == RBRACE or c == RBRACKET:
+                stack.pop()
+                objects.pop()
+        else:
+            pos = None
+    return top, arrays
+
+
+def array_type(codec: jadn.codec.Codec, type_name: str, path: tuple) -> Optional[tuple]:
+    """
+    Return the symbol table entry of the ArrayOf type at a JSON path in an instance of type_name,
+    or None if the value there can't be validated by element
+    """
+    tn = type_name
+    for p in path:
+        if not (ts := codec.symtab.get(tn)):
+            return None
+        base = ts.TypeDef.BaseType
+        if isinstance(p, int) and base == 'ArrayOf' or isinstance(p, str) and base == 'MapOf':
+            tn = ts.TypeOpts['vtype']
+        elif isinstance(p, str) and base in ('Record', 'Map', 'Choice') and (fd := ts.Fld.get(p)):
+            tn = fd.Def.FieldType
+        else:
+            return None
+    ts = codec.symtab.get(tn)
+    return ts if ts and ts.TypeDef.BaseType == 'ArrayOf' and not {'unique', 'set'} & set(ts.TypeOpts) else None
+
+
+def _init_worker(path: str, schema: dict, buf=None) -> None:
+    """
+    Build the Codec and memory-map the document once per worker process
+    """
+    global _codec, _schema, _path, _buf
+    if _schema is not schema:
+        _codec, _schema = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True), schema
+    if buf is None and path != _path:
+        with open(path, 'rb') as fp:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    _path, _buf = path, buf or _buf
+
+
+def _decode(type_name: str, doc: bytes, unwrap: str = '') -> str:
+    """
+    Decode a JSON value, return an error message or ''
+    """
+    try:
+        val = json.loads(doc)
+        _codec.decode(type_name, val[unwrap] if unwrap else val)
+        return ''
+    except ValueError as e:     # Includes JSONDecodeError
+        return str(e)
+    except re.error as e:       # Schema pattern not supported by Python re
+        return f'Unsupported pattern: {e}'
+
+
+def _check_slice(elements: list) -> list:
+    """
+    Decode each (pointer, type, start, end) element of a slice, return [(start, pointer, error)]
+    """
+    return [(start, ptr, err) for ptr, tn, start, end in elements if (err := _decode(tn, _buf[start:end]))]
+
+
+class SplitDocument:
+    """
+    A memory-mapped JSON document, its top-level keys and the arrays to validate in parallel
+    """
+    def __init__(self, path: str, keys=SPLIT_KEYS):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self.buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        start = time.perf_counter()
+        self.keys, self.arrays = scan(self.buf, keys)
+        self.scan_time = time.perf_counter() - start
+
+    def close(self) -> None:
+        self.buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def validate(self, schema: dict, type_name: str, unwrap: str = '', jobs: int = 0) -> list:
+        """
+        Decode the document against type_name (or its unwrap key's value against type_name) using a pool of
+        jobs worker processes (default one per core), return [(JSON Pointer, error message)] in document order
+        """
+        jobs = jobs if jobs > 0 else os.cpu_count()
+        _init_worker(self.path, schema, self.buf)
+        errors, cuts, elements = [], [], []
+        for a in self.arrays:
+            if unwrap and a.path[:1] != (unwrap,) or not (ts := array_type(_codec, type_name, a.path[1 if unwrap else 0:])):
+                continue                # Validated whole in the envelope
+            n, op = len(a.items), ts.TypeOpts
+            if 'maxv' in op and n > op['maxv']:
+                errors.append((a.start, pointer(a.path), f'{ts.TypeDef.TypeName}: length {n} > maximum {op["maxv"]}'))
+            if (keep := min(n, max(1, op.get('minv', 0)))) < n:
+                cuts.append((a.items[keep - 1][1], a.end))
+            elements += [(pointer(a.path + (i,)), op['vtype'], s, e) for i, (s, e) in enumerate(a.items)]
+
+        size = max(1, sum(e[3] - e[2] for e in elements) // (jobs * SLICES_PER_JOB))
+        slices, sl, nbytes = [], [], 0
+        for e in elements:
+            sl.append(e)
+            if (nbytes := nbytes + e[3] - e[2]) >= size:
+                slices.append(sl)
+                sl, nbytes = [], 0
+        slices += [sl] if sl else []
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(self.path, schema)) \
+                if jobs > 1 else nullcontext() as ex:
+            results = ex.map(_check_slice, slices) if ex else map(_check_slice, slices)
+            ends = [0] + [e for c in cuts for e in c] + [len(self.buf)]
+            envelope = b''.join(self.buf[ends[i]:ends[i + 1]] for i in range(0, len(ends), 2))
+            env_err = _decode(type_name, envelope, unwrap)     # In this process while the workers decode slices
+            for r in results:
+                errors += r
+        elapsed = time.perf_counter() - start
+        if env_err and env_err not in {e[2] for e in errors}:    # Not an error in an element kept in the envelope
+            errors.append((-1, '', env_err))
+        print(f'{type_name}: {len(elements)} elements of {len(self.arrays)} arrays in {len(slices)} slices, {jobs} workers,'
+              f' envelope {len(envelope)} bytes, scan {self.scan_time:.3f} sec, validate {elapsed:.3f} sec,'
+              f' {len(self.buf) / (self.scan_time + elapsed) / 1e6:.1f} MB/sec')
+        return [(p, e) for _, p, e in sorted(errors, key=lambda x: x[0])]
+
+
+__all__ = [
+    'SPLIT_KEYS',
+    'SplitArray',
+    'SplitDocument',
+    'array_type',
+    'pointer',
+    'scan'
+]
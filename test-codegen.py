@@ -0,0 +1,98 @@
+"""
+Check that generated codecs are drop-in replacements for the Codec on the device test fixtures, and time both
+
+    test-codegen.py [--root Test] [--repeat 20]
+
+For each device folder in root, every Good-* and Bad-* file is decoded as an OpenC2-Command or OpenC2-Response
+by the Codec and by the GeneratedCodec for the device schema (see generated_codec).  Verdicts and error
+messages must be identical, and each decoded instance must encode to the same value with both.  Exits with
+status 1 if any file differs.
+"""
+import glob
+import jadn
+import json
+import os
+import schema_cache
+import time
+from generated_codec import GeneratedCodec
+
+ROOT_DIR = 'Test'
+MESSAGE_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+
+
+def run(fn, type_name: str, val) -> tuple:
+    """
+    Return ('pass', value), ('fail', error message) or ('error', exception) for a decode or encode
+    """
+    try:
+        return 'pass', fn(type_name, val)
+    except ValueError as e:
+        return 'fail', str(e)
+    except Exception as e:      # The Codec's other exceptions must be reproduced too
+        return 'error', f'{type(e).__name__}: {e}'
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_device(schema_path: str, repeat: int) -> tuple:
+    """
+    Compare both codecs on the fixtures of one device, return (files, differences, Codec seconds, generated seconds)
+    """
+    with open(schema_path, encoding='utf-8') as fp:
+        schema = schema_cache.load_any(fp)
+    codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True)
+    gen = GeneratedCodec(schema, verbose_rec=True, verbose_str=True)
+    files, diffs, t_codec, t_gen = 0, 0, 0.0, 0.0
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(schema_path), '*-*', '*.json'))):
+        gb, cr = os.path.basename(os.path.dirname(path)).split('-', 1)
+        if gb not in ('Good', 'Bad') or cr not in MESSAGE_TYPES:
+            continue
+        with open(path, encoding='utf-8') as fp:
+            try:
+                instance = json.load(fp)
+            except ValueError:
+                continue                # Bad JSON is not decoded by either codec
+        tn = MESSAGE_TYPES[cr]
+        files += 1
+        expected, actual = run(codec.decode, tn, instance), run(gen.decode, tn, instance)
+        if expected[0] == 'pass' and expected == actual:
+            expected, actual = run(codec.encode, tn, expected[1]), run(gen.encode, tn, expected[1])
+        if expected != actual:
+            diffs += 1
+            print(f'  {os.path.relpath(path, os.path.dirname(schema_path))}\n    Codec:     {expected[1]}\n    Generated: {actual[1]}')
+        t_codec += best(lambda: run(codec.decode, tn, instance), repeat)
+        t_gen += best(lambda: run(gen.decode, tn, instance), repeat)
+    return files, diffs, t_codec, t_gen
+
+
+def main(root: str = ROOT_DIR, repeat: int = 20) -> None:
+    """
+    Compare the Codec and generated codecs on the fixtures of every device in root
+    """
+    print(f'JADN Version: {jadn.__version__}')
+    total = [0, 0, 0.0, 0.0]
+    for d in sorted(glob.glob(os.path.join(root, '*', ''))):
+        if not (schemas := sorted(glob.glob(os.path.join(d, '*.jadn')) + glob.glob(os.path.join(d, '*.jidl')))):
+            continue
+        files, diffs, t_codec, t_gen = r = check_device(schemas[0], repeat)
+        total = [t + x for t, x in zip(total, r)]
+        print(f'{os.path.basename(os.path.dirname(d)):30} {files:4} files, {diffs} different,'
+              f' Codec {t_codec * 1e6 / max(files, 1):8.1f} us, generated {t_gen * 1e6 / max(files, 1):8.1f} us,'
+              f' {t_codec / t_gen if t_gen else 0:.1f}x')
+    files, diffs, t_codec, t_gen = total
+    print(f'\n{files} files, {diffs} different, decode {t_codec * 1e3:.3f} ms -> {t_gen * 1e3:.3f} ms,'
+          f' {t_codec / t_gen if t_gen else 0:.1f}x')
+    if diffs:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
@@ -0,0 +1,126 @@
+"""
+Check github_fetch against a local stand-in for the two GitHub API endpoints it uses
+
+    test-fetch.py
+
+The stand-in serves a small tree with an ETag and answers a matching If-None-Match with 304 Not Modified.
+A second GitHubTree sharing the cache directory must revalidate the listing with one 304 request and read
+every file from the cache; after a file changes, only that file may be downloaded again.  With an empty
+cache directory nothing may be written to disk, and JADN_CACHE='' must give github_fetch.CACHE_DIR ''.
+Exits with status 1 if any check fails.
+"""
+import github_fetch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+REPO = '/repos/owner/repo'
+FILES = {
+    'Test/device-a/schema.jidl': b'package: "http://example.com/a"\n',
+    'Test/device-a/Good-command/query.json': b'{"action": "query", "target": {"features": []}}\n',
+    'Test/README.md': b'# Test\r\n',
+}
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    Git Trees and raw contents endpoints for the files in server.files, counting responses by status
+    """
+    def log_message(self, *args) -> None:
+        pass
+
+    def reply(self, code: int, body: bytes = b'', headers: dict = None) -> None:
+        self.server.log.append((code, urlparse(self.path).path))
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = unquote(urlparse(self.path).path)
+        files = self.server.files
+        if path.startswith(f'{REPO}/git/trees/'):
+            etag = f'"{github_fetch.blob_sha(json.dumps(files, default=bytes.hex).encode())}"'
+            if self.headers.get('If-None-Match') == etag:
+                return self.reply(304, headers={'ETag': etag})
+            dirs = {'/'.join(p.split('/')[:i]) for p in files for i in range(1, p.count('/') + 1)}
+            tree = [{'path': d, 'type': 'tree'} for d in sorted(dirs)] + [
+                {'path': p, 'type': 'blob', 'sha': github_fetch.blob_sha(data)} for p, data in files.items()]
+            return self.reply(200, json.dumps({'tree': tree, 'truncated': False}).encode(), {'ETag': etag})
+        if path.startswith(f'{REPO}/contents/') and (rel := path[len(f'{REPO}/contents/'):]) in files:
+            return self.reply(200, files[rel])
+        self.reply(404)
+
+
+def run(server: ThreadingHTTPServer, cache_dir: str) -> tuple:
+    """
+    List and read every file with a new GitHubTree, return (tree, files downloaded, [(status, path)] served)
+    """
+    del server.log[:]
+    tree = github_fetch.GitHubTree(f'http://127.0.0.1:{server.server_port}{REPO}/contents/Test?ref=main',
+                                   cache_dir=cache_dir)
+    urls, dirs = [], [tree.contents_url]
+    while dirs:
+        listing = tree.list_dir(dirs.pop())
+        urls += [e.url for e in listing['files']]
+        dirs += [e.url for e in listing['dirs']]
+    downloaded = tree.prefetch(urls)
+    for url in urls:
+        if tree.open(url).read().encode() != server.files[f'Test/{tree.relpath(url)}'].replace(b'\r\n', b'\n'):
+            raise ValueError(f'Wrong contents: {url}')
+    return tree, downloaded, list(server.log)
+
+
+def main() -> None:
+    """
+    Run the fetch checks against a stand-in server on a free local port
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.files, server.log = dict(FILES), []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    failed = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tree, downloaded, log = run(server, cache_dir)
+        if downloaded != len(FILES) or tree.requests != len(FILES) + 1:
+            failed.append(f'cold: expected {len(FILES)} downloads in {len(FILES) + 1} requests, '
+                          f'got {downloaded} in {tree.requests}')
+        tree, downloaded, log = run(server, cache_dir)
+        if downloaded or log != [(304, f'{REPO}/git/trees/main')]:
+            failed.append(f'warm: expected one 304 tree request and no downloads, got {downloaded} downloads, {log}')
+        server.files['Test/README.md'] = b'# Changed\n'
+        tree, downloaded, log = run(server, cache_dir)
+        if downloaded != 1 or [c for c, _ in log] != [200, 200]:
+            failed.append(f'changed: expected a new listing and 1 download, got {downloaded} downloads, {log}')
+    with tempfile.TemporaryDirectory() as work:
+        cwd = os.getcwd()
+        os.chdir(work)              # Relative cache paths would be written here
+        try:
+            tree, downloaded, log = run(server, '')
+        finally:
+            os.chdir(cwd)
+        if downloaded != len(FILES) or os.listdir(work) or 304 in [c for c, _ in log]:
+            failed.append(f'no cache: expected {len(FILES)} downloads, no 304 and nothing written, '
+                          f'got {downloaded}, {log}, {os.listdir(work)}')
+    server.shutdown()
+    env = {**os.environ, 'JADN_CACHE': ''}
+    p = subprocess.run([sys.executable, '-c', 'import github_fetch; print(repr(github_fetch.CACHE_DIR))'],
+                       env=env, capture_output=True, text=True)
+    if p.stdout.strip() != "''":
+        failed.append(f"JADN_CACHE='' should disable caching, got CACHE_DIR {p.stdout.strip() or p.stderr}")
+    for f in failed:
+        print(f'  {f}')
+    print(f'{len(failed)} failed checks')
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
@@ -0,0 +1,96 @@
+"""
+Check that the XML instance loader reads the device test fixtures as the values their JSON form decodes to
+
+    test-loaders.py [--root Test] [--verbose]
+
+Each Good-* command and response of each device folder in root is converted to plain element XML: the root
+element is named by the message type, object members are child elements named by their keys, list items
+are repeated elements (an empty list is one empty element), and other values are element text.  The XML
+is loaded with instance_loaders and decoded by the device Codec, and the result must equal the decoded JSON,
+or be invalid if the JSON is invalid.  Exits with status 1 if any differ.
+"""
+import glob
+import jadn
+import json
+import os
+import schema_cache
+from compiled_schema import compile_schema
+from instance_loaders import loads
+from lxml import etree
+
+ROOT_DIR = 'Test'
+MESSAGE_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+
+
+def to_xml(name: str, val) -> etree._Element:
+    """
+    Convert a JSON value to an element, raise ValueError if a key is not an XML name
+    """
+    e = etree.Element(name)
+    if isinstance(val, dict):
+        for k, v in val.items():
+            for item in v if isinstance(v, list) and v else [v]:     # An empty list is an empty element
+                e.append(to_xml(k, item))
+    elif isinstance(val, list):
+        e.extend(to_xml('item', v) for v in val)
+    else:
+        e.text = json.dumps(val) if isinstance(val, bool) else str(val)
+    return e
+
+
+def decode(codec: jadn.codec.Codec, type_name: str, val) -> tuple:
+    try:
+        return 'pass', codec.decode(type_name, val)
+    except Exception as e:
+        return 'fail', f'{type(e).__name__}: {e}'
+
+
+def check_device(schema_path: str, verbose: bool) -> tuple:
+    """
+    Load the Good-* fixtures of one device from XML, return (files, differences, not convertible)
+    """
+    with open(schema_path, encoding='utf-8') as fp:
+        schema = schema_cache.load_any(fp)
+    codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True)
+    cs = compile_schema(schema)
+    files, diffs, skipped = 0, 0, 0
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(schema_path), 'Good-*', '*.json'))):
+        if (cr := os.path.basename(os.path.dirname(path)).split('-', 1)[1]) not in MESSAGE_TYPES:
+            continue
+        tn = MESSAGE_TYPES[cr]
+        with open(path, encoding='utf-8') as fp:
+            try:
+                instance = json.load(fp)
+                doc = etree.tostring(to_xml(tn, instance))
+            except ValueError:          # Bad JSON, or keys that are not XML names
+                skipped += 1
+                continue
+        files += 1
+        expected, actual = decode(codec, tn, instance), decode(codec, tn, loads(doc, '.xml', cs, tn))
+        if expected != actual and not (expected[0] == actual[0] == 'fail'):     # Invalid fixtures need not fail alike
+            diffs += 1
+            print(f'  {os.path.relpath(path, os.path.dirname(schema_path))}\n    JSON: {expected[1]}\n    XML:  {actual[1]}'
+                  + (f'\n    {doc.decode()}' if verbose else ''))
+    return files, diffs, skipped
+
+
+def main(root: str = ROOT_DIR, verbose: bool = False) -> None:
+    """
+    Compare JSON and XML loading of the Good-* fixtures of every device in root
+    """
+    total = [0, 0, 0]
+    for d in sorted(glob.glob(os.path.join(root, '*', ''))):
+        if not (schemas := sorted(glob.glob(os.path.join(d, '*.jadn')) + glob.glob(os.path.join(d, '*.jidl')))):
+            continue
+        files, diffs, skipped = r = check_device(schemas[0], verbose)
+        total = [t + x for t, x in zip(total, r)]
+        print(f'{os.path.basename(os.path.dirname(d)):30} {files:4} files, {diffs} different, {skipped} not convertible')
+    files, diffs, skipped = total
+    print(f'\n{files} files, {diffs} different, {skipped} not convertible to XML')
+    if diffs:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
@@ -1,13 +1,21 @@
+import decode_profile
 import jadn
 import json
 import os
+import schema_cache
+import statistics
+import time
+import verdict_cache
 from collections import defaultdict
-from io import TextIOWrapper
+from concurrent.futures import ProcessPoolExecutor
+from generated_codec import GeneratedCodec
+from github_fetch import GitHubTree
 from typing import TextIO
-from urllib.request import urlopen, Request
 from urllib.parse import urlparse
-from jsonschema import validate, Draft202012Validator
-from jsonschema.exceptions import ValidationError
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import SchemaError, ValidationError
+from jsonschema.validators import validator_for
+from xml.etree import ElementTree
 
 """
 Validate OpenC2 commands and responses for profiles stored in local ROOT_DIR or GitHub under ROOT_REPO
@@ -40,6 +48,21 @@ TEST_ROOT = ROOT_DIR          # Select local directory or GitHub root of test tr
 
 AUTH = {'Authorization': f'token {os.environ["GitHubToken"] if TEST_ROOT == ROOT_REPO else "None"}'}
 
+_validators = {}        # Schema path -> Codec or JSON Schema validator, built once per worker process
+_remote = None          # GitHub tree listing and file cache, created on first remote access
+_profile = None         # DecodeProfile attached to each Codec when profiling
+_digests = {}           # Schema path -> hash of the checked schema, for verdict cache keys
+_verdicts = ''          # Verdict cache directory, empty to validate every file
+_generated = False      # Validate with codecs generated from the JADN schemas instead of the Codec
+CODECS = (jadn.codec.Codec, GeneratedCodec)
+
+
+def remote_tree() -> GitHubTree:
+    global _remote
+    if _remote is None:
+        _remote = GitHubTree(TEST_ROOT, headers=AUTH)
+    return _remote
+
 
 class WebDirEntry:
     """
@@ -58,17 +81,13 @@ def list_dir(dirpath: str) -> dict:
     :param dirpath: str - a filesystem path or GitHub API URL
     :return: dict {files: [DirEntry*], dirs: [DirEntry*]}
     Local Filesystem: Each list item is an os.DirEntry structure containing name and path attributes
-    GitHub Filesystem: Each list item has name, path, and url (download URL) attributes
+    GitHub Filesystem: Each list item has name, path, and url (contents API URL) attributes
     """
 
     files, dirs = [], []
     u = urlparse(dirpath)
     if all([u.scheme, u.netloc]):
-        with urlopen(Request(dirpath, headers=AUTH)) as d:
-            for dl in json.loads(d.read().decode()):
-                url = 'url' if dl['type'] == 'dir' else 'download_url'
-                entry = WebDirEntry(dl['name'], dl[url], dl['url'])
-                (dirs if dl['type'] == 'dir' else files).append(entry)
+        return remote_tree().list_dir(dirpath)
     else:
         with os.scandir(dirpath) as dlist:
             for entry in dlist:
@@ -79,7 +98,7 @@ def list_dir(dirpath: str) -> dict:
 def open_file(fileentry: os.DirEntry) -> TextIO:
     u = urlparse(fileentry.path)
     if all([u.scheme, u.netloc]):
-        return TextIOWrapper(urlopen(Request(fileentry.path, headers=AUTH)), encoding='utf8')
+        return remote_tree().open(fileentry.path)
     return open(fileentry.path, 'r', encoding='utf8')
 
 
@@ -97,61 +116,252 @@ def find_tests(dirpath):        # Search for folders containing schemas and test
     return test_list
 
 
-def run_test(dpath):         # Check correct validation of good and bad commands and responses
-    print(f'\n{dpath}:')
-    dl = list_dir(dpath)
+def schema_name(schema_path: str) -> str:
+    return os.path.basename(urlparse(schema_path).path)
+
+
+def load_validator(schema_path: str):
+    """
+    Return the Codec or JSON Schema validator for a device schema, built once per process.
+    A JSON Schema is checked once and compiled into a validator for the draft given by its $schema.
+    """
+    if schema_path not in _validators:
+        with open_file(WebDirEntry('', schema_path, '')) as fp:
+            if os.path.splitext(schema_name(schema_path))[1] == '.json':
+                cls = validator_for(schema := json.load(fp), default=Draft202012Validator)
+                cls.check_schema(schema)
+                _validators[schema_path] = cls(schema, format_checker=Draft202012Validator.FORMAT_CHECKER)
+            else:
+                _validators[schema_path] = schema_cache.load_codec(fp, generated=_generated)
+                if _profile:
+                    _profile.attach(_validators[schema_path], os.path.splitext(schema_name(schema_path))[0])
+    return _validators[schema_path]
+
+
+def schema_digest(schema_path: str) -> str:
+    if schema_path not in _digests:
+        v = load_validator(schema_path)
+        _digests[schema_path] = verdict_cache.schema_digest(v.schema)
+    return _digests[schema_path]
+
+
+def _init_worker(verdicts: str, generated: bool) -> None:
+    global _verdicts, _generated
+    _verdicts, _generated = verdicts, generated
+
+
+def validate_instance(validator, cr: str, instance: dict) -> tuple:
+    """
+    Validate a command or response with a Codec or JSON Schema validator, return (pass/fail, message, seconds)
+    """
+    start = time.perf_counter()
     try:
-        if VALIDATE_JADN:
-            schemas = [f for f in dl['files'] if os.path.splitext(f.name)[1] in ('.jadn', '.jidl')]
-            with open_file(schemas[0]) as fp:
-                codec = jadn.codec.Codec(jadn.load_any(fp), verbose_rec=True, verbose_str=True)
+        if isinstance(validator, CODECS):
+            validator.decode('OpenC2-Command' if cr == 'command' else 'OpenC2-Response', instance)
         else:
-            schemas = [f for f in dl['files'] if os.path.splitext(f.name)[1] == '.json']
-            with open_file(schemas[0]) as fp:
-                json_schema = json.load(fp)
-    except IndexError:
-        print(f'No schemas found in {dpath}')
-        return
-    except ValueError as e:
-        print(e)
-        return
+            validator.validate({'openc2_' + cr: instance})
+        actual, message = 'pass', ''
+    except ValidationError as e:        # JSON Schema validation error
+        actual, message = 'fail', e.message
+    except ValueError as e:             # JADN validation error
+        actual, message = 'fail', str(e)
+    return actual, message, time.perf_counter() - start
+
+
+def check_instance(schema_path: str, cr: str, gb: str, name: str, path: str, compare_path: str = '') -> dict:
+    """
+    Validate one command or response file, return its result with validation time in seconds.
+    If compare_path is a second schema, also return the result of validating with it.
+    """
+    result = {'dir': f'{gb}-{cr}', 'file': name, 'expected': 'pass' if gb == 'Good' else 'fail', 'time': 0.0}
+    try:
+        validators = [load_validator(p) for p in (schema_path, compare_path) if p]
+    except (ValueError, SchemaError) as e:      # Schema error
+        result.update(actual='error', message=str(e) if isinstance(e, ValueError) else e.message)
+        return result
+    start = time.perf_counter()
+    with open_file(WebDirEntry(name, path, '')) as fp:
+        doc = fp.read()
+    key = ''
+    if _verdicts and not compare_path:      # Use the stored verdict if this document has been validated
+        tn = ('OpenC2-Command' if cr == 'command' else 'OpenC2-Response') if isinstance(validators[0], CODECS) else f'openc2_{cr}'
+        if hit := verdict_cache.get(key := verdict_cache.cache_key(doc.encode(), schema_digest(schema_path), tn), _verdicts):
+            result.update(actual='pass' if hit[0] else 'fail', message=hit[1], time=time.perf_counter() - start, cached=True)
+            return result
+    try:
+        instance = json.loads(doc)
+        verdicts = [validate_instance(v, cr, instance) for v in validators]
+    except ValueError as e:             # Bad JSON
+        verdicts = [('fail', str(e), time.perf_counter() - start)] * len(validators)
+    result.update(zip(('actual', 'message', 'time'), verdicts[0]))
+    if compare_path:
+        result['compare'] = dict(zip(('actual', 'message', 'time'), verdicts[1]))
+    if key:
+        verdict_cache.put(key, result['actual'] == 'pass', result['message'], _verdicts)
+    return result
+
+
+def find_schema(files: list, ext: tuple, device: str) -> str:
+    """
+    Return the path of the device's schema in ext formats, preferring one named after the device folder
+    """
+    schemas = [f for f in files if os.path.splitext(f.name)[1] in ext]
+    schemas.sort(key=lambda f: os.path.splitext(f.name)[0] != device)
+    return schemas[0].path if schemas else ''
+
+
+def plan_test(dpath: str, differential: bool = False) -> dict:
+    """
+    List the schema and the command/response files to be checked for one device directory.
+    A differential plan also lists the device's schema in the other format (JSON Schema or JADN).
+    """
+    dl = list_dir(dpath)
+    device = os.path.basename(urlparse(dpath).path.rstrip('/'))
+    jadn_schema = find_schema(dl['files'], ('.jadn', '.jidl'), device)
+    json_schema = find_schema(dl['files'], ('.json',), device)
+    schema, compare = (jadn_schema, json_schema) if VALIDATE_JADN else (json_schema, jadn_schema)
+    tdirs = {d.name: d for d in dl['dirs']}
+    plan = {'device': dpath, 'schema': schema, 'compare': compare if differential else '', 'dirs': {}}
+    for cr in ('command', 'response'):
+        for gb in ('Good', 'Bad'):
+            if (pdir := f'{gb}-{cr}') in tdirs:
+                plan['dirs'][pdir] = [(plan['schema'], cr, gb, f.name, f.path, plan['compare'])
+                                      for f in list_dir(tdirs[pdir].path)['files']]
+    return plan
+
+
+def report_test(plan: dict, results: list) -> dict:
+    """
+    Print results for one device in the original console format, return its summary
+    """
+    print(f'\n{plan["device"]}:')
+    if not plan['schema']:
+        print(f'No schemas found in {plan["device"]}')
+        return {}
     tcount = defaultdict(int)       # Total instances tested
     ecount = defaultdict(int)       # Error instances
-    tdirs = {d.name: d for d in dl['dirs']}
+    results = iter(results)
     for cr in ('command', 'response'):
         for gb in ('Good', 'Bad'):
             pdir = f'{gb}-{cr}'
-            if pdir in tdirs:
+            if pdir in plan['dirs']:
                 print(f'  {pdir}')
-                dl2 = list_dir(tdirs[pdir].path)
-                for n, f in enumerate(dl2['files'], start=1):
-                    print(f'{n:>6} {f.name:<50}', end='')
-                    try:
-                        if VALIDATE_JADN:
-                            crtype = 'OpenC2-Command' if cr == 'command' else 'OpenC2-Response'
-                            codec.decode(crtype, json.load(open_file(f)))
-                        else:
-                            validate({'openc2_' + cr: json.load(open_file(f))}, json_schema,
-                                     format_checker=Draft202012Validator.FORMAT_CHECKER)
-                        tcount[pdir] += 1
-                        ecount[pdir] += 1 if gb == 'Bad' else 0
-                        print()
-                    except ValidationError as e:    # JSON Schema validation error
-                        tcount[pdir] += 1
-                        ecount[pdir] += 1 if gb == 'Good' else 0
-                        print(f' Fail: {e.message}')
-                    except ValueError as e:         # JADN validation error
-                        tcount[pdir] += 1
-                        ecount[pdir] += 1 if gb == 'Good' else 0
-                        print(f' Fail: {e}')
-                    except json.decoder.JSONDecodeError as e:
-                        print(f' Bad JSON: {e.msg} "{e.doc}"')
+                for n in range(1, len(plan['dirs'][pdir]) + 1):
+                    r = next(results)
+                    print(f'{n:>6} {r["file"]:<50}', end='')
+                    if r['actual'] == 'error':
+                        print(f' {r["message"]}')
+                        continue
+                    tcount[pdir] += 1
+                    ecount[pdir] += 0 if r['actual'] == r['expected'] else 1
+                    print(f' Fail: {r["message"]}' if r['actual'] == 'fail' else '')
             else:
                 print(pdir, 'No tests')
     print(f'Validation Errors: {sum(k for k in ecount.values())}', {k: str(dict(ecount)[k]) + '/' + str(dict(tcount)[k]) for k in tcount})
+    return {'errors': dict(ecount), 'tests': dict(tcount)}
 
 
-if __name__ == '__main__':
+def differential_report(suites: list) -> None:
+    """
+    Print files where the JADN and JSON Schema verdicts differ, and the latency of each validator
+    """
+    names = ('JADN', 'JSON Schema') if VALIDATE_JADN else ('JSON Schema', 'JADN')
+    print(f'\nDifferential validation, {names[0]} vs. {names[1]}:')
+    times = ([], [])
+    print(f'{"device":<40} {"files":>6} {"differ":>6} {names[0] + " ms":>14} {names[1] + " ms":>14}')
+    for s in suites:
+        if not (res := [r for r in s['results'] if 'compare' in r]):
+            continue
+        for r in res:
+            times[0].append(r['time'])
+            times[1].append(r['compare']['time'])
+        differ = [r for r in res if r['actual'] != r['compare']['actual']]
+        print(f'{os.path.basename(s["device"]):<40} {len(res):>6} {len(differ):>6}'
+              f' {1000 * sum(r["time"] for r in res):>14.3f} {1000 * sum(r["compare"]["time"] for r in res):>14.3f}')
+        for r in differ:
+            print(f'    {r["dir"]}/{r["file"]}: {names[0]} {r["actual"]}, {names[1]} {r["compare"]["actual"]}')
+            for n, m in zip(names, (r['message'], r['compare']['message'])):
+                if m:
+                    print(f'      {n}: {m[:200]}')
+    if not times[0]:
+        print('No devices have both JADN and JSON schemas')
+        return
+    for n, t in zip(names, times):
+        print(f'{n:>12}: total {1000 * sum(t):.3f} ms, median {1e6 * statistics.median(t):.1f} us,'
+              f' max {1e6 * max(t):.1f} us per file')
+    fast = 0 if sum(times[0]) <= sum(times[1]) else 1
+    print(f'{names[fast]} is {sum(times[1 - fast]) / sum(times[fast]) if sum(times[fast]) else 0:.1f}x faster')
+
+
+def junit_report(suites: list) -> str:
+    """
+    Return JUnit XML for a list of {device, results, time} test suites
+    """
+    root = ElementTree.Element('testsuites')
+    for s in suites:
+        failures = [r for r in s['results'] if r['actual'] != r['expected']]
+        ts = ElementTree.SubElement(root, 'testsuite', name=s['device'], tests=str(len(s['results'])),
+                                    failures=str(len(failures)), time=f'{s["time"]:.6f}')
+        for r in s['results']:
+            tc = ElementTree.SubElement(ts, 'testcase', classname=f'{s["device"]}/{r["dir"]}', name=r['file'],
+                                        time=f'{r["time"]:.6f}')
+            if r['actual'] != r['expected']:
+                ElementTree.SubElement(tc, 'failure', message=f'expected {r["expected"]}, got {r["actual"]}').text = r['message']
+    return ElementTree.tostring(root, encoding='unicode')
+
+
+def main(jobs: int = 1, junit: str = '', report: str = '', profile: str = '', differential: bool = False,
+         no_cache: bool = False, generated: bool = False) -> None:
+    """
+    Run all device tests, optionally in parallel worker processes, and write JUnit XML / JSON reports.
+    With differential, validate every file with both the JADN and JSON schemas and compare the verdicts.
+    Verdicts of unchanged files are read from the verdict cache unless no_cache, profiling or differential is set.
+    With generated, JADN schemas are validated by generated code (see generated_codec) instead of the Codec.
+    """
+    global _profile, _verdicts, _generated
+    if profile_file := decode_profile.profile_path(profile):     # Profile decoding by type, in this process
+        _profile = decode_profile.DecodeProfile()
+        jobs = 1
+    _generated = generated and not _profile         # Profiling instruments the Codec's symbol table
+    _verdicts = '' if no_cache or _profile or differential else verdict_cache.CACHE_DIR
     print(f'JADN Version: {jadn.__version__}, Test Data: {TEST_ROOT}, Access Token: ..{AUTH["Authorization"][-4:]}')
-    for test in find_tests(TEST_ROOT):
-        run_test(test)
\ No newline at end of file
+    plans = [plan_test(test, differential) for test in find_tests(TEST_ROOT)]
+    tasks = [t for p in plans if p['schema'] for d in p['dirs'].values() for t in d]
+    if _remote is not None:         # Download uncached schemas and test files concurrently
+        n = _remote.prefetch({p[k] for p in plans for k in ('schema', 'compare') if p[k]} | {t[4] for t in tasks})
+        print(f'Downloaded {n} files, {_remote.requests} requests')
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [check_instance(*t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs if jobs > 0 else None, initializer=_init_worker, initargs=(_verdicts, _generated)) as ex:
+            results = list(ex.map(check_instance, *zip(*tasks), chunksize=8)) if tasks else []
+    elapsed = time.perf_counter() - start
+    suites, rx = [], 0
+    for p in plans:
+        n = sum(len(d) for d in p['dirs'].values()) if p['schema'] else 0
+        res = results[rx:rx + n]
+        rx += n
+        summary = report_test(p, res)
+        suites.append({'device': p['device'], 'schema': p['schema'], 'summary': summary,
+                       'time': sum(r['time'] for r in res), 'results': res})
+    print(f'\n{len(tasks)} files, {elapsed:.3f} sec' +
+          (f', {sum(1 for r in results if r.get("cached"))} cached verdicts' if _verdicts else ''))
+    if _verdicts and (n := verdict_cache.prune(cache_dir=_verdicts)):
+        print(f'{n} least recently used verdicts evicted')
+    if differential:
+        differential_report(suites)
+    if junit:
+        with open(junit, 'w', encoding='utf8') as fp:
+            fp.write(junit_report(suites))
+    if report:
+        with open(report, 'w', encoding='utf8') as fp:
+            json.dump({'jadn_version': jadn.__version__, 'test_root': TEST_ROOT, 'time': elapsed, 'suites': suites}, fp, indent=2)
+    if _profile:
+        _profile.print_table()
+        _profile.save(profile_file)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
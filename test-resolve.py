@@ -0,0 +1,64 @@
+"""
+Check that resolving with the shared package index gives the same schemas as jadn.transform.resolve_imports
+
+    test-resolve.py [--schema_dir Schemas]
+
+Every schema with namespaces in each folder of schema_dir is resolved against its own folder by jadn and by
+package_index with the shared index, and the resolved schemas must serialize to the same JSON.  The index
+path is checked even if the installed jadn is not in package_index.RESOLVE_JADN_VERSIONS; add the version
+there when this passes.  Exits with status 1 if any schema differs.
+"""
+import contextlib
+import glob
+import io
+import jadn
+import json
+import jsonschema
+import os
+import package_index
+import tempfile
+
+SCHEMA_DIR = 'Schemas'
+
+
+def quiet(fn, *args):
+    """
+    Call fn without its duplicate package and resolve messages, return its result or the exception raised
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            return fn(*args)
+        except (ValueError, KeyError, IndexError, jsonschema.ValidationError) as e:
+            return e
+
+
+def main(schema_dir: str = SCHEMA_DIR) -> None:
+    """
+    Compare jadn and indexed resolution of the schemas with namespaces in each folder of schema_dir
+    """
+    pinned = jadn.__version__ in package_index.RESOLVE_JADN_VERSIONS
+    print(f'JADN Version: {jadn.__version__}{"" if pinned else " (not in RESOLVE_JADN_VERSIONS)"}')
+    files = diffs = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for d in sorted({os.path.dirname(f) for f in glob.glob(os.path.join(schema_dir, '**', '*.j*'), recursive=True)}):
+            index = None
+            for path in sorted(glob.glob(os.path.join(d, '*.jadn')) + glob.glob(os.path.join(d, '*.jidl'))):
+                if isinstance(sc := quiet(jadn.load_any, open(path, encoding='utf-8')), Exception) \
+                        or not sc.get('info', {}).get('namespaces'):
+                    continue
+                if isinstance(expected := quiet(jadn.transform.resolve_imports, sc, d), Exception):
+                    continue            # Not resolvable by jadn
+                index = index or quiet(package_index.PackageIndex, d, cache_dir)
+                actual = quiet(package_index._resolve_indexed, sc, index)
+                files += 1
+                if isinstance(actual, Exception) or json.dumps(actual) != json.dumps(expected):
+                    diffs += 1
+                    print(f'  {path}: {actual if isinstance(actual, Exception) else "resolved schemas differ"}')
+    print(f'{files} schemas, {diffs} different')
+    if diffs:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
@@ -0,0 +1,55 @@
+"""
+Check that validate-server.py keeps serving after bad requests and messages the Codec can't handle
+
+    test-server.py [--root Test]
+
+Runs validate-server.py stdin with a sequence of requests: a message whose value makes the Codec raise
+something other than ValueError, a valid message after it, a bad request, two unknown devices, and
+"stats".  Every request must get its verdict, unknown devices must share one statistics entry, and
+percentiles must use the nearest rank.  Exits with status 1 if any check fails.
+"""
+import json
+import subprocess
+import sys
+
+ROOT_DIR = 'Test'
+DEVICE = 'device-slpf'
+REQUESTS = (    # Request, expected verdict valid, expected error text
+    ({'device': DEVICE, 'message': {'action': 'deny', 'target': {'ipv4_net': ['10.0.0.0', 8]}}}, False, 'AttributeError'),
+    ({'device': DEVICE, 'message': {'action': 'deny', 'target': {'ipv4_net': '10.0.0.0/8'}}}, True, ''),
+    ({'device': ['not', 'a', 'name'], 'message': {}}, False, 'Bad request'),
+    ({'device': 'no-such-device-1', 'message': {}}, False, 'Unknown device'),
+    ({'device': 'no-such-device-2', 'message': {}}, False, 'Unknown device'),
+)
+
+
+def main(root: str = ROOT_DIR) -> None:
+    """
+    Send the requests to a validation server reading stdin, check its verdicts and stats
+    """
+    lines = '\n'.join([json.dumps(req) for req, _, _ in REQUESTS] + ['stats']) + '\n'
+    p = subprocess.run([sys.executable, 'validate-server.py', 'stdin', '--root', root], input=lines,
+                       capture_output=True, text=True)
+    rsp = [json.loads(line) for line in p.stdout.splitlines()]
+    failed = []
+    if p.returncode or len(rsp) != len(REQUESTS) + 1:
+        failed.append(f'expected {len(REQUESTS) + 1} responses and status 0, got {len(rsp)} and {p.returncode}\n{p.stderr}')
+    for (req, valid, error), verdict in zip(REQUESTS, rsp):
+        if verdict.get('valid') != valid or error not in verdict.get('error', ''):
+            failed.append(f'{json.dumps(req)}\n    expected: {valid} {error}\n    got:      {verdict}')
+    if len(rsp) == len(REQUESTS) + 1:
+        devices = rsp[-1]['devices']
+        if sorted(devices) != sorted([DEVICE, '<unknown>']) or devices['<unknown>']['requests'] != 3:
+            failed.append(f'stats should count the device and one <unknown> entry with 3 requests: {sorted(devices)}')
+        elif (p50 := devices[DEVICE]['latency_us']['p50']) != min(v['time_us'] for v in rsp[:2]):
+            failed.append(f'p50 of 2 samples should be the smaller: {p50}, {[v["time_us"] for v in rsp[:2]]}')
+    for f in failed:
+        print(f'  {f}')
+    print(f'{len(REQUESTS)} requests, {len(failed)} failed checks')
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
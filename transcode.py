@@ -0,0 +1,167 @@
+"""
+Transcode JADN data between the verbose, compact and concise encodings, in bulk
+
+    transcode.py <input> [<input> ...] [--schema device.jadn] [--type_name command]
+                 [--source verbose] [--target concise] [--output out.ndjson] [--cbor] [--generated]
+
+Each record is decoded with a Codec for the source encoding and encoded with a Codec for the target encoding:
+
+    verbose     Records and Maps are objects keyed by field name, Enumerated values are names
+    compact     Records are arrays in field order, Maps are keyed by field name, Enumerated values are names
+    concise     Records are arrays, Maps are keyed by field ID, Enumerated values are IDs
+
+Inputs are NDJSON files (.ndjson or .jsonl, one record per line), JSON files (one record each), directories of
+JSON files, or glob patterns such as 'Test/*/Good-command'.  The schema is --schema, or the .jadn or .jidl file
+in the folder (or parent folder) of each input file, so a pattern can span devices.  The type is --type_name
+('command', 'response' or a type name), or is taken from the folder name of each input file, e.g. Good-command.
+Records are streamed to --output as NDJSON, or with --cbor as a CBOR sequence (RFC 8742), which requires the
+cbor2 package.  Records that fail to load, decode or encode are reported and skipped.  The summary gives the
+throughput and the size of the records in the source encoding (minified JSON) and the target encoding (minified
+JSON or CBOR).
+"""
+import glob
+import json
+import os
+import schema_cache
+import time
+from contextlib import nullcontext
+from typing import Callable, Iterator
+
+ENCODINGS = {           # Encoding: (verbose_rec, verbose_str) Codec options
+    'verbose': (True, True),
+    'compact': (False, True),
+    'concise': (False, False)
+}
+MESSAGE_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+REPORT_EVERY = 10000    # Records between running throughput reports
+SEPARATORS = (',', ':')     # Minified JSON
+
+_codecs = {}            # (Schema path, encoding, generated) -> Codec, built once per process
+
+
+def input_files(inputs: tuple) -> list:
+    """
+    Return the files of input files, directories and glob patterns, in order
+    """
+    files = []
+    for p in inputs:
+        for path in sorted(glob.glob(p)) if glob.has_magic(p) else [p]:
+            files += sorted(glob.glob(os.path.join(path, '*.json'))) if os.path.isdir(path) else [path]
+    return files
+
+
+def iter_docs(path: str) -> Iterator[tuple]:
+    """
+    Yield (line number or 0, record bytes) for each line of an NDJSON file or the whole of any other file
+    """
+    with open(path, 'rb') as fp:
+        if os.path.splitext(path)[1] in ('.ndjson', '.jsonl'):
+            yield from ((n, line) for n, line in enumerate(fp, start=1) if line.strip())
+        else:
+            yield 0, fp.read()
+
+
+def find_schema(path: str) -> str:
+    """
+    Return the JADN schema file in the folder or parent folder of a data file
+    """
+    for d in (folder := os.path.dirname(path), os.path.dirname(folder)):
+        if schemas := sorted(glob.glob(os.path.join(d or '.', '*.jadn')) + glob.glob(os.path.join(d or '.', '*.jidl'))):
+            return schemas[0]
+    raise ValueError(f'{path}: no --schema and no schema file in its folder or parent folder')
+
+
+def record_type(path: str, type_name: str) -> str:
+    """
+    Return the type of the records in a data file: type_name, or the message type named by its folder
+    """
+    if type_name:
+        return MESSAGE_TYPES.get(type_name, type_name)
+    if (cr := os.path.basename(os.path.dirname(path)).rsplit('-', 1)[-1]) in MESSAGE_TYPES:
+        return MESSAGE_TYPES[cr]
+    raise ValueError(f'{path}: no --type_name and its folder name does not end in -command or -response')
+
+
+def load_codec(schema: str, encoding: str, generated: bool = False):
+    if (codec := _codecs.get(key := (schema, encoding, generated))) is None:
+        with open(schema, encoding='utf-8') as fp:
+            codec = _codecs[key] = schema_cache.load_codec(fp, *ENCODINGS[encoding], generated=generated)
+    return codec
+
+
+def cbor_dumps() -> Callable[[object], bytes]:
+    try:
+        import cbor2
+    except ImportError:
+        raise ValueError('Writing CBOR requires cbor2: pip install cbor2')
+    return cbor2.dumps
+
+
+def json_dumps(val) -> bytes:
+    return json.dumps(val, separators=SEPARATORS).encode()
+
+
+def transcode(*inputs: str, schema: str = '', type_name: str = '', source: str = 'verbose', target: str = 'concise',
+              output: str = '', cbor: bool = False, generated: bool = False) -> None:
+    """
+    Convert the records of the inputs from the source to the target encoding, write them to output if given,
+    and report throughput and bytes saved.  With generated, use generated codecs (see generated_codec).
+    """
+    for enc in (source, target):
+        if enc not in ENCODINGS:
+            raise ValueError(f'Unknown encoding "{enc}", expected one of: {", ".join(ENCODINGS)}')
+    if not (files := input_files(inputs)):
+        raise ValueError(f'No input files: {" ".join(inputs)}')
+    dumps = cbor_dumps() if cbor else json_dumps
+    n = ecount = skipped = in_bytes = out_bytes = 0
+    load_time = transcode_time = 0.0
+    start = time.perf_counter()
+    with open(output, 'wb') if output else nullcontext() as out:
+        for path in files:
+            try:
+                tn = record_type(path, type_name)
+                sc = schema or find_schema(path)
+                dec, enc = load_codec(sc, source, generated), load_codec(sc, target, generated)
+            except ValueError as e:         # No schema or type for this file, or a bad schema
+                skipped += 1
+                print(f'* Skipping {e}')
+                continue
+            for line, doc in iter_docs(path):
+                n += 1
+                t0 = time.perf_counter()
+                try:
+                    val = json.loads(doc)
+                    t1 = time.perf_counter()
+                    tval = enc.encode(tn, dec.decode(tn, val))
+                    t2 = time.perf_counter()
+                except ValueError as e:     # Includes JSONDecodeError
+                    ecount += 1
+                    print(f'{path}{f":{line}" if line else ""}: Error: {e}')
+                    continue
+                except TypeError as e:      # Raised by some of the Codec's format functions
+                    ecount += 1
+                    print(f'{path}{f":{line}" if line else ""}: Error: {tn}: {type(e).__name__} {e}')
+                    continue
+                load_time, transcode_time = load_time + t1 - t0, transcode_time + t2 - t1
+                in_bytes += len(json_dumps(val))
+                out_bytes += len(data := dumps(tval))
+                if out:
+                    out.write(data if cbor else data + b'\n')
+                if n % REPORT_EVERY == 0:
+                    print(f'{n:>10} records, {ecount} errors, {n / (time.perf_counter() - start):.0f} records/sec')
+    elapsed = time.perf_counter() - start
+    print(f'{n} records from {len(files) - skipped} files ({skipped} skipped), {ecount} errors, {elapsed:.3f} sec,'
+          f' {n / elapsed if elapsed else 0:.0f} records/sec')
+    print(f'  load: {load_time:.3f} sec  transcode: {transcode_time:.3f} sec,'
+          f' {(n - ecount) / transcode_time if transcode_time else 0:.0f} records/sec')
+    print(f'  {source} JSON: {in_bytes} bytes, {target} {"CBOR" if cbor else "JSON"}: {out_bytes} bytes,'
+          f' saved {in_bytes - out_bytes} bytes ({(in_bytes - out_bytes) / in_bytes if in_bytes else 0:.1%})'
+          + (f', written to {output}' if output else ''))
+
+
+if __name__ == '__main__':
+    import fire
+    try:
+        fire.Fire(transcode)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
@@ -0,0 +1,234 @@
+"""
+Resident OpenC2 validation service with a warm Codec for every device in the Test folder
+
+    validate-server.py http [--host 127.0.0.1] [--port 8765] [--generated]
+        POST /validate  {"device": "device-slpf", "type": "command", "message": {...}}
+        GET  /devices   loaded devices and schema files
+        GET  /stats     request count, errors and latency percentiles, overall and per device
+    validate-server.py stdin [--generated]
+        one JSON request per input line, one JSON verdict per output line; the line "stats" returns stats
+
+"type" is "command", "response", or a type name such as "OpenC2-Command".  A verdict is
+{"valid": true} or {"valid": false, "error": "..."} with the validation time in microseconds.
+Device schemas are checked for changes every RELOAD_INTERVAL seconds and reloaded when modified.  With --generated,
+each device is validated by code generated from its schema (see generated_codec) instead of the Codec.
+"""
+import asyncio
+import fire
+import glob
+import jadn
+import json
+import jsonschema
+import math
+import os
+import re
+import schema_cache
+import sys
+import time
+from collections import defaultdict, deque
+from http import HTTPStatus
+
+ROOT_DIR = 'Test'
+HOST = '127.0.0.1'
+PORT = 8765
+RELOAD_INTERVAL = 1.0       # Seconds between schema file change checks
+LATENCY_SAMPLES = 10000     # Most recent request latencies kept per device for percentiles
+MESSAGE_TYPES = {'command': 'OpenC2-Command', 'response': 'OpenC2-Response'}
+UNKNOWN_DEVICE = '<unknown>'    # Statistics key for bad requests and unknown device names
+
+
+class Device:
+    def __init__(self, name: str, path: str, generated: bool = False):
+        self.name = name
+        self.path = path
+        self.generated = generated
+        self.mtime = 0
+        self.codec = None
+        self.error = ''
+
+    def load(self) -> bool:
+        """
+        (Re)load the schema if its file has changed, return True if it was loaded or a new error occurred
+        """
+        try:
+            if (mtime := os.stat(self.path).st_mtime_ns) == self.mtime:
+                return False
+            self.mtime = mtime
+            with open(self.path, encoding='utf-8') as fp:
+                self.codec = schema_cache.load_codec(fp, generated=self.generated)
+            self.error = ''
+        except (ValueError, jsonschema.ValidationError, OSError) as e:     # Keep the previous Codec if an edited
+            error = e.message if isinstance(e, jsonschema.ValidationError) else str(e)    # schema is invalid or removed
+            if error == self.error:
+                return False
+            self.error = error
+        return True
+
+
+class Validator:
+    """
+    Codecs for all devices, with per-device latency statistics
+    """
+    def __init__(self, root: str = ROOT_DIR, generated: bool = False):
+        self.devices = {}
+        for d in sorted(glob.glob(os.path.join(root, '*', ''))):
+            if schemas := sorted(glob.glob(os.path.join(d, '*.jadn')) + glob.glob(os.path.join(d, '*.jidl'))):
+                name = os.path.basename(os.path.dirname(d))
+                self.devices[name] = Device(name, schemas[0], generated)
+        self.latency = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))     # Microseconds
+        self.counts = defaultdict(lambda: {'requests': 0, 'invalid': 0, 'errors': 0})
+        self.started = time.time()
+        self.checked = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        for dev in self.devices.values():
+            if dev.load():
+                print(f'{"Loaded" if not dev.error else "Error loading"} {dev.name}: {dev.path} {dev.error}',
+                      file=sys.stderr)
+        self.checked = time.monotonic()
+
+    def validate(self, req: dict) -> dict:
+        """
+        Validate one message, return its verdict
+        """
+        start = time.perf_counter()
+        device = req.get('device', '') if isinstance(req, dict) else ''
+        t = req.get('type', 'command') if isinstance(req, dict) else ''
+        good = isinstance(device, str) and isinstance(t, str)
+        key = device if good and device in self.devices else UNKNOWN_DEVICE    # Don't grow stats per bad name
+        counts = self.counts[key]
+        counts['requests'] += 1
+        try:
+            if not isinstance(req, dict) or 'message' not in req or not good:
+                raise LookupError('Bad request: expected {"device": string, "type": string, "message"}')
+            if (dev := self.devices.get(device)) is None:
+                raise LookupError(f'Unknown device "{device}"')
+            if dev.codec is None:
+                raise LookupError(f'{device}: {dev.error}')
+            if (tn := MESSAGE_TYPES.get(t, t)) not in dev.codec.symtab:
+                raise LookupError(f'{device}: unknown type "{t}"')
+        except LookupError as e:
+            counts['errors'] += 1
+            verdict = {'valid': False, 'error': e.args[0]}
+        else:
+            try:
+                dev.codec.decode(tn, req['message'])
+                verdict = {'valid': True}
+            except ValueError as e:
+                counts['invalid'] += 1
+                verdict = {'valid': False, 'error': str(e)}
+            except re.error as e:       # Schema pattern not supported by Python re
+                counts['errors'] += 1
+                verdict = {'valid': False, 'error': f'{device}: Unsupported pattern: {e}'}
+            except Exception as e:      # Codec functions that fail on unexpected values, e.g. a list for a string
+                counts['invalid'] += 1
+                verdict = {'valid': False, 'error': f'{tn}: {type(e).__name__}: {e}'}
+        self.latency[key].append(us := (time.perf_counter() - start) * 1e6)
+        verdict['time_us'] = round(us, 1)
+        return verdict
+
+    def stats(self) -> dict:
+        def percentiles(samples) -> dict:
+            if not (s := sorted(samples)):
+                return {}
+            return {f'p{p}': round(s[max(0, math.ceil(len(s) * p / 100) - 1)], 1) for p in (50, 90, 99)} | {'max': round(s[-1], 1)}
+
+        return {
+            'uptime': round(time.time() - self.started, 1),
+            'latency_us': percentiles(x for v in self.latency.values() for x in v),
+            'devices': {d: {**c, 'latency_us': percentiles(self.latency[d])} for d, c in self.counts.items()},
+        }
+
+    def device_list(self) -> dict:
+        return {d.name: {'schema': d.path, 'loaded': d.codec is not None, 'error': d.error} for d in self.devices.values()}
+
+
+async def http_response(writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool) -> None:
+    data = json.dumps(body).encode()
+    writer.write(f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(data)}\r\nConnection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + data)
+    await writer.drain()
+
+
+async def handle_http(v: Validator, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serve HTTP/1.1 requests on one connection until the client closes it
+    """
+    try:
+        while request := await reader.readline():
+            method, target, version = request.decode('latin-1').split()
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                k, _, val = line.decode('latin-1').partition(':')
+                headers[k.strip().lower()] = val.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            if method == 'POST' and target == '/validate':
+                try:
+                    status, rsp = 200, v.validate(json.loads(body))
+                except ValueError as e:
+                    status, rsp = 400, {'valid': False, 'error': f'Bad request: {e}'}
+            elif method == 'GET' and target == '/stats':
+                status, rsp = 200, v.stats()
+            elif method == 'GET' and target == '/devices':
+                status, rsp = 200, v.device_list()
+            else:
+                status, rsp = 404, {'error': f'{method} {target} not found'}
+            await http_response(writer, status, rsp, keep_alive)
+            if not keep_alive:
+                break
+    except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def reload_loop(v: Validator) -> None:
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL)
+        v.reload()
+
+
+def http(host: str = HOST, port: int = PORT, root: str = ROOT_DIR, generated: bool = False) -> None:
+    """
+    Serve validation requests over HTTP, with generated codecs if generated
+    """
+    async def serve():
+        v = Validator(root, generated)
+        server = await asyncio.start_server(lambda r, w: handle_http(v, r, w), host, port)
+        print(f'JADN {jadn.__version__}: {len(v.devices)} devices, listening on http://{host}:{port}', file=sys.stderr)
+        reloader = asyncio.create_task(reload_loop(v))
+        async with server:
+            await server.serve_forever()
+        reloader.cancel()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def stdin(root: str = ROOT_DIR, generated: bool = False) -> None:
+    """
+    Validate JSON requests read one per line from stdin, write one verdict per line to stdout, with generated
+    codecs if generated
+    """
+    v = Validator(root, generated)
+    for line in sys.stdin:
+        if not (line := line.strip()):
+            continue
+        if time.monotonic() - v.checked > RELOAD_INTERVAL:
+            v.reload()
+        if line == 'stats':
+            rsp = v.stats()
+        else:
+            try:
+                rsp = v.validate(json.loads(line))
+            except ValueError as e:
+                rsp = {'valid': False, 'error': f'Bad request: {e}'}
+        print(json.dumps(rsp), flush=True)
+
+
+if __name__ == '__main__':
+    fire.Fire({'http': http, 'stdin': stdin})
@@ -1,30 +1,293 @@
-import fire
+import decode_profile
+import glob
+import hashlib
+import instance_loaders
 import jadn
 import json
 import os
+import schema_cache
+import split_document
+import time
+import verdict_cache
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from io import TextIOWrapper
+from typing import Iterator, TextIO, Union
+from compiled_schema import CompiledSchema, compile_schema
+from jadn.definitions import TypeName, BaseType, TypeOptions
 
 SCHEMA_DIR = 'Schemas'
 DATA_DIR = 'Data'
+CHUNK_SIZE = 1 << 16        # Bytes read per chunk when streaming a JSON array
+REPORT_EVERY = 10000        # Records between running throughput reports
+
+_codec = None               # Batch mode: Codec shared by all files validated in this process
+_compiled = None            # CompiledSchema guiding the XML loader
+_item_type = ''
+_digest = ''                # Hash of the batch schema, and verdict cache directory ('' to validate every file)
+_verdicts = ''
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yield the elements of a top-level JSON array without loading the whole document
+
+    Only the unparsed tail of the input is buffered, so memory use is bounded by the largest element.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def fill() -> bool:         # Drop consumed text, append next chunk, return False at end of input
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        return not eof
+
+    def skip_ws():              # Advance pos to the next non-whitespace character, reading as needed
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip_ws()
+    if buf[pos:pos + 1] != '[':
+        raise ValueError(f'Expected a top-level JSON array, found "{buf[pos:pos + 20]}"')
+    pos += 1
+    skip_ws()
+    if buf[pos:pos + 1] == ']':
+        return
+    while True:
+        while True:             # Decode next element, reading more input until it is complete
+            try:
+                val, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:   # A trailing delimiter proves a number/literal wasn't truncated
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        pos = end
+        yield val
+        skip_ws()
+        if (c := buf[pos:pos + 1]) == ']':
+            return
+        if c != ',':
+            raise ValueError(f'Expected "," or "]" in JSON array, found "{buf[pos:pos + 20]}"')
+        pos += 1
+        skip_ws()
+
+
+def item_type_of(schema: Union[dict, CompiledSchema], type_name: str) -> str:
+    """
+    Return the element type of an ArrayOf type, or the type itself if it is not an ArrayOf
+    """
+    if isinstance(schema, CompiledSchema):
+        td = schema.type(type_name)
+        return td.topts['vtype'] if td and td.base_type == 'ArrayOf' else type_name
+    for td in schema['types']:
+        if td[TypeName] == type_name:
+            if td[BaseType] == 'ArrayOf':
+                return jadn.topts_s2d(td[TypeOptions])['vtype']
+            break
+    return type_name
+
+
+def iter_file_records(fp, ext: str, schema: CompiledSchema, type_name: str) -> Iterator:
+    """
+    Yield the records of a binary file: JSON array elements, NDJSON lines, YAML documents or XML record elements
+    """
+    if ext in ('.ndjson', '.jsonl', '.yaml', '.yml', '.xml'):
+        yield from instance_loaders.iter_records(fp, ext, schema, type_name)
+    else:
+        yield from iter_json_array(TextIOWrapper(fp, encoding='utf-8'))
+
+
+def validate_stream(codec: jadn.codec.Codec, item_type: str, path: str, type_name: str = '') -> None:
+    """
+    Decode each record of an NDJSON, YAML or XML file or top-level JSON array, reporting errors and throughput
+    as it goes.  Load (parse) and decode times are reported separately.  type_name is the document's ArrayOf type:
+    its minimum and maximum length are checked against the record count, and with unique or set each record
+    against the digests of earlier records.  An NDJSON line that is not JSON is a bad record; malformed JSON
+    arrays, YAML and XML can't be read past the error, which ends the stream.
+    """
+    n = ecount = 0
+    load_time = decode_time = 0.0
+    ts = codec.symtab.get(type_name)
+    topts = ts.TypeOpts if ts and ts.TypeDef.BaseType == 'ArrayOf' else {}
+    seen = set() if 'unique' in topts or 'set' in topts else None
+    read_all = True
+    start = time.perf_counter()
+    with open(path, 'rb') as fp:
+        records = iter_file_records(fp, os.path.splitext(path)[1], compile_schema(codec.schema), type_name or item_type)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                if (record := next(records, StopIteration)) is StopIteration:
+                    break
+            except ValueError as e:     # Not an array, or malformed JSON, YAML or XML
+                ecount += 1
+                print(f'record {n + 1}: Error: {e}')
+                read_all = False
+                break
+            t1 = time.perf_counter()
+            n += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                codec.decode(item_type, record)
+                if seen is not None:
+                    if (digest := hashlib.sha256(json.dumps(record, sort_keys=True).encode()).digest()) in seen:
+                        raise ValueError(f'{type_name}(ArrayOf): duplicate record')
+                    seen.add(digest)
+            except ValueError as e:
+                ecount += 1
+                print(f'record {n}: Error: {e}')
+            load_time, decode_time = load_time + t1 - t0, decode_time + time.perf_counter() - t1
+            if n % REPORT_EVERY == 0:
+                print(f'{n:>10} records, {ecount} errors, {n / (time.perf_counter() - start):.0f} records/sec')
+    if read_all and n < topts.get('minv', 0):
+        ecount += 1
+        print(f'{type_name}: Error: length {n} < minimum {topts["minv"]}')
+    if read_all and n > topts.get('maxv', n):
+        ecount += 1
+        print(f'{type_name}: Error: length {n} > maximum {topts["maxv"]}')
+    elapsed = time.perf_counter() - start
+    print(f'{item_type}: {n} records, {ecount} errors, {elapsed:.3f} sec, {n / elapsed if elapsed else 0:.0f} records/sec')
+    print(f'  load: {load_time:.3f} sec, {os.path.getsize(path) / load_time / 1e6 if load_time else 0:.1f} MB/sec'
+          f'  decode: {decode_time:.3f} sec, {n / decode_time if decode_time else 0:.0f} records/sec')
+
+
+def _init_worker(schema: dict, item_type: str, verdicts: str) -> None:
+    """
+    Build the batch Codec once per worker process, unless it was inherited from the parent when workers are forked
+    """
+    global _codec, _compiled, _item_type, _digest, _verdicts
+    if _codec is None:
+        _codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True)
+    if _compiled is None:
+        _compiled = compile_schema(schema)
+    _item_type = item_type
+    _digest = verdict_cache.schema_digest(schema) if verdicts else ''
+    _verdicts = verdicts
+
+
+def check_document(codec: jadn.codec.Codec, item_type: str, doc: bytes, digest: str = '', verdicts: str = '',
+                   ext: str = '.json', schema: CompiledSchema = None, times: dict = None) -> tuple:
+    """
+    Load a document in the format given by its file extension and decode it, adding load and decode seconds
+    to times if given, return (error message or '', True if the verdict was read from the verdict cache)
+    """
+    cache_type = item_type if ext in ('.json', '') else f'{item_type} {ext}'   # Same bytes may load differently
+    if verdicts and (hit := verdict_cache.get(key := verdict_cache.cache_key(doc, digest, cache_type), verdicts)):
+        return hit[1], True
+    times = {} if times is None else times
+    try:
+        start = time.perf_counter()
+        val = instance_loaders.loads(doc, ext, schema or compile_schema(codec.schema), item_type)
+        times['load'] = (loaded := time.perf_counter()) - start
+        try:
+            codec.decode(item_type, val)
+        finally:                # Failed decodes are timed too
+            times['decode'] = time.perf_counter() - loaded
+        err = ''
+    except ValueError as e:     # Includes JSONDecodeError, Bad XML and Bad YAML
+        err = str(e)
+    except (TypeError, AttributeError) as e:    # Raised by Codec format functions given a value of the wrong type
+        err = f'{item_type}: {type(e).__name__}: {e}'
+    if verdicts:
+        verdict_cache.put(key, not err, err, verdicts)
+    return err, False
+
+
+def _validate_file(path: str) -> tuple:
+    """
+    Check one data file with the shared Codec, return (path, error message or '', seconds, cached)
+    """
+    start = time.perf_counter()
+    with open(path, 'rb') as fp:
+        err, cached = check_document(_codec, _item_type, fp.read(), _digest, _verdicts, os.path.splitext(path)[1], _compiled)
+    return path, err, time.perf_counter() - start, cached
+
+
+def validate_batch(codec: jadn.codec.Codec, item_type: str, pattern: str, jobs: int = 0, verdicts: str = '') -> None:
+    """
+    Validate every file in a directory or matching a glob pattern across a pool of worker processes,
+    or in this process if jobs is 1.  Verdicts of unchanged files are read from the verdicts cache directory.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.json')
+    files = sorted(f for f in glob.glob(pattern) if os.path.isfile(f))
+    jobs = jobs if jobs > 0 else os.cpu_count()
+    print(f'{item_type}: {len(files)} files, {jobs} workers')
+    global _codec, _compiled
+    _codec = codec          # Shared by this process and forked workers, including a Codec wrapped by --profile
+    _compiled = compile_schema(codec.schema)
+    _init_worker(codec.schema, item_type, verdicts)
+    npass = nfail = ncached = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(codec.schema, item_type, verdicts)) \
+            if jobs > 1 else nullcontext() as ex:
+        results = ex.map(_validate_file, files, chunksize=max(1, len(files) // (4 * jobs))) if ex else map(_validate_file, files)
+        for path, err, elapsed, cached in results:
+            print(f'{elapsed * 1000:>10.1f} ms {path}' + (' (cached)' if cached else '') + (f'\n    Error: {err}' if err else ''))
+            npass += 0 if err else 1
+            nfail += 1 if err else 0
+            ncached += 1 if cached else 0
+    elapsed = time.perf_counter() - start
+    print(f'Pass: {npass}, Fail: {nfail}, {elapsed:.3f} sec, {len(files) / elapsed if elapsed else 0:.1f} files/sec'
+          + (f', {ncached} cached verdicts' if verdicts else ''))
+
 
 """
 Validate a file against a JADN schema
 """
-def validate(file: str = 'checksums.json', schema: str = 'checksums.jidl') -> None:
+def validate(file: str = 'checksums.json', schema: str = 'checksums.jidl', stream: bool = False, jobs: int = 0,
+             profile: str = '', no_cache: bool = False, split: bool = False) -> None:
     filename, ext = os.path.splitext(file)
     with open(os.path.join(SCHEMA_DIR, schema), encoding='utf-8') as fp:
-        sc = jadn.load_any(fp)
+        sc = schema_cache.load_any(fp)
     codec = jadn.codec.Codec(sc, verbose_rec=True, verbose_str=True)
     item_type = sc['info']['exports'][0]
-    with open(os.path.join(DATA_DIR, file), encoding='utf-8') as fp:
-        data = json.load(fp)
-    print(f'{item_type}: {len(data)}')
-    try:
-        codec.decode(item_type, data)
-    except ValueError as e:
-        print(f' Error: {e}')
+    path = os.path.join(DATA_DIR, file)
+    prof = None
+    if profile_file := decode_profile.profile_path(profile):    # Profile decoding by type, in this process
+        prof = decode_profile.DecodeProfile()
+        prof.attach(codec)
+        jobs = 1
+    verdicts = '' if no_cache or prof else verdict_cache.CACHE_DIR
+    if os.path.isdir(path) or glob.has_magic(path):   # Validate many files with one Codec
+        validate_batch(codec, item_type, path, jobs, verdicts)
+    elif stream:    # Validate records one at a time against the exported ArrayOf's element type
+        validate_stream(codec, item_type_of(sc, item_type), path, item_type)
+    elif split:     # Validate the big arrays of one large JSON document in parallel
+        with split_document.SplitDocument(path) as doc:
+            for ptr, err in doc.validate(sc, item_type, jobs=jobs):
+                print(f' Error: {ptr + ": " if ptr else ""}{err}')
+    else:
+        with open(path, 'rb') as fp:
+            doc = fp.read()
+        digest = verdict_cache.schema_digest(sc) if verdicts else ''
+        err, cached = check_document(codec, item_type, doc, digest, verdicts, ext, compile_schema(sc), times := {})
+        if 'load' in times:
+            print(f'{item_type}: {len(doc)} bytes, load {times["load"] * 1000:.1f} ms'
+                  f' ({len(doc) / times["load"] / 1e6 if times["load"] else 0:.1f} MB/sec)'
+                  + (f', decode {times["decode"] * 1000:.1f} ms' if 'decode' in times else ''))
+        if err:
+            print(f' Error: {err}')
+        if cached:
+            print(' (cached verdict)')
+    if verdicts:
+        verdict_cache.prune(cache_dir=verdicts)
+    if prof:
+        prof.print_table()
+        prof.save(profile_file)
+
 
 if __name__ == '__main__':
+    import fire
     try:
         fire.Fire(validate)
     except FileNotFoundError as e:
-        print(e)
\ No newline at end of file
+        print(e)
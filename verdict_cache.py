@@ -0,0 +1,98 @@
+"""
+Cache validation verdicts on disk, keyed by a hash of the document bytes, the checked schema, the type
+being validated, and the installed JADN version
+
+A hit returns the stored pass/fail and error text without decoding the document.  Each verdict is a small
+file in the cache directory; reading an entry marks it as recently used, and prune() deletes the least
+recently used entries when the directory grows beyond a size limit.  Set the JADN_CACHE environment variable
+to change the parent cache directory, or to an empty string to disable caching.
+"""
+import hashlib
+import json
+import os
+import schema_cache
+from typing import Optional
+
+CACHE_DIR = os.path.join(schema_cache.CACHE_DIR, 'verdicts') if schema_cache.CACHE_DIR else ''
+MAX_BYTES = 64 << 20        # Size limit enforced by prune()
+
+
+def schema_digest(schema: dict) -> str:
+    """
+    Return a hash of a checked schema (or any JSON value), independent of key order
+    """
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def cache_key(doc: bytes, digest: str, type_name: str) -> str:
+    return hashlib.sha256(f'{schema_cache.jadn_version()}\n{digest}\n{type_name}\n'.encode() + doc).hexdigest()
+
+
+def get(key: str, cache_dir: str = CACHE_DIR) -> Optional[tuple]:
+    """
+    Return the cached (valid, error) verdict for a key, or None if it is not cached
+    """
+    if not cache_dir:
+        return None
+    path = os.path.join(cache_dir, key + '.json')
+    try:
+        with open(path, encoding='utf-8') as fp:
+            v = json.load(fp)
+        os.utime(path)          # Mark as recently used
+        return v['valid'], v['error']
+    except (OSError, ValueError, KeyError, TypeError):      # Missing or unreadable entry
+        return None
+
+
+def put(key: str, valid: bool, error: str, cache_dir: str = CACHE_DIR) -> None:
+    if not cache_dir:
+        return
+    path = os.path.join(cache_dir, key + '.json')
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(tmp := f'{path}.{os.getpid()}', 'w', encoding='utf-8') as fp:
+        json.dump({'valid': valid, 'error': error}, fp)
+    os.replace(tmp, path)       # Atomic, concurrent writers of the same key are harmless
+
+
+def prune(max_bytes: int = MAX_BYTES, cache_dir: str = CACHE_DIR) -> int:
+    """
+    Delete least recently used verdicts until the cache is no larger than max_bytes, return the number removed
+    """
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for f in os.scandir(cache_dir):
+        if f.name.endswith('.json'):
+            st = f.stat()
+            entries.append((st.st_mtime, st.st_size, f.path))
+    total = sum(e[1] for e in entries)
+    n = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        n += 1
+    return n
+
+
+def clear(cache_dir: str = CACHE_DIR) -> int:
+    """
+    Delete all cached verdicts, return the number of entries removed
+    """
+    return prune(-1, cache_dir)
+
+
+__all__ = [
+    'CACHE_DIR',
+    'MAX_BYTES',
+    'cache_key',
+    'clear',
+    'get',
+    'prune',
+    'put',
+    'schema_digest'
+]